@@ -1,3 +1,11 @@
-from app.db_setup import create_app
+#This file exposes the WSGI application as app.app (e.g. "gunicorn app:app").
+#It is created on first access rather than when the package is imported, so scripts and workers
+#importing app.db_setup or a model don't build (and schema-check) a second app first.
 
-app = create_app()
\ No newline at end of file
+
+def __getattr__(name):
+    if name == "app":
+        from app.db_setup import create_app
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,15 @@
 from flask import render_template, request, redirect, url_for, flash, Blueprint
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import login_user, logout_user, login_required
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager
 from app.db_setup import db
 from app.models.client import Client
+from app.models.credential import Credential
+from app.models.employee import Employee
 from app.auth import auth
+from app.passwords import HashingBusy, hash_password, needs_rehash, verify_password
+from app.ratelimit import login_per_email, login_per_ip, register_per_ip
+from app.utils import too_many_requests
 # import pytz # East European Timezone support
 
 # Blueprint for authentication
@@ -19,8 +25,15 @@ from app.auth import auth
 
 @auth.route("/register", methods=["GET", "POST"])
 def register():
-    """📝 Handles client registration with hashed passwords."""
+    """
+    📝 Handles client registration with hashed passwords.
+    Rate-limited per IP; hashing runs on the bounded pool (app/passwords.py), 429 when saturated.
+    """
     if request.method == "POST":
+        allowed, retry_after = register_per_ip.take(request.remote_addr or "")
+        if not allowed:
+            return too_many_requests("register.html", retry_after)
+
         name = request.form.get("name")
         email = request.form.get("email")
         password = request.form.get("password")
@@ -29,13 +42,16 @@ def register():
         vin_number = request.form.get("vin_number")
         car_model = request.form.get("car_model")
 
-        # Check if user already exists
-        existing_user = Client.query.filter_by(email=email).first()
+        # Check if the email is taken (by a client or an employee)
+        existing_user = Credential.query.filter_by(email=email).first()
         if existing_user:
             flash("Email already registered.", "error")
             return redirect(url_for("auth.register"))
 
-        hashed_pw = generate_password_hash(password, method="scrypt")
+        try:
+            hashed_pw = hash_password(password)
+        except HashingBusy as busy:
+            return too_many_requests("register.html", busy.retry_after)
         new_client = Client(
             name=name,
             email=email,
@@ -46,7 +62,13 @@ def register():
             car_model=car_model
         )
         db.session.add(new_client)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Registered concurrently with the same email
+            db.session.rollback()
+            flash("Email already registered.", "error")
+            return redirect(url_for("auth.register"))
 
         flash("Account created successfully! ✅", "success")
         return redirect(url_for("auth.login"))
@@ -54,17 +76,60 @@ def register():
     return render_template("register.html")
 
 
+def find_user_by_email(email):
+    """
+    🔎 Returns the Client or Employee owning a login email, or None.
+    One query: ix_credential_email lookup joined to both owner tables by their unique credential_id.
+    """
+    row = (
+        db.session.query(Credential, Client, Employee)
+        .outerjoin(Client, Client.credential_id == Credential.id)
+        .outerjoin(Employee, Employee.credential_id == Credential.id)
+        # the owner's credential is the one selected here, no need to join it again
+        .options(contains_eager(Client.credential), contains_eager(Employee.credential))
+        .filter(Credential.email == email)
+        .first()
+    )
+    if row is None:
+        return None
+    return row[1] or row[2]
+
+
 @auth.route("/login", methods=["GET", "POST"])
 def login():
-    """🔐 Authenticates clients or employees with hashed password check."""
+    """
+    🔐 Authenticates clients or employees with hashed password check.
+    - Token-bucket limits per IP and per email answer 429 before any database or KDF work.
+    - Verification runs on the bounded hashing pool; 429 when it is saturated.
+    - Hashes made with older PASSWORD_HASH_METHOD parameters are upgraded on success.
+    - The credential and its client or employee are fetched in one indexed query.
+    """
     if request.method == "POST":
         email = request.form.get("email")
         password = request.form.get("password")
 
-        from app.models.employee import Employee
-        user = Client.query.filter_by(email=email).first() or Employee.query.filter_by(email=email).first()
+        for limiter, key in ((login_per_ip, request.remote_addr or ""),
+                             (login_per_email, (email or "").strip().lower())):
+            allowed, retry_after = limiter.take(key)
+            if not allowed:
+                return too_many_requests("login.html", retry_after)
+
+        user = find_user_by_email(email)
+
+        try:
+            valid = user is not None and verify_password(user.password, password)
+        except HashingBusy as busy:
+            return too_many_requests("login.html", busy.retry_after)
+
+        if valid and needs_rehash(user.password):
+            # Opportunistic upgrade: if the pool is busy, log in now and rehash on a later login
+            try:
+                user.credential.password = hash_password(password)
+                db.session.commit()
+            except HashingBusy:
+                db.session.rollback()
 
-        if user and check_password_hash(user.password, password):
+        if valid:
             login_user(user)
             #print(f"DEBUG: Logged in user = {user}, role={getattr(user, 'role', None)}")
 
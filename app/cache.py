@@ -0,0 +1,86 @@
+#This file provides small in-process caches shared by the app (identity lookups, report results, ...).
+#They are deliberately dependency-free so every worker process can use them without extra services.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    🧠 Bounded, thread-safe cache with least-recently-used eviction and a per-entry time-to-live.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept before the oldest one is evicted.
+        ttl (float): Seconds an entry stays valid after it was stored.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns the cached value for 'key', or 'default' if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Stores 'value' under 'key', evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Removes 'key' from the cache and returns its value (expired or not)."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self):
+        """Drops every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class StampFile:
+    """
+    📌 Cross-process invalidation marker: a file whose modification time changes on every
+    'touch'. Each process remembers the last time it saw, so a cheap stat() per check tells
+    it whether another worker (or a manual_* script) invalidated the shared data.
+    """
+
+    def __init__(self):
+        self._seen = None
+
+    def changed(self, path):
+        """Returns True if the stamp was touched since the previous call in this process."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._seen:
+            self._seen = mtime
+            return True
+        return False
+
+    def touch(self, path):
+        """Marks the stamp as changed for every process."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a"):
+            os.utime(path, None)
@@ -5,33 +5,111 @@ import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from app.identity import init_identity_cache, load_identity
+from app.db_engine import configure_engine, install_sqlite_pragmas
+from app.instrumentation import init_instrumentation
+from app.passwords import init_password_hashing
+from app.ratelimit import init_rate_limits
 
 # 🔗 Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 
 
-def create_app():
+def create_app(migrate=True):
     """
     ⚙️ Initializes the Flask app, database, and login manager.
     - Registers blueprints for modular routing.
-    - Ensures the instance folder exists and database is created.
+    - Ensures the instance folder exists and the database schema is current
+      (skipped with migrate=False, e.g. by manual_migrate.py, which applies the steps itself).
     """
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your_secret_key'
 
-    # Database path in instance folder
-    db_path = os.path.join(os.getcwd(), "instance", "volvo_tlc_hub.db")
-    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    # Database: SQLite file in the instance folder unless DATABASE_URL is set (see app/db_engine.py).
+    # VOLVO_<KEY> environment variables (values parsed as JSON) override the engine profile keys,
+    # e.g. VOLVO_DB_POOL_SIZE=20 or VOLVO_SQLITE_PRAGMAS='{"journal_mode": "WAL"}'
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config.from_prefixed_env("VOLVO")
+    configure_engine(app)
+
+    # 📄 Keyset pagination for list dashboards (see keyset_paginate in app/utils.py)
+    app.config["PAGE_SIZE"] = 25
+    app.config["MAX_PAGE_SIZE"] = 200
+
+    # 📅 Elevator reservations: default start time and length of one repair slot
+    app.config["REPAIR_DAY_START"] = "08:00"
+    app.config["REPAIR_SLOT_MINUTES"] = 120
+
+    # 🖨️ Report PDFs: conversion process pool size, on-disk cache and the age after which a
+    # pending job whose worker died is queued again (see app/pdf_export.py)
+    app.config["PDF_WORKERS"] = 2
+    app.config["PDF_PENDING_TIMEOUT"] = 300
+    app.config["REPORT_CACHE_DIR"] = os.path.join(os.getcwd(), "instance", "report_cache")
+
+    # 🏗️ Elevator usage report memo: stamp file shared by all workers (see app/usage.py)
+    app.config["USAGE_STAMP_PATH"] = os.path.join(os.getcwd(), "instance", "usage_report.stamp")
+
+    # 📉 Low-stock mirror: stamp file telling every worker to reload it (see app/low_stock.py)
+    app.config["LOW_STOCK_STAMP_PATH"] = os.path.join(os.getcwd(), "instance", "low_stock.stamp")
+
+    # 🧠 Identity cache used by load_user (see app/identity.py)
+    app.config["IDENTITY_CACHE_SIZE"] = 1024
+    app.config["IDENTITY_CACHE_TTL"] = 300.0
+    app.config["IDENTITY_STAMP_PATH"] = os.path.join(os.getcwd(), "instance", "identity.stamp")
+
+    # 📈 Opt-in request metrics and Server-Timing header (see app/instrumentation.py)
+    app.config["METRICS_ENABLED"] = os.environ.get("VOLVO_METRICS") == "1"
+    app.config["METRICS_SAMPLE_RATE"] = float(os.environ.get("VOLVO_METRICS_SAMPLE_RATE", "0.1"))
+    app.config["SERVER_TIMING"] = os.environ.get("VOLVO_SERVER_TIMING") == "1"
+
+    # 🔑 Password hashing pool and login/registration rate limits (see app/passwords.py, app/ratelimit.py)
+    app.config["PASSWORD_HASH_METHOD"] = "scrypt:32768:8:1"
+    app.config["HASH_WORKERS"] = 2
+    app.config["HASH_MAX_PENDING"] = 8
+    app.config["LOGIN_RATE_PER_IP"] = (20, 60.0)      # 20 attempts, refilled over a minute
+    app.config["LOGIN_RATE_PER_EMAIL"] = (5, 60.0)
+    app.config["REGISTER_RATE_PER_IP"] = (5, 300.0)
+
+    # 🧩 Dashboard fragment cache: 'memory' (per worker), 'filesystem' (shared by workers) or 'off' (see app/fragments.py)
+    app.config["FRAGMENT_CACHE_BACKEND"] = os.environ.get("VOLVO_FRAGMENT_CACHE", "memory")
+    app.config["FRAGMENT_CACHE_SIZE"] = 512
+    app.config["FRAGMENT_CACHE_TTL"] = 600.0
+    app.config["FRAGMENT_CACHE_DIR"] = os.path.join(os.getcwd(), "instance", "fragment_cache")
+    app.config["FRAGMENT_STAMP_DIR"] = os.path.join(os.getcwd(), "instance", "fragment_stamps")
+
+    # 📡 Live dashboard updates over Server-Sent Events (see app/live.py)
+    app.config["LIVE_POLL_INTERVAL"] = 1.0
+    app.config["LIVE_HEARTBEAT"] = 15.0
+
+    # 🧑‍🔧 Mechanic dispatch: default hours per repair, auto-assign on approval, open repairs per mechanic (see app/dispatch.py).
+    # VOLVO_REPAIR_ESTIMATE_HOURS and VOLVO_MECHANIC_MAX_OPEN (loaded by from_prefixed_env above) override the defaults
+    app.config.setdefault("REPAIR_ESTIMATE_HOURS", 2.0)
+    app.config["AUTO_ASSIGN_ON_APPROVAL"] = os.environ.get("VOLVO_AUTO_ASSIGN") == "1"
+    app.config.setdefault("MECHANIC_MAX_OPEN", None)  # no cap
+
+    # 🩺 Start-up schema check: 'version' (compare schema_version only) or 'full' (create_all every boot)
+    app.config["SCHEMA_CHECK"] = os.environ.get("VOLVO_SCHEMA_CHECK", "version")
 
     # 🗂️ Ensure instance folder exists
     os.makedirs(os.path.join(os.getcwd(), "instance"), exist_ok=True)
 
     # 🔌 Initialize extensions with app
     db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(app, db.engine)
+        init_instrumentation(app, db.engine)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
+    init_identity_cache(app)
+    init_password_hashing(app)
+    init_rate_limits(app)
+    from app.fragments import init_fragment_cache  # uses db and the models, so imported here
+    init_fragment_cache(app)
+    from app.live import init_live_updates  # also installs the flush listener publishing events
+    init_live_updates(app)
+    from app.low_stock import init_low_stock  # also installs the is_low flush listeners
+    init_low_stock(app)
 
     # ⚡ Import models here to avoid circular imports
     from app.models.client import Client
@@ -40,10 +118,11 @@ def create_app():
     @login_manager.user_loader
     def load_user(user_id):
         """
-        🔐 Loads a user from the database by ID for session handling.
-        Checks both Client and Employee tables.
+        🔐 Loads a user by typed session ID ('client:<id>' or 'employee:<id>').
+        Served from the identity cache when possible, otherwise a single
+        primary-key lookup in the matching table.
         """
-        return Client.query.get(int(user_id)) or Employee.query.get(int(user_id))
+        return load_identity(user_id)
 
     # Register blueprints
     from app.auth.routes import auth as auth_blueprint
@@ -54,8 +133,11 @@ def create_app():
     app.register_blueprint(employee_blueprint, url_prefix="/employee")
     app.register_blueprint(main_blueprint)
 
-    # Create database tables if they don't exist
-    with app.app_context():
-        db.create_all()
+    # Create tables and apply pending migrations only if the schema is behind (app/migrations.py)
+    from app.migrations import ensure_schema
+
+    if migrate:
+        with app.app_context():
+            ensure_schema(app.config["SCHEMA_CHECK"])
 
     return app
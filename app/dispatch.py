@@ -0,0 +1,184 @@
+#This file assigns approved repairs to mechanics by workload. Each run reads every mechanic's open
+#workload (number of approved / in-progress repairs and their estimated hours) with one GROUP BY
+#on ix_repair_employee_status and keeps it in a min-heap, so each repair goes to the least-loaded
+#mechanic in O(log mechanics). The heap is rebuilt per run rather than kept in memory, because
+#every worker process and manual assignment changes the workloads.
+
+import heapq
+import statistics
+from flask import current_app
+from app.db_setup import db
+from app import repair_batch
+from app.models.employee import Employee
+from app.models.repair import Repair
+
+# Statuses that count towards a mechanic's workload
+OPEN_STATUSES = ("Approved", "In Progress")
+
+# Largest work estimate a receptionist can enter for one repair
+MAX_ESTIMATE_HOURS = 200.0
+
+
+def parse_estimated_hours(value):
+    """
+    ⏱️ Reads the 'estimated_hours' form field: None when left blank (REPAIR_ESTIMATE_HOURS
+    applies), otherwise hours in (0, MAX_ESTIMATE_HOURS]. Raises ValueError on anything else.
+    """
+    if value is None or not str(value).strip():
+        return None
+    try:
+        hours = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid estimate: {value!r}")
+    if not 0 < hours <= MAX_ESTIMATE_HOURS:
+        raise ValueError(f"The estimate must be between 0 and {MAX_ESTIMATE_HOURS:g} hours.")
+    return hours
+
+
+class WorkloadHeap:
+    """
+    ⚖️ Mechanics ordered by open workload: estimated hours first, then open repairs, then ID.
+
+    Attributes:
+        max_open (int): Open repairs after which a mechanic gets no more work (None for no cap).
+    """
+
+    def __init__(self, loads, max_open=None):
+        """'loads' maps mechanic ID to (open repairs, open hours)."""
+        self.max_open = max_open
+        self._heap = [(hours, count, mechanic_id) for mechanic_id, (count, hours) in loads.items()
+                      if max_open is None or count < max_open]
+        heapq.heapify(self._heap)
+        self._full = {mechanic_id: load for mechanic_id, load in loads.items()
+                      if max_open is not None and load[0] >= max_open}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def assign(self, hours):
+        """
+        Gives a repair of 'hours' to the least-loaded mechanic.
+        Returns (mechanic ID, hours of work queued before it), or None when every mechanic is full.
+        """
+        if not self._heap:
+            return None
+        load, count, mechanic_id = self._heap[0]
+        if self.max_open is not None and count + 1 >= self.max_open:
+            heapq.heappop(self._heap)
+            self._full[mechanic_id] = (count + 1, load + hours)
+        else:
+            heapq.heapreplace(self._heap, (load + hours, count + 1, mechanic_id))
+        return mechanic_id, load
+
+    def loads(self):
+        """Current {mechanic ID: (open repairs, open hours)}."""
+        loads = {mechanic_id: (count, hours) for hours, count, mechanic_id in self._heap}
+        loads.update(self._full)
+        return loads
+
+
+def _hours_column():
+    return db.func.coalesce(Repair.estimated_hours, current_app.config["REPAIR_ESTIMATE_HOURS"])
+
+
+def load_workloads(extra_mechanics=0):
+    """
+    📊 Builds the WorkloadHeap of all mechanics from their open repairs.
+    'extra_mechanics' adds idle virtual mechanics (negative IDs) for simulations.
+    """
+    mechanic_ids = db.session.execute(
+        db.select(Employee.id).where(Employee.role == "Mechanic")
+    ).scalars()
+    loads = {mechanic_id: (0, 0.0) for mechanic_id in mechanic_ids}
+    rows = db.session.execute(
+        db.select(Repair.employee_id, db.func.count(), db.func.sum(_hours_column()))
+        .where(Repair.employee_id.is_not(None), Repair.status.in_(OPEN_STATUSES))
+        .group_by(Repair.employee_id)
+    )
+    for employee_id, count, hours in rows:
+        if employee_id in loads:
+            loads[employee_id] = (count, hours or 0.0)
+    for i in range(1, extra_mechanics + 1):
+        loads[-i] = (0, 0.0)
+    return WorkloadHeap(loads, current_app.config["MECHANIC_MAX_OPEN"])
+
+
+def unassigned_backlog(repair_ids=None, limit=None):
+    """Approved repairs without a mechanic as (id, hours) rows, earliest scheduled first."""
+    query = (
+        db.select(Repair.id, _hours_column().label("hours"))
+        .where(Repair.status == "Approved", Repair.employee_id.is_(None))
+        .order_by(Repair.scheduled_date, Repair.id)
+    )
+    if repair_ids is not None:
+        query = query.where(Repair.id.in_(repair_ids))
+    if limit is not None:
+        query = query.limit(limit)
+    return db.session.execute(query).all()
+
+
+def plan_assignments(backlog, heap):
+    """Pairs each backlog repair with the least-loaded mechanic: a list of (repair ID, mechanic ID, wait hours)."""
+    plan = []
+    for row in backlog:
+        picked = heap.assign(row.hours)
+        if picked is None:
+            break  # every mechanic is at MECHANIC_MAX_OPEN
+        plan.append((row.id, *picked))
+    return plan
+
+
+def auto_assign(repair_ids=None, limit=repair_batch.MAX_BATCH_SIZE):
+    """
+    🧑‍🔧 Assigns approved, unassigned repairs (all of them, or those among 'repair_ids') to
+    the least-loaded mechanics, with one guarded UPDATE per mechanic (see repair_batch).
+    Returns the repair_batch result dicts. The caller commits, then invalidates the REPAIRS
+    fragments and wakes the live broker.
+    """
+    plan = plan_assignments(unassigned_backlog(repair_ids, limit), load_workloads())
+    by_mechanic = {}
+    for repair_id, mechanic_id, _ in plan:
+        by_mechanic.setdefault(mechanic_id, []).append(repair_id)
+    if not by_mechanic:
+        return []
+    mechanics = {m.id: m for m in Employee.query.filter(Employee.id.in_(by_mechanic))}
+    results = []
+    for mechanic_id, ids in by_mechanic.items():
+        results += repair_batch.assign_repairs(ids, mechanics[mechanic_id])
+    return results
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def simulate(extra_mechanics=0, limit=None):
+    """
+    🔮 Dry run of auto_assign over the whole unassigned backlog; nothing is written.
+    A mechanic works through their queue in order, so a repair waits for the hours already
+    queued before it. 'extra_mechanics' answers "what if we had N more mechanics".
+
+    Returns:
+        dict with the mechanics and repairs counted, wait-hour statistics (mean, p50, p95,
+        max), the repairs left over because every mechanic hit MECHANIC_MAX_OPEN, and the
+        resulting {mechanic ID: {"open", "hours"}} workloads.
+    """
+    heap = load_workloads(extra_mechanics)
+    backlog = unassigned_backlog(limit=limit)
+    mechanics = len(heap.loads())
+    plan = plan_assignments(backlog, heap)
+    waits = sorted(wait for _, _, wait in plan)
+    return {
+        "mechanics": mechanics,
+        "repairs": len(backlog),
+        "assigned": len(plan),
+        "unassigned": len(backlog) - len(plan),
+        "wait_hours": {
+            "mean": round(statistics.mean(waits), 2) if waits else 0.0,
+            "p50": round(_percentile(waits, 0.5), 2) if waits else 0.0,
+            "p95": round(_percentile(waits, 0.95), 2) if waits else 0.0,
+            "max": round(waits[-1], 2) if waits else 0.0,
+        },
+        "workloads": {mechanic_id: {"open": count, "hours": round(hours, 2)}
+                      for mechanic_id, (count, hours) in sorted(heap.loads().items())},
+    }
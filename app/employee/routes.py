@@ -1,15 +1,22 @@
-from datetime import datetime
-import pandas as pd
-from flask import render_template, request, redirect, url_for, flash
+from datetime import datetime, timedelta
+from flask import (abort, current_app, render_template, request, redirect, send_file, url_for, flash,
+                   Response, stream_with_context)
+from markupsafe import Markup
 from flask_login import login_required, current_user
-import pytz
-from app.utils import role_required
+from app.utils import role_required, parse_date_range, filter_date_range, keyset_paginate
 from app.employee import employee
 from app.db_setup import db
+from app.identity import invalidate_identity
+from app.fragments import ELEVATORS, REPAIRS, STOCK, cached_fragment, invalidate_fragments
+from app.passwords import HashingBusy, hash_password
+from app import dispatch, live, low_stock, repair_batch, reservations, stock
+from app.reporting import GROUPINGS, revenue_totals, revenue_by, revenue_fingerprint
+from app.usage import elevator_usage
 from app.models.repair import Repair
 from app.models.consumable import Consumable
 from app.models.elevator import Elevator
 from app.models.employee import Employee
+from app.models.credential import Credential
 
 
 # -----------------------------
@@ -36,24 +43,28 @@ def mechanic_dashboard():
     🔧 Mechanic Dashboard
     ---------------------
     Displays a list of repairs that are assigned to this mechanic
-    (employee_id = current_user.id) and have status 'Approved'
-    (or 'In Progress'), depending on your workflow.
+    (employee_id = current_user.id), one page at a time.
+    Optional query parameters: status, start / end (YYYY-MM-DD), per_page, after.
     """
-    # Only show repairs assigned to the *current_user*
-    assigned_repairs = Repair.query.filter_by(
-        employee_id=current_user.id
-    ).all()
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError:
+        flash("Invalid date format. Use YYYY-MM-DD.", "error")
+        return redirect(url_for("employee.mechanic_dashboard"))
 
-    # You might filter further, e.g. status='Approved' or 'In Progress':
-    # assigned_repairs = Repair.query.filter(
-    #     Repair.employee_id == current_user.id,
-    #     Repair.status.in_(["Approved", "In Progress"])
-    # ).all()
+    # Only show repairs assigned to the *current_user*; ix_repair_employee_scheduled serves both
+    # the filter and the keyset order, so a page never sorts the mechanic's whole history
+    query = Repair.query.filter_by(employee_id=current_user.id)
+    status = request.args.get("status")
+    if status:
+        query = query.filter_by(status=status)
+    query = filter_date_range(query, Repair.scheduled_date, start, end)
+    page = keyset_paginate(query, Repair.scheduled_date, Repair.id)
 
-    return render_template(
-        "mechanic_dashboard.html",
-        repairs=assigned_repairs
-    )
+    assigned = render_template("_mechanic_repairs.html", repairs=page.items, page=page)
+    if request.headers.get("X-Live-Fragment"):
+        return assigned  # the live update script only swaps the list
+    return render_template("mechanic_dashboard.html", assigned=Markup(assigned))
 
 @employee.route("/receptionist_dashboard")
 @login_required                # Must be logged in
@@ -62,18 +73,36 @@ def receptionist_dashboard():
     """
     📞 Receptionist Dashboard
     -------------------------
-    - Displays a list of all 'Pending' repairs which need approval.
+    - Displays the 'Pending' repairs which need approval, one page at a time.
     - Receptionist can either approve these repairs or reschedule them.
-      via different buttons.
+      via different buttons, or select several and approve / assign / re-status them at once.
+    - Optional query parameters: status (default 'Pending'), start / end (YYYY-MM-DD),
+      per_page, after.
 
     Returns:
         - A template that shows pending repairs with 'Approve' and 'Reschedule' options.
     """
-    # Query all repairs that are currently in 'Pending' status.
-    pending_repairs = Repair.query.filter_by(status="Pending").all()
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError:
+        flash("Invalid date format. Use YYYY-MM-DD.", "error")
+        return redirect(url_for("employee.receptionist_dashboard"))
+
+    status = request.args.get("status") or "Pending"
 
-    # Render a template listing these pending repairs.
-    return render_template("receptionist_dashboard.html", repairs=pending_repairs)
+    def render_queue():
+        # Repairs in the requested status (served by ix_repair_status_scheduled)
+        query = filter_date_range(Repair.query.filter_by(status=status), Repair.scheduled_date, start, end)
+        page = keyset_paginate(query, Repair.scheduled_date, Repair.id)
+        return render_template("_repair_queue.html", repairs=page.items, page=page), None
+
+    # Render a template listing these pending repairs (the list itself is a cached fragment).
+    repair_queue = cached_fragment([REPAIRS], render_queue)
+    if request.headers.get("X-Live-Fragment"):
+        return repair_queue  # the live update script only swaps the list
+    mechanics = db.session.query(Employee.id, Employee.name).filter_by(role="Mechanic").order_by(Employee.name).all()
+    return render_template("receptionist_dashboard.html", status=status, repair_queue=repair_queue,
+                           mechanics=mechanics, batch_statuses=repair_batch.BATCH_STATUSES)
 
 @employee.route("/stockkeeper_dashboard")
 @login_required                # Must be logged in
@@ -82,14 +111,41 @@ def stockkeeper_dashboard():
     """
     📦 StockKeeper Dashboard
     ------------------------
-    Displays an overview of the consumables stock. Provides links to check low stock
-    or manually replenish items.
+    Displays an overview of the consumables stock, one page at a time. Provides links
+    to check low stock or manually replenish items.
+    Optional query parameters: low=1 (only items at or below threshold), per_page, after.
     """
-    # For a simple approach, list all consumables so the user can see the entire inventory.
-    consumables = Consumable.query.all()
-
-    # Render a template that shows the current stock
-    return render_template("stockkeeper_dashboard.html", consumables=consumables)
+    def render_stock():
+        query = Consumable.query
+        if request.args.get("low"):
+            query = query.filter(Consumable.low_stock_filter())
+        page = keyset_paginate(query, Consumable.id, Consumable.id)
+        return render_template("_stock_table.html", consumables=page.items, page=page), None
+
+    # Render a template that shows the current stock (the table is a cached fragment)
+    stock_table = cached_fragment([STOCK], render_stock)
+    if request.headers.get("X-Live-Fragment"):
+        return stock_table  # the live update script only swaps the table
+    return render_template("stockkeeper_dashboard.html", stock_table=stock_table)
+
+@employee.route("/live")
+@login_required
+def live_updates():
+    """
+    📡 Server-Sent Events stream of repair, stock and elevator changes for the current
+    employee: their role's events plus the repairs assigned to them.
+    Dashboards re-fetch their list when an event arrives instead of reloading the page.
+    Browsers reconnect on their own and resume after the Last-Event-ID they received.
+    """
+    if getattr(current_user, "role", None) is None:
+        abort(403)
+    body = live.event_stream(
+        current_app._get_current_object(),
+        live.user_topics(current_user),
+        request.headers.get("Last-Event-ID", type=int),
+    )
+    return Response(body, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @employee.route('/dashboard')
 @login_required
@@ -106,36 +162,177 @@ def dashboard():
 @role_required("Manager")
 def revenue_report():
     """
-    💰 Manager route to generate a basic revenue report using pandas + numpy.
-    - Summation of 'cost' from completed repairs.
+    💰 Manager route to generate a revenue report.
+    - Summation of 'cost' from billed repairs, aggregated in SQL (see app/reporting.py).
+    - Query parameters:
+        start / end (YYYY-MM-DD): optional inclusive window on the scheduled date.
+        group_by: status (default), elevator, month, week or day.
     """
-    repairs = Repair.query.filter(Repair.cost != None).all()
-    if not repairs:
+    group_by = request.args.get("group_by", "status")
+    if group_by not in GROUPINGS:
+        flash(f"Unknown grouping '{group_by}'.", "error")
+        return redirect(url_for("employee.revenue_report"))
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError:
+        flash("Invalid date format. Use YYYY-MM-DD.", "error")
+        return redirect(url_for("employee.revenue_report"))
+
+    repair_count, total_revenue = revenue_totals(start, end)
+    if not repair_count and start is None and end is None:
         flash("No completed repairs yet. No revenue data.", "info")
         return redirect(url_for("employee.manager_dashboard"))
 
-    # Convert repairs to a DataFrame
-    data = [
-        {
-            "repair_id": r.id,
-            "cost": r.cost,
-            "status": r.status,
-            "date": r.scheduled_date
-        }
-        for r in repairs
-    ]
-    df = pd.DataFrame(data)
+    # Cost by status is always shown; the selected grouping gets its own table
+    group_status = {row.key: row.revenue for row in revenue_by("status", start, end)}
+    groups = revenue_by(group_by, start, end)
 
-    # Example revenue calculation
-    total_revenue = df["cost"].sum()  # sum of all costs
+    return render_template(
+        "revenue_report.html",
+        total_revenue=total_revenue,
+        repair_count=repair_count,
+        group_status=group_status,
+        groups=groups,
+        group_by=group_by,
+        groupings=GROUPINGS
+    )
 
-    # Group by status for demonstration
-    group_status = df.groupby("status")["cost"].sum().to_dict()
+@employee.route("/revenue_report/pdf")
+@login_required
+@role_required("Manager")
+def revenue_report_pdf():
+    """
+    🖨️ Starts (or serves) the PDF export of the revenue report.
+    - Same 'start' / 'end' query parameters as revenue_report.
+    - If a PDF for the current data already exists on disk it is downloaded right away;
+      otherwise the conversion is queued on the PDF process pool and the user is sent
+      to the polling page (see app/pdf_export.py).
+    """
+    from app import pdf_export  # report-only (process pool), imported on first use
 
+    if not pdf_export.pdf_support_available():
+        flash("PDF export needs pdfkit (and wkhtmltopdf) installed on the server.", "error")
+        return redirect(url_for("employee.revenue_report"))
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError:
+        flash("Invalid date format. Use YYYY-MM-DD.", "error")
+        return redirect(url_for("employee.revenue_report"))
+
+    key = revenue_fingerprint(start, end)
+    status, path = pdf_export.pdf_status(key)
+    if status == "ready":
+        return send_file(path, mimetype="application/pdf", as_attachment=True,
+                         download_name="revenue_report.pdf")
+
+    pdf_export.submit_pdf(key, _revenue_pdf_html(start, end))
+    return redirect(url_for("employee.revenue_report_pdf_status", key=key,
+                            start=request.args.get("start"), end=request.args.get("end")))
+
+def _revenue_pdf_html(start, end):
+    """HTML of the revenue report PDF for a window."""
+    repair_count, total_revenue = revenue_totals(start, end)
     return render_template(
-        "revenue_report.html",
+        "pdf_report.html",
+        now=datetime.now(),
         total_revenue=total_revenue,
-        group_status=group_status
+        group_status={row.key: row.revenue for row in revenue_by("status", start, end)},
+        daily=revenue_by("day", start, end)
+    )
+
+@employee.route("/revenue_report/pdf/<key>")
+@login_required
+@role_required("Manager")
+def revenue_report_pdf_status(key):
+    """
+    🔄 Poll / download endpoint for a queued revenue report PDF.
+    - 200 + file once the PDF is rendered.
+    - 202 + a self-refreshing page while it is still rendering.
+    - The job state is shared on disk, so any worker can answer. If no job is known for
+      'key' (e.g. its worker restarted) and the data still matches, it is queued again;
+      if the data changed meanwhile, a new export is started for the same window.
+    """
+    if not key.isalnum():
+        abort(404)
+    from app import pdf_export
+
+    status, detail = pdf_export.pdf_status(key)
+    if status == "unknown":
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError:
+            abort(404)
+        if revenue_fingerprint(start, end) != key:
+            return redirect(url_for("employee.revenue_report_pdf", start=request.args.get("start"),
+                                    end=request.args.get("end")))
+        status = pdf_export.submit_pdf(key, _revenue_pdf_html(start, end))
+        detail = pdf_export.cached_pdf_path(key)
+    if status == "ready":
+        return send_file(detail, mimetype="application/pdf", as_attachment=True,
+                         download_name="revenue_report.pdf")
+    if status == "pending":
+        return render_template("pdf_status.html", key=key), 202, {"Refresh": "2"}
+    flash(f"PDF rendering failed: {detail}", "error")
+    return redirect(url_for("employee.revenue_report"))
+
+@employee.route("/export_repairs")
+@login_required
+@role_required("Manager")
+def export_repairs():
+    """
+    📤 Streams the repair history (with client, elevator and mechanic) for accounting.
+    - format: csv (default) or ndjson.
+    - Optional filters: start / end (YYYY-MM-DD) on the scheduled date, status.
+    The response is generated chunk by chunk from a streaming cursor, so memory use
+    doesn't grow with the number of repairs.
+    """
+    from app.exports import EXPORT_FORMATS, repair_export_rows, iter_csv, iter_ndjson
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        flash(f"Unknown export format '{fmt}'.", "error")
+        return redirect(url_for("employee.manager_dashboard"))
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError:
+        flash("Invalid date format. Use YYYY-MM-DD.", "error")
+        return redirect(url_for("employee.manager_dashboard"))
+
+    rows = repair_export_rows(start, end, request.args.get("status"))
+    if fmt == "csv":
+        body, mimetype = iter_csv(rows), "text/csv"
+    else:
+        body, mimetype = iter_ndjson(rows), "application/x-ndjson"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=repairs.{fmt}"}
+    )
+
+@employee.route("/elevator_usage_report")
+@login_required
+@role_required("Manager")
+def elevator_usage_report():
+    """
+    🏗️ Elevator usage over a date window (default: the last 30 days):
+    repairs scheduled, hours booked by repairs and hours blocked for maintenance.
+    Aggregated in SQL and memoized until the next repair/elevator write (see app/usage.py).
+    """
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError:
+        flash("Invalid date format. Use YYYY-MM-DD.", "error")
+        return redirect(url_for("employee.elevator_usage_report"))
+
+    today = reservations.local_now().date()
+    end = end or today + timedelta(days=1)
+    start = start or end - timedelta(days=30)
+    report = elevator_usage(start, end)
+    return render_template(
+        "elevator_usage_report.html",
+        report=report,
+        start=start,
+        end=end - timedelta(days=1)
     )
 
 # -----------------------------
@@ -159,12 +356,24 @@ def approve_repair(repair_id):
         or an error if something goes wrong."""
     # Fetch the repair to be approved
     repair = Repair.query.get_or_404(repair_id)
+    try:
+        hours = dispatch.parse_estimated_hours(request.form.get("estimated_hours"))
+    except ValueError as exc:
+        flash(str(exc), "error")
+        return redirect(url_for("employee.receptionist_dashboard"))
 
-    # Update the status
+    # Update the status (and the work estimate the dispatcher balances on, if one was entered)
     repair.status = "Approved"
+    if hours is not None:
+        repair.estimated_hours = hours
+    assigned = []
+    if current_app.config["AUTO_ASSIGN_ON_APPROVAL"] and repair.employee_id is None:
+        db.session.flush()  # the dispatcher reads the approved status
+        assigned = dispatch.auto_assign([repair.id])
     db.session.commit()
 
-    flash(f"Repair #{repair_id} has been approved successfully!", "success")
+    flash(f"Repair #{repair_id} has been approved successfully!"
+          + "".join(f" {r['detail']}" for r in assigned), "success")
     return redirect(url_for("employee.receptionist_dashboard"))
 
 @employee.route("/reschedule_repair/<int:repair_id>", methods=["GET", "POST"])
@@ -175,8 +384,11 @@ def reschedule_repair(repair_id):
     🗓️ Reschedule a Repair
     ----------------------
     - Allows the Receptionist to change the date/time and elevator assignment of a given repair.
-    - GET request: Show a form with current repair details and available elevators.
-    - POST request: Saves new date/elevator, updates the old elevator to 'Available'.
+    - GET request: Show a form with current repair details and the elevators.
+    - POST request: Moves the repair's reservation to the new slot/elevator if it is free
+      (the repair's own current slot doesn't count as a conflict). Nothing is changed until
+      the new elevator is claimed (compare-and-set, see reservations.claim_elevator); losing
+      that race re-renders the form with 409.
 
     Args:
         repair_id (int): The unique ID of the repair in the database.
@@ -189,8 +401,9 @@ def reschedule_repair(repair_id):
     repair = Repair.query.get_or_404(repair_id)
 
     if request.method == "POST":
-        # Retrieve new date and elevator ID from form
+        # Retrieve new date, optional time and elevator ID from form
         new_date_str = request.form.get("new_date")
+        new_time_str = request.form.get("new_time")
         new_elevator_id = request.form.get("elevator_id")
 
         # Validate the input
@@ -198,41 +411,38 @@ def reschedule_repair(repair_id):
             flash("Both new date and elevator selection are required.", "error")
             return redirect(url_for("employee.reschedule_repair", repair_id=repair_id))
 
-        # Convert the new date from string (YYYY-MM-DD) to a datetime object
-        # using Europe's Bucharest timezone for example
-        eet = pytz.timezone("Europe/Bucharest")
+        # Convert the new date (and optional HH:MM time) to a datetime object
+        # in Europe's Bucharest timezone
         try:
-            dt_obj = datetime.strptime(new_date_str, "%Y-%m-%d")
-            dt_obj = eet.localize(dt_obj)
+            dt_obj = reservations.parse_start(new_date_str, new_time_str)
         except ValueError:
             flash("Invalid date format. Use YYYY-MM-DD.", "error")
             return redirect(url_for("employee.reschedule_repair", repair_id=repair_id))
 
-        # Free up the old elevator (set status back to 'Available') if needed
-        old_elevator = Elevator.query.get(repair.elevator_id)
-        if old_elevator:
-            old_elevator.status = "Available"
-
-        # Mark the new elevator as 'Occupied'
         new_elevator = Elevator.query.get(new_elevator_id)
         if not new_elevator:
             flash("Selected elevator not found.", "error")
             return redirect(url_for("employee.reschedule_repair", repair_id=repair_id))
-
-        # If the new elevator is not 'Available', we cannot assign it
-        if new_elevator.status != "Available":
-            flash(f"Elevator #{new_elevator.id} is not available!", "error")
-            # Revert the old elevator status if needed
-            if old_elevator:
-                old_elevator.status = "Occupied"  # or whatever it was
+        seen_version = new_elevator.booking_version  # read before the availability check
+
+        # The new slot must be free on the new elevator (ignoring this repair's own booking)
+        start, end = reservations.repair_slot(dt_obj)
+        if not reservations.is_free(new_elevator.id, start, end, exclude_repair_id=repair.id):
+            suggestion = reservations.earliest_free_slot(new_elevator.id, start, end - start)
+            flash(f"Elevator #{new_elevator.id} is not available at that time! "
+                  f"Earliest free slot: {suggestion.strftime('%Y-%m-%d %H:%M')}.", "error")
             return redirect(url_for("employee.reschedule_repair", repair_id=repair_id))
 
-        # Occupy the new elevator
-        new_elevator.status = "Occupied"
+        if not reservations.claim_elevator(new_elevator.id, seen_version):
+            db.session.rollback()
+            flash(f"Elevator #{new_elevator.id} was just booked by someone else. "
+                  "Please check the time and submit again.", "error")
+            return render_reschedule_form(repair), 409
 
-        # Update the repair's date and elevator
+        # Update the repair's date and elevator, then move its reservation
         repair.scheduled_date = dt_obj
         repair.elevator_id = new_elevator.id
+        reservations.book_repair(repair, start, end)
 
         # Optionally reset the status if you'd like to mark it 'Pending' again,
         # or keep it 'Approved' if it was already approved. Up to your business logic.
@@ -245,14 +455,18 @@ def reschedule_repair(repair_id):
         flash(f"Repair #{repair_id} rescheduled successfully!", "success")
         return redirect(url_for("employee.receptionist_dashboard"))
 
-    # If GET request, fetch all available elevators for the user to choose from
-    available_elevators = Elevator.query.filter_by(status="Available").all()
+    return render_reschedule_form(repair)
+
 
-    # Render a template with a form to pick the new date and elevator
+def render_reschedule_form(repair):
+    """Renders the form to pick the new date and elevator of a repair
+    (availability is checked per slot on POST)."""
+    elevators = Elevator.query.order_by(Elevator.id).all()
     return render_template(
         "reschedule_repair.html",
         repair=repair,
-        elevators=available_elevators
+        elevators=elevators,
+        statuses=reservations.current_statuses()
     )
 
 @employee.route("/assign_mechanic/<int:repair_id>", methods=["GET", "POST"])
@@ -287,9 +501,16 @@ def assign_mechanic(repair_id):
         if not mechanic:
             flash("Selected user is not a mechanic!", "error")
             return redirect(url_for("employee.assign_mechanic", repair_id=repair.id))
+        try:
+            hours = dispatch.parse_estimated_hours(request.form.get("estimated_hours"))
+        except ValueError as exc:
+            flash(str(exc), "error")
+            return redirect(url_for("employee.assign_mechanic", repair_id=repair.id))
 
         # Assign repair to this mechanic
         repair.employee_id = mechanic.id
+        if hours is not None:
+            repair.estimated_hours = hours
         # Optionally set status to 'In Progress' or keep 'Approved'
         if repair.status == "Pending":
             repair.status = "Approved"  # or "In Progress"
@@ -304,6 +525,146 @@ def assign_mechanic(repair_id):
     return render_template("assign_mechanic.html", repair=repair, mechanics=mechanics)
 
 
+@employee.route("/repairs/batch", methods=["POST"])
+@login_required
+@role_required("Receptionist")
+def batch_repairs():
+    """
+    📋 Batch Repair Actions
+    -----------------------
+    Applies one action to many repairs in a single transaction (see app/repair_batch.py).
+    Accepts the receptionist dashboard's form or a JSON body with the same fields:
+      - action: 'approve', 'assign' (needs mechanic_id) or 'status' (needs status).
+      - repair_ids: the selected repair IDs.
+
+    Returns:
+        JSON {"action", "results": [{"id", "outcome", "detail"}], "summary"} for JSON requests,
+        otherwise a flashed summary and a redirect to 'receptionist_dashboard'.
+        400 on invalid input, 409 if a selected repair changed meanwhile (nothing is applied).
+    """
+    wants_json = request.is_json or request.accept_mimetypes.best == "application/json"
+    data = request.get_json(silent=True) if request.is_json else None
+    if data is None:
+        data = {"action": request.form.get("action"),
+                "repair_ids": request.form.getlist("repair_ids"),
+                "mechanic_id": request.form.get("mechanic_id"),
+                "status": request.form.get("status")}
+
+    def fail(message, code):
+        if wants_json:
+            return {"error": message}, code
+        flash(message, "error")
+        return redirect(url_for("employee.receptionist_dashboard"))
+
+    if not isinstance(data, dict):
+        return fail("Expected a JSON object.", 400)
+    action = data.get("action")
+    if action not in repair_batch.ACTIONS:
+        return fail(f"Unknown action: {action}", 400)
+    repair_ids = data.get("repair_ids")
+    if repair_ids is None:
+        repair_ids = []
+    if not isinstance(repair_ids, list):
+        return fail("repair_ids must be a list of repair IDs.", 400)
+    try:
+        repair_ids = repair_batch.parse_repair_ids(repair_ids)
+    except ValueError as exc:
+        return fail(str(exc), 400)
+    if not repair_ids:
+        return fail("Select at least one repair.", 400)
+
+    try:
+        if action == repair_batch.APPROVE:
+            results = repair_batch.approve_repairs(repair_ids)
+            if current_app.config["AUTO_ASSIGN_ON_APPROVAL"]:
+                approved = [r["id"] for r in results if r["outcome"] == repair_batch.UPDATED]
+                assigned = {r["id"]: r["detail"] for r in dispatch.auto_assign(approved)}
+                for result in results:
+                    if result["id"] in assigned:
+                        result["detail"] += f" {assigned[result['id']]}"
+        elif action == repair_batch.ASSIGN:
+            mechanic = Employee.query.filter_by(id=data.get("mechanic_id"), role="Mechanic").first()
+            if not mechanic:
+                return fail("Selected user is not a mechanic!", 400)
+            results = repair_batch.assign_repairs(repair_ids, mechanic)
+        else:
+            results = repair_batch.set_repairs_status(repair_ids, data.get("status"))
+        db.session.commit()
+    except ValueError as exc:
+        db.session.rollback()
+        return fail(str(exc), 400)
+    except repair_batch.BatchConflict as exc:
+        db.session.rollback()
+        return fail(str(exc), 409)
+
+    # Core UPDATEs: the commit listeners didn't see these writes
+    invalidate_fragments(REPAIRS)
+    live.broker.wake()
+
+    summary = repair_batch.summarize(results)
+    if wants_json:
+        return {"action": action, "results": results, "summary": summary}
+    changed = summary.get(repair_batch.UPDATED, 0)
+    flash(f"{changed} of {len(results)} repairs updated.", "success" if changed else "info")
+    skipped = [r for r in results if r["outcome"] in (repair_batch.REJECTED, repair_batch.NOT_FOUND)]
+    if skipped:
+        details = "; ".join(f"#{r['id']} {r['detail']}" for r in skipped[:10])
+        flash(f"Skipped {len(skipped)}: {details}{' ...' if len(skipped) > 10 else ''}", "error")
+    return redirect(url_for("employee.receptionist_dashboard"))
+
+
+@employee.route("/auto_assign", methods=["POST"])
+@login_required
+@role_required("Receptionist")
+def auto_assign():
+    """
+    ⚖️ Automatic Mechanic Assignment
+    --------------------------------
+    Gives every approved, unassigned repair (earliest first, up to the batch limit) to the
+    mechanic with the least open work (see app/dispatch.py).
+    With simulate=1 nothing is written: the response reports the expected queue wait times
+    (optionally with extra_mechanics more idle mechanics) instead.
+
+    Returns:
+        JSON for JSON requests (the per-repair results or the simulation report),
+        otherwise a flashed summary and a redirect to 'receptionist_dashboard'.
+    """
+    wants_json = request.is_json or request.accept_mimetypes.best == "application/json"
+    data = (request.get_json(silent=True) if request.is_json else None) or request.form
+
+    if data.get("simulate"):
+        try:
+            extra = max(0, int(data.get("extra_mechanics") or 0))
+        except (TypeError, ValueError):
+            extra = 0
+        report = dispatch.simulate(extra_mechanics=extra)
+        if wants_json:
+            return report
+        waits = report["wait_hours"]
+        flash(f"Simulation: {report['assigned']} of {report['repairs']} waiting repairs over "
+              f"{report['mechanics']} mechanics; wait {waits['mean']} h on average, "
+              f"{waits['p95']} h at p95, {waits['max']} h at most.", "info")
+        return redirect(url_for("employee.receptionist_dashboard"))
+
+    try:
+        results = dispatch.auto_assign()
+        db.session.commit()
+    except repair_batch.BatchConflict as exc:
+        db.session.rollback()
+        if wants_json:
+            return {"error": str(exc)}, 409
+        flash(str(exc), "error")
+        return redirect(url_for("employee.receptionist_dashboard"))
+
+    if results:
+        invalidate_fragments(REPAIRS)
+        live.broker.wake()
+    if wants_json:
+        return {"results": results, "summary": repair_batch.summarize(results)}
+    flash(f"{len(results)} approved repairs assigned automatically.", "success" if results else "info")
+    return redirect(url_for("employee.receptionist_dashboard"))
+
+
 @employee.route("/assign_to_mechanic/<int:repair_id>", methods=["POST"])
 @login_required
 @role_required("Mechanic")
@@ -345,7 +706,7 @@ def complete_repair(repair_id):
     --------------------
     Mechanic marks the repair as 'Completed', optionally updating
     cost or billing details if the system requires it.
-    Also frees the elevator to 'Available' again (if that is the workflow).
+    Also releases the rest of the repair's elevator reservation.
 
     Args:
         repair_id (int): The repair ID to mark complete.
@@ -364,13 +725,10 @@ def complete_repair(repair_id):
     repair.status = "Completed"
     # Optionally record a completion date or cost
     repair.cost = repair.cost or 100.0  # as an example
-    # If you have a 'completion_date' field, set it:
-    # repair.completion_date = datetime.utcnow()
+    repair.completion_date = reservations.local_now()
 
-    # Free the elevator
-    elevator = Elevator.query.get(repair.elevator_id)
-    if elevator:
-        elevator.status = "Available"
+    # Free the rest of the elevator slot
+    reservations.release_repair(repair)
 
     db.session.commit()
     flash(f"Repair #{repair_id} has been marked Completed.", "success")
@@ -383,14 +741,15 @@ def update_parts_used(repair_id):
     """
     📝 Update Parts Used
     --------------------
-    Allows the mechanic to record which parts or consumables were used
-    during the repair (e.g., 'Oil filter, Spark plugs').
+    Allows the mechanic to record which consumables (and how many of each) were used
+    during the repair.
 
     GET:
-      - Show a form with a text field for parts used.
+      - Show the parts already recorded and a form with name / quantity lines.
     POST:
-      - Save the parts used to 'billing_details' or a dedicated field
-        in the 'Repair' model, then commit changes.
+      - Add the lines to the RepairPart ledger and take them out of stock in the same
+        transaction (see app/stock.py); nothing is saved if any item is short.
+      - billing_details is refreshed with a readable summary of the ledger.
 
     Args:
         repair_id (int): The repair to update.
@@ -407,21 +766,38 @@ def update_parts_used(repair_id):
         return redirect(url_for("employee.mechanic_dashboard"))
 
     if request.method == "POST":
-        parts_used = request.form.get("parts_used")
-        if not parts_used:
+        try:
+            parts = stock.parse_part_lines(request.form.getlist("part_name"),
+                                           request.form.getlist("part_quantity"))
+        except ValueError as exc:
+            flash(str(exc), "error")
+            return redirect(url_for("employee.update_parts_used", repair_id=repair_id))
+        if not parts:
             flash("Please enter the parts used.", "error")
             return redirect(url_for("employee.update_parts_used", repair_id=repair_id))
 
-        # In this example, we reuse 'billing_details' to store parts used
-        # or you can add a new column to your Repair model for 'parts_used'.
-        repair.billing_details = f"Parts Used: {parts_used}"
+        try:
+            stock.use_parts(repair, parts)
+        except (ValueError, stock.InsufficientStock) as exc:
+            db.session.rollback()
+            flash(str(exc), "error")
+            return redirect(url_for("employee.update_parts_used", repair_id=repair_id))
+        repair.billing_details = stock.parts_summary(repair.id)
         db.session.commit()
 
+        # Core UPDATE of the stock: the commit listeners didn't see it
+        invalidate_fragments(STOCK)
+        live.broker.wake()
+
         flash(f"Parts used recorded for repair #{repair.id}.", "success")
         return redirect(url_for("employee.mechanic_dashboard"))
 
-    # If GET, show a form
-    return render_template("update_parts_used.html", repair=repair)
+    # If GET, show the recorded parts and the form
+    consumable_names = db.session.execute(
+        db.select(Consumable.name).order_by(Consumable.name)
+    ).scalars().all()
+    return render_template("update_parts_used.html", repair=repair,
+                           recorded=stock.repair_parts(repair.id), consumable_names=consumable_names)
 
 # -----------------------------
 # Employee Management (Manager)
@@ -444,10 +820,14 @@ def manage_employee():
             email = request.form.get("email")
             role = request.form.get("role")
             salary = float(request.form.get("salary", 0.0))
-            from werkzeug.security import generate_password_hash
-            password = generate_password_hash(
-                request.form.get("password"), method="scrypt"
-            )
+            if Credential.query.filter_by(email=email).first():
+                flash("That email is already used by another account.", "error")
+                return redirect(url_for("employee.manage_employee"))
+            try:
+                password = hash_password(request.form.get("password"))
+            except HashingBusy as busy:
+                flash(f"Server busy, try again in {busy.retry_after} seconds.", "error")
+                return redirect(url_for("employee.manage_employee"))
 
             new_emp = Employee(
                 name=name,
@@ -469,12 +849,17 @@ def manage_employee():
             if emp:
                 db.session.delete(emp)
                 db.session.commit()
+                invalidate_identity(emp)  # log the removed employee out everywhere
                 flash(f"Employee {emp.name} removed.", "info")
             return redirect(url_for("employee.manage_employee"))
 
-    # If GET request, list all employees
-    employees = Employee.query.all()
-    return render_template("manage_employee.html", employees=employees)
+    # If GET request, list employees page by page (optionally one role only)
+    query = Employee.query
+    role = request.args.get("role")
+    if role:
+        query = query.filter_by(role=role)
+    page = keyset_paginate(query, Employee.id, Employee.id)
+    return render_template("manage_employee.html", employees=page.items, page=page)
 
 # -----------------------------
 # Elevator Management (Manager)
@@ -485,8 +870,9 @@ def manage_employee():
 @role_required("Manager")
 def block_elevator():
     """
-    🚧 Allows manager to block an elevator for a certain duration,
-    marking it as 'Occupied' or 'Maintenance' so no new repairs can use it.
+    🚧 Allows manager to block an elevator for a certain duration, starting now.
+    The block is a 'Maintenance' reservation, so no new repairs can use the elevator
+    in that window and it frees itself automatically when the window ends.
     """
     if request.method == "POST":
         elevator_id = request.form.get("elevator_id")
@@ -497,27 +883,48 @@ def block_elevator():
             flash("Elevator not found!", "error")
             return redirect(url_for("employee.block_elevator"))
 
-        if duration == "half_day":
-            # Just as an example, we set status = 'Maintenance'
-            elevator.status = "Maintenance"
-            # Optionally track a time when it becomes available again
-        elif duration == "full_day":
-            elevator.status = "Maintenance"
-        elif duration == "week":
-            elevator.status = "Maintenance"
-        elif duration == "month":
-            elevator.status = "Maintenance"
-        else:
+        if duration not in reservations.BLOCK_DURATIONS:
             flash("Invalid duration selected.", "error")
             return redirect(url_for("employee.block_elevator"))
+        seen_version = elevator.booking_version  # read before the availability check
+
+        start = reservations.local_now()
+        end = start + reservations.BLOCK_DURATIONS[duration]
+        if reservations.block(elevator.id, start, end) is None:
+            flash(f"Elevator {elevator.id} has bookings in that period. "
+                  "Reschedule them before blocking it.", "error")
+            return redirect(url_for("employee.block_elevator"))
+
+        # A repair booked in the meantime could fall inside the block window
+        if not reservations.claim_elevator(elevator.id, seen_version):
+            db.session.rollback()
+            flash(f"Elevator {elevator.id} was just booked by someone else. "
+                  "Check its bookings and try again.", "error")
+            return render_block_form(), 409
 
         db.session.commit()
-        flash(f"Elevator {elevator.id} blocked for {duration}.", "success")
+        flash(f"Elevator {elevator.id} blocked for {duration} "
+              f"(until {end.strftime('%Y-%m-%d %H:%M')}).", "success")
         return redirect(url_for("employee.block_elevator"))
 
-    # GET request: show a form to select an elevator, choose a duration
-    elevators = Elevator.query.all()
-    return render_template("block_elevator.html", elevators=elevators)
+    return render_block_form()
+
+
+def render_block_form():
+    """Renders the form to select an elevator and choose a block duration."""
+
+    def render_options():
+        # Statuses change by themselves when a reservation starts or ends
+        now = reservations.local_now()
+        html = render_template(
+            "_elevator_options.html",
+            elevators=Elevator.query.order_by(Elevator.id).all(),
+            statuses=reservations.current_statuses(now)
+        )
+        return html, reservations.next_status_change(now)
+
+    return render_template("block_elevator.html",
+                           elevator_options=cached_fragment([ELEVATORS], render_options))
 
 @employee.route("/unblock_elevator", methods=["GET", "POST"])
 @login_required
@@ -526,34 +933,35 @@ def unblock_elevator():
     """
     🔓 Unblock Elevator
     ------------------
-    Allows the Manager to set an elevator's status back to 'Available'.
-    This can be used after it was blocked for maintenance or a set duration.
+    Allows the Manager to end an elevator's maintenance block early.
+    Repair bookings are not affected.
 
     GET:
-      - List all elevators that are not 'Available'.
+      - List the current and upcoming maintenance blocks.
     POST:
-      - Sets the chosen elevator's status to 'Available'.
+      - Ends (or removes) the chosen maintenance block; other blocks of the elevator stay.
     """
-    from app.models.elevator import Elevator
-
     if request.method == "POST":
-        elevator_id = request.form.get("elevator_id")
-        elevator = Elevator.query.get(elevator_id)
-
-        if not elevator:
-            flash("Elevator not found!", "error")
+        # End the chosen maintenance reservation
+        block = reservations.unblock(request.form.get("reservation_id", type=int))
+        if not block:
+            flash("Maintenance block not found!", "error")
             return redirect(url_for("employee.unblock_elevator"))
-
-        # Set status back to 'Available'
-        elevator.status = "Available"
+        elevator_id, start, end = block.elevator_id, block.start_time, block.end_time
         db.session.commit()
 
-        flash(f"Elevator {elevator.id} is now unblocked (Available).", "success")
+        flash(f"Elevator {elevator_id}: maintenance block {start.strftime('%Y-%m-%d %H:%M')} - "
+              f"{end.strftime('%Y-%m-%d %H:%M')} ended.", "success")
         return redirect(url_for("employee.unblock_elevator"))
 
-    # If GET, fetch all elevators that are not 'Available'
-    blocked_elevators = Elevator.query.filter(Elevator.status != "Available").all()
-    return render_template("unblock_elevator.html", elevators=blocked_elevators)
+    # If GET, list the maintenance blocks that haven't ended yet
+    def render_blocks():
+        blocks = reservations.maintenance_blocks()
+        html = render_template("_maintenance_blocks.html", blocks=blocks)
+        return html, min((b.end_time for b in blocks), default=None)
+
+    return render_template("unblock_elevator.html",
+                           maintenance_blocks=cached_fragment([ELEVATORS], render_blocks))
 
 # -----------------------------
 # Stock Management (StockKeeper)
@@ -568,11 +976,15 @@ def check_stock():
     ----------------------------
     Finds consumables below their threshold, prompting the StockKeeper
     to replenish them.
+    The list comes from the worker's low-stock mirror (see app/low_stock.py): no query
+    unless stock changed since it was last loaded, and then one seek on ix_consumable_low.
     """
-    # Query all consumables whose quantity <= threshold
-    low_stock_items = Consumable.query.filter(Consumable.quantity <= Consumable.threshold).all()
+    low_stock_items = low_stock.tracker.items()
 
-    return render_template("low_stock_alerts.html", low_stock_items=low_stock_items)
+    table = render_template("_low_stock_table.html", low_stock_items=low_stock_items)
+    if request.headers.get("X-Live-Fragment"):
+        return table  # the live update script only swaps the list
+    return render_template("low_stock_alerts.html", low_stock_table=Markup(table))
 
 
 @employee.route("/replenish_stock/<int:consumable_id>", methods=["POST"])
@@ -582,21 +994,20 @@ def replenish_stock(consumable_id):
     """
     🔄 Replenish a Specific Consumable
     ----------------------------------
-    Increases the quantity of a consumable by a fixed reorder amount,
-    or a user-specified amount.
-    This route expects a POST with 'reorder_amount' or uses a default.
+    Increases the quantity of a consumable by a user-specified amount,
+    or by the item's reorder policy (see Consumable.order_quantity).
+    This route expects a POST with 'reorder_amount' or uses the policy.
 
     Args:
         consumable_id (int): The ID of the consumable to replenish.
     """
     consumable = Consumable.query.get_or_404(consumable_id)
 
-    # Let’s assume we have a hidden field or a standard reorder increment
-    reorder_str = request.form.get("reorder_amount", "10")  # default 10
+    # An explicit amount from the form, otherwise the item's reorder policy
     try:
-        reorder_amount = int(reorder_str)
+        reorder_amount = int(request.form.get("reorder_amount") or consumable.order_quantity())
     except ValueError:
-        reorder_amount = 10
+        reorder_amount = consumable.order_quantity()
 
     # Increase the quantity
     consumable.quantity += reorder_amount
@@ -612,16 +1023,66 @@ def mass_replenish():
     """
     🚚 Mass Replenish All Low-Stock Items
     -------------------------------------
-    Example route: Finds all low-stock consumables and replenishes
-    each by a default reorder amount or the 'reorder_amount' column
-    in the Consumable model.
+    Restocks every low-stock consumable by its reorder policy (reorder quantity, capped at
+    the max level) with a single UPDATE (see app/stock.py).
+    With dry_run=1 nothing is changed: the purchase order that would be placed is shown
+    instead (as JSON for JSON requests).
     """
-    low_stock_items = Consumable.query.filter(Consumable.quantity <= Consumable.threshold).all()
+    wants_json = request.is_json or request.accept_mimetypes.best == "application/json"
+    data = (request.get_json(silent=True) if request.is_json else None) or request.form
+
+    if data.get("dry_run"):
+        order = stock.purchase_order()
+        if wants_json:
+            return order
+        return render_template("purchase_order.html", order=order)
 
-    for item in low_stock_items:
-        # Suppose each item has a reorder_amount field
-        item.quantity +=  item.threshold  # or item.reorder_amount
+    restocked = stock.mass_replenish()
     db.session.commit()
+    if restocked:
+        # Core UPDATE: the commit listeners didn't see it
+        invalidate_fragments(STOCK)
+        live.broker.wake()
+
+    if wants_json:
+        return {"restocked": restocked}
+    flash(f"{restocked} low-stock items have been replenished!", "success" if restocked else "info")
+    return redirect(url_for("employee.stockkeeper_dashboard"))
+
+
+@employee.route("/reorder_policy/<int:consumable_id>", methods=["GET", "POST"])
+@login_required
+@role_required("StockKeeper")
+def reorder_policy(consumable_id):
+    """
+    📐 Reorder Policy of a Consumable
+    ---------------------------------
+    GET: Shows the item's reorder quantity, max level and supplier lead time.
+    POST: Saves them. Empty reorder quantity / max level fall back to the threshold / no cap.
+
+    Args:
+        consumable_id (int): The ID of the consumable.
+    """
+    consumable = Consumable.query.get_or_404(consumable_id)
+
+    if request.method == "POST":
+        try:
+            values = {}
+            for field in ("reorder_quantity", "max_level", "lead_time_days"):
+                raw = (request.form.get(field) or "").strip()
+                values[field] = int(raw) if raw else None
+                if values[field] is not None and values[field] < 0:
+                    raise ValueError
+        except ValueError:
+            flash("Reorder quantity, max level and lead time must be whole numbers of 0 or more.", "error")
+            return redirect(url_for("employee.reorder_policy", consumable_id=consumable.id))
+
+        consumable.reorder_quantity = values["reorder_quantity"]
+        consumable.max_level = values["max_level"]
+        consumable.lead_time_days = values["lead_time_days"] or 0
+        db.session.commit()
+
+        flash(f"Reorder policy of {consumable.name} saved.", "success")
+        return redirect(url_for("employee.stockkeeper_dashboard"))
 
-    flash(f"All low-stock items have been replenished!", "success")
-    return redirect(url_for("employee.stockkeeper_dashboard"))
\ No newline at end of file
+    return render_template("reorder_policy.html", consumable=consumable)
\ No newline at end of file
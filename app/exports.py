@@ -0,0 +1,82 @@
+#This file builds the streaming repair-history exports (CSV and NDJSON) used by accounting.
+#Rows are read with a chunked cursor (yield_per) and encoded chunk by chunk, so memory stays
+#constant no matter how many repairs are exported.
+
+import csv
+import io
+import json
+from app.db_setup import db
+from app.models.repair import Repair
+from app.models.client import Client
+from app.models.credential import Credential
+from app.models.elevator import Elevator
+from app.models.employee import Employee
+from app.utils import filter_date_range
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# Column names of the export, in output order
+EXPORT_COLUMNS = (
+    "repair_id", "scheduled_date", "status", "description", "cost", "billing_details",
+    "client_id", "client_name", "client_email",
+    "elevator_id", "elevator_type",
+    "mechanic_id", "mechanic_name",
+)
+
+
+def repair_export_rows(start=None, end=None, status=None, chunk_size=1000):
+    """
+    🚚 Iterates over repairs joined with client, elevator and mechanic as plain tuples.
+    - Optional window on the scheduled date ([start, end) dates) and status filter.
+    - Rows are fetched 'chunk_size' at a time from a streaming cursor.
+    """
+    query = (
+        db.session.query(
+            Repair.id, Repair.scheduled_date, Repair.status, Repair.description,
+            Repair.cost, Repair.billing_details,
+            Client.id, Client.name, Credential.email,
+            Elevator.id, Elevator.type,
+            Employee.id, Employee.name,
+        )
+        .join(Client, Client.id == Repair.client_id)
+        .join(Credential, Credential.id == Client.credential_id)
+        .join(Elevator, Elevator.id == Repair.elevator_id)
+        .outerjoin(Employee, Employee.id == Repair.employee_id)
+    )
+    if status:
+        query = query.filter(Repair.status == status)
+    query = filter_date_range(query, Repair.scheduled_date, start, end)
+    query = query.order_by(Repair.id).execution_options(stream_results=True, yield_per=chunk_size)
+    for row in query:
+        yield tuple(row)
+
+
+def _plain(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def iter_csv(rows, chunk_size=1000):
+    """📄 Encodes rows as CSV (header first), yielding one string per chunk of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow([_plain(value) for value in row])
+        if i % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows, chunk_size=1000):
+    """🧾 Encodes rows as newline-delimited JSON objects, yielding one string per chunk of rows."""
+    lines = []
+    for row in rows:
+        record = {key: _plain(value) for key, value in zip(EXPORT_COLUMNS, row)}
+        lines.append(json.dumps(record))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
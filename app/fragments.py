@@ -0,0 +1,217 @@
+#This file caches rendered HTML fragments of the dashboards (stock list, repair queue, elevator
+#pickers). A fragment is keyed by role, view and request filters, plus the current generation of
+#every data tag it depends on. Committing a write to a tag's models bumps that tag's generation
+#file, so every dependent entry in every worker becomes unreachable at once; LRU eviction and a
+#TTL clean them up. Entries live per process ('memory') or in a directory all workers share
+#('filesystem').
+
+import glob
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime
+from flask import current_app, request
+from flask_login import current_user
+from markupsafe import Markup
+from sqlalchemy import event
+from app.cache import TTLCache
+from app.db_setup import db
+from app.models.consumable import Consumable
+from app.models.elevator import Elevator
+from app.models.repair import Repair
+from app.models.reservation import ElevatorReservation
+from app.reservations import local_now
+
+STOCK = "stock"
+REPAIRS = "repairs"
+ELEVATORS = "elevators"
+
+# 🏷️ Which committed model writes invalidate which tag
+TAGGED_MODELS = {
+    Consumable: STOCK,
+    Repair: REPAIRS,
+    Elevator: ELEVATORS,
+    ElevatorReservation: ELEVATORS,
+}
+
+
+class FileFragmentStore:
+    """
+    🗄️ Fragment store shared by the worker processes of one host: one file per entry in
+    'directory'. A hit refreshes the file's mtime, so pruning the oldest files is LRU.
+
+    Attributes:
+        directory (str): Folder holding the entries.
+        maxsize (int): Entries kept before the least recently used are deleted.
+        ttl (float): Seconds an entry stays valid after it was stored or last read.
+    """
+
+    PRUNE_EVERY = 32  # stores between two directory scans
+
+    def __init__(self, directory, maxsize=512, ttl=600.0):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._stores = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest() + ".frag")
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            if os.stat(path).st_mtime + self.ttl < time.time():
+                return default
+            with open(path, encoding="utf-8") as f:
+                valid_until, html = f.read().split("\n", 1)
+            os.utime(path, None)
+            return html, (None if valid_until == "-" else datetime.fromisoformat(valid_until))
+        except (OSError, ValueError):
+            return default
+
+    def set(self, key, value):
+        html, valid_until = value
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"{valid_until.isoformat() if valid_until else '-'}\n{html}")
+        os.replace(tmp_path, path)  # readers never see a half-written entry
+        self._stores += 1
+        if self._stores % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        """Deletes the least recently used entries above maxsize."""
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "*.frag")):
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except OSError:
+                continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.maxsize)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, "*.frag")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# 🧩 Active store (replaced by init_fragment_cache according to the app config)
+fragment_store = TTLCache(maxsize=512, ttl=600.0)
+
+
+def init_fragment_cache(app):
+    """
+    ⚙️ Applies the fragment cache settings from the app config.
+    - FRAGMENT_CACHE_BACKEND: 'memory' (per worker process), 'filesystem' (shared by the
+      workers of this host through FRAGMENT_CACHE_DIR) or 'off'.
+    - FRAGMENT_CACHE_SIZE: maximum number of entries (per process for 'memory').
+    - FRAGMENT_CACHE_TTL: seconds an entry may be served without being re-rendered.
+    - FRAGMENT_STAMP_DIR: folder of the per-tag generation files shared by all workers.
+    """
+    global fragment_store
+    backend = app.config.setdefault("FRAGMENT_CACHE_BACKEND", "memory")
+    size = app.config.setdefault("FRAGMENT_CACHE_SIZE", 512)
+    ttl = app.config.setdefault("FRAGMENT_CACHE_TTL", 600.0)
+    directory = app.config.setdefault(
+        "FRAGMENT_CACHE_DIR", os.path.join(app.instance_path, "fragment_cache")
+    )
+    app.config.setdefault("FRAGMENT_STAMP_DIR", os.path.join(app.instance_path, "fragment_stamps"))
+    if backend == "filesystem":
+        fragment_store = FileFragmentStore(directory, maxsize=size, ttl=ttl)
+    elif backend == "memory":
+        fragment_store = TTLCache(maxsize=size, ttl=ttl)
+    else:
+        fragment_store = None
+
+
+def _generation_path(tag):
+    return os.path.join(current_app.config["FRAGMENT_STAMP_DIR"], tag)
+
+
+def tag_generation(tag):
+    """Current generation token of a tag ('' until the tag is first invalidated)."""
+    try:
+        with open(_generation_path(tag), encoding="ascii") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def invalidate_fragments(*tags):
+    """
+    🧹 Starts a new generation of each tag, in this process and every other worker.
+    Called automatically after commits that wrote a tagged model; call it directly after
+    set-based (Core) UPDATEs and in scripts that bypass the ORM session.
+    """
+    directory = current_app.config["FRAGMENT_STAMP_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    for tag in tags:
+        path = _generation_path(tag)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="ascii") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, path)
+
+
+def cached_fragment(tags, render):
+    """
+    🧩 Returns the HTML fragment of the current view, rendering it only on a miss.
+
+    Args:
+        tags: Data tags (STOCK, REPAIRS, ELEVATORS) the fragment is built from.
+        render: Callable returning (html, valid_until). valid_until is a local datetime
+            after which the fragment is stale even without writes (or None).
+
+    The key is the user's role, the endpoint and the query string, so the fragment must
+    only depend on those and on the tagged data (nothing user- or flash-specific).
+    """
+    if fragment_store is None:
+        return Markup(render()[0])
+    # Generations are read before rendering: a write committed meanwhile stores the new
+    # fragment under the old generation, where it is never served.
+    key = (
+        getattr(current_user, "role", "client"),
+        request.endpoint,
+        tuple(sorted(request.args.items(multi=True))),
+        tuple(tag_generation(tag) for tag in tags),
+    )
+    entry = fragment_store.get(key)
+    if entry is not None:
+        html, valid_until = entry
+        if valid_until is None or local_now() < valid_until:
+            return Markup(html)
+    html, valid_until = render()
+    fragment_store.set(key, (str(html), valid_until))
+    return Markup(html)
+
+
+@event.listens_for(db.session, "after_flush")
+def _note_tagged_writes(session, flush_context):
+    """Remembers which fragment tags this transaction wrote to."""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        for model, tag in TAGGED_MODELS.items():
+            if isinstance(obj, model):
+                session.info.setdefault("fragment_tags", set()).add(tag)
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_tagged_fragments(session):
+    """Invalidates the fragments of every tag written by the committed transaction."""
+    tags = session.info.pop("fragment_tags", None)
+    if tags:
+        invalidate_fragments(*sorted(tags))
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_tagged_writes(session):
+    session.info.pop("fragment_tags", None)
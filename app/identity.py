@@ -0,0 +1,127 @@
+#This file handles the typed session IDs used by Flask-Login and the identity cache behind load_user.
+#Clients and employees live in separate tables with overlapping primary keys, so every session ID
+#carries its account type ("client:3", "employee:3") and resolves with at most one query.
+
+import os
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import class_mapper
+from app.cache import StampFile, TTLCache
+
+CLIENT_PREFIX = "client"
+EMPLOYEE_PREFIX = "employee"
+
+# 🧠 Per-process cache of user snapshots keyed by session ID (sized from app config in init_identity_cache)
+identity_cache = TTLCache(maxsize=1024, ttl=300.0)
+_stamp = StampFile()
+
+
+def make_user_id(prefix, pk):
+    """🏷️ Builds the typed session ID stored by Flask-Login, e.g. 'employee:4'."""
+    return f"{prefix}:{pk}"
+
+
+def init_identity_cache(app):
+    """
+    ⚙️ Applies the identity cache settings from the app config.
+    - IDENTITY_CACHE_SIZE: maximum number of cached users per process.
+    - IDENTITY_CACHE_TTL: seconds before a cached user is re-read from the database.
+    - IDENTITY_STAMP_PATH: file touched to invalidate the caches of every worker process.
+    """
+    identity_cache.maxsize = app.config.setdefault("IDENTITY_CACHE_SIZE", 1024)
+    identity_cache.ttl = app.config.setdefault("IDENTITY_CACHE_TTL", 300.0)
+    app.config.setdefault(
+        "IDENTITY_STAMP_PATH", os.path.join(app.instance_path, "identity.stamp")
+    )
+    from app.db_setup import db  # db_setup imports this module, so db is only available here
+    if not event.contains(db.session, "before_flush", _reject_snapshots):
+        event.listen(db.session, "before_flush", _reject_snapshots)
+
+
+def _reject_snapshots(session, flush_context, instances):
+    """Refuses to flush a cached identity: it would INSERT a copy of the account."""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj.__dict__.get("_identity_snapshot"):
+            raise InvalidRequestError(
+                f"{obj!r} is a cached, read-only identity; query the account again before changing it."
+            )
+
+
+def _stamp_path():
+    from flask import current_app
+    return current_app.config["IDENTITY_STAMP_PATH"]
+
+
+def _check_stamp():
+    """Clears the local cache if another process touched the stamp file since the last check."""
+    if _stamp.changed(_stamp_path()):
+        identity_cache.clear()
+
+
+def _snapshot(user):
+    """Copies the user's column values and login email (not the password hash) into a cacheable tuple."""
+    values = {column.key: getattr(user, column.key) for column in user.__table__.columns}
+    return type(user), values, user.email
+
+
+def _restore(model, values, email):
+    """
+    Rebuilds a detached, read-only user object from a snapshot without touching the database.
+    The email is kept as a plain attribute (no Credential row is attached), and flushing the
+    object is rejected by _reject_snapshots.
+    """
+    user = class_mapper(model).class_manager.new_instance()
+    for key, value in values.items():
+        setattr(user, key, value)
+    user._cached_email = email
+    user._identity_snapshot = True
+    return user
+
+
+def _query_identity(user_id):
+    """Resolves a session ID with a single primary-key lookup."""
+    from app.models.client import Client
+    from app.models.employee import Employee
+
+    prefix, _, pk = str(user_id).rpartition(":")
+    if not pk.isdigit():
+        return None
+    if prefix == CLIENT_PREFIX:
+        return Client.query.get(int(pk))
+    if prefix == EMPLOYEE_PREFIX:
+        return Employee.query.get(int(pk))
+    if not prefix:
+        # Sessions created before typed IDs existed only hold the bare primary key
+        return Client.query.get(int(pk)) or Employee.query.get(int(pk))
+    return None
+
+
+def load_identity(user_id):
+    """
+    🔐 Returns the user for a session ID, served from the identity cache when possible.
+    Cached users are detached snapshots: read their attributes, but query the model
+    again before modifying or deleting the account.
+    """
+    _check_stamp()
+    cached = identity_cache.get(user_id)
+    if cached is not None:
+        return _restore(*cached)
+
+    user = _query_identity(user_id)
+    if user is not None:
+        identity_cache.set(user_id, _snapshot(user))
+    return user
+
+
+def invalidate_identity(user=None):
+    """
+    🧹 Drops cached identities after an account is changed or removed.
+    - Evicts the given user from this process right away.
+    - Touches the stamp file so every other worker (and the web app, when called from a
+      manual_* script) clears its cache on the next request.
+    """
+    if user is not None:
+        identity_cache.pop(user.get_id())
+        identity_cache.pop(str(user.id))
+
+    _stamp.touch(_stamp_path())
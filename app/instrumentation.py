@@ -0,0 +1,204 @@
+#This file contains the opt-in request instrumentation: wall time, SQL statement count and time
+#(SQLAlchemy engine events), template render time and N+1 detection per endpoint. A sampled
+#subset of requests is measured; totals are served as Prometheus text on METRICS_PATH and,
+#optionally, echoed to the browser in a Server-Timing header.
+
+import random
+import threading
+import time
+from collections import Counter
+from flask import before_render_template, g, has_app_context, request, Response, template_rendered
+from sqlalchemy import event
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """
+    📊 Per-process totals of the sampled requests, keyed by endpoint.
+    Each worker process keeps its own registry; Prometheus sums them across scrape targets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()            # (endpoint, method, status) -> count
+        self.duration_sum = Counter()        # endpoint -> seconds
+        self.duration_buckets = {}           # endpoint -> [count per bucket]
+        self.sql_queries = Counter()         # endpoint -> statements
+        self.sql_seconds = Counter()         # endpoint -> seconds
+        self.template_seconds = Counter()    # endpoint -> seconds
+        self.n_plus_one = Counter()          # endpoint -> flagged requests
+
+    def record(self, endpoint, method, status, duration, queries, sql_seconds, template_seconds,
+               n_plus_one):
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            self.duration_sum[endpoint] += duration
+            buckets = self.duration_buckets.setdefault(endpoint, [0] * len(DURATION_BUCKETS))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[i] += 1
+            self.sql_queries[endpoint] += queries
+            self.sql_seconds[endpoint] += sql_seconds
+            self.template_seconds[endpoint] += template_seconds
+            if n_plus_one:
+                self.n_plus_one[endpoint] += 1
+
+    def clear(self):
+        with self._lock:
+            for values in (self.requests, self.duration_sum, self.sql_queries, self.sql_seconds,
+                           self.template_seconds, self.n_plus_one):
+                values.clear()
+            self.duration_buckets.clear()
+
+    def render(self, sample_rate):
+        """📝 Returns the registry in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family("volvo_metrics_sample_rate", "gauge", "Fraction of requests that are measured.")
+            lines.append(f"volvo_metrics_sample_rate {sample_rate}")
+
+            family("volvo_http_requests_total", "counter", "Sampled requests by endpoint, method and status.")
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'volvo_http_requests_total{{endpoint="{endpoint}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+            family("volvo_http_request_duration_seconds", "histogram", "Wall time of sampled requests.")
+            for endpoint, buckets in sorted(self.duration_buckets.items()):
+                total = sum(n for (e, _, _), n in self.requests.items() if e == endpoint)
+                for bound, count in zip(DURATION_BUCKETS, buckets):
+                    lines.append(f'volvo_http_request_duration_seconds_bucket{{endpoint="{endpoint}",'
+                                 f'le="{bound}"}} {count}')
+                lines.append(f'volvo_http_request_duration_seconds_bucket{{endpoint="{endpoint}",'
+                             f'le="+Inf"}} {total}')
+                lines.append(f'volvo_http_request_duration_seconds_sum{{endpoint="{endpoint}"}} '
+                             f'{self.duration_sum[endpoint]:.6f}')
+                lines.append(f'volvo_http_request_duration_seconds_count{{endpoint="{endpoint}"}} {total}')
+
+            for name, values, help_text in (
+                ("volvo_sql_queries_total", self.sql_queries, "SQL statements run by sampled requests."),
+                ("volvo_sql_seconds_total", self.sql_seconds, "Time spent in SQL by sampled requests."),
+                ("volvo_template_seconds_total", self.template_seconds, "Template render time of sampled requests."),
+                ("volvo_n_plus_one_total", self.n_plus_one, "Sampled requests flagged as N+1 query patterns."),
+            ):
+                family(name, "counter", help_text)
+                for endpoint, value in sorted(values.items()):
+                    number = f"{value:.6f}" if isinstance(value, float) else value
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} {number}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class RequestStats:
+    """⏱️ Measurements of the current (sampled) request, kept on flask.g."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.statements = Counter()
+        self._template_starts = []
+
+
+def _stats():
+    """The RequestStats of the current request, or None outside a sampled request."""
+    if not has_app_context():
+        return None
+    return g.get("_request_stats")
+
+
+def init_instrumentation(app, engine):
+    """
+    ⚙️ Installs the request instrumentation if METRICS_ENABLED is set (off by default).
+    - METRICS_SAMPLE_RATE: fraction of requests measured (0.0 - 1.0).
+    - METRICS_PATH: URL of the Prometheus text endpoint.
+    - SERVER_TIMING: add a Server-Timing header (app, db, tpl) to sampled responses.
+    - N_PLUS_ONE_THRESHOLD: a request running the same SELECT this many times is flagged
+      (logged as a warning and counted in volvo_n_plus_one_total).
+    Call it inside an app context, after db.init_app(app).
+    """
+    app.config.setdefault("METRICS_ENABLED", False)
+    app.config.setdefault("METRICS_SAMPLE_RATE", 0.1)
+    app.config.setdefault("METRICS_PATH", "/metrics")
+    app.config.setdefault("SERVER_TIMING", False)
+    app.config.setdefault("N_PLUS_ONE_THRESHOLD", 10)
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    sample_rate = app.config["METRICS_SAMPLE_RATE"]
+    threshold = app.config["N_PLUS_ONE_THRESHOLD"]
+    metrics_path = app.config["METRICS_PATH"]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _sql_started(conn, cursor, statement, parameters, context, executemany):
+        if _stats() is not None:
+            conn.info.setdefault("_query_starts", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+        stats = _stats()
+        starts = conn.info.get("_query_starts")
+        if stats is None or not starts:
+            return
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - starts.pop()
+        if not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            stats.statements[statement] += 1
+
+    def _template_started(sender, template, context, **extra):
+        stats = _stats()
+        if stats is not None:
+            stats._template_starts.append(time.perf_counter())
+
+    def _template_finished(sender, template, context, **extra):
+        stats = _stats()
+        if stats is not None and stats._template_starts:
+            stats.template_seconds += time.perf_counter() - stats._template_starts.pop()
+
+    # Strong references: these handlers are local to this function
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_finished, app, weak=False)
+
+    @app.before_request
+    def _start_request():
+        if request.path != metrics_path and random.random() < sample_rate:
+            g._request_stats = RequestStats()
+
+    @app.after_request
+    def _finish_request(response):
+        stats = g.pop("_request_stats", None)
+        if stats is None:
+            return response
+        duration = time.perf_counter() - stats.started
+        endpoint = request.endpoint or "unmatched"
+
+        repeated = [(sql, n) for sql, n in stats.statements.items() if n >= threshold]
+        for sql, n in repeated:
+            app.logger.warning("Possible N+1 in %s: statement ran %d times: %s",
+                               endpoint, n, " ".join(sql.split())[:200])
+
+        registry.record(endpoint, request.method, response.status_code, duration,
+                        stats.queries, stats.sql_seconds, stats.template_seconds, bool(repeated))
+
+        if app.config["SERVER_TIMING"]:
+            response.headers.add("Server-Timing", ", ".join([
+                f"app;dur={duration * 1000:.1f}",
+                f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries"',
+                f"tpl;dur={stats.template_seconds * 1000:.1f}",
+            ]))
+        return response
+
+    def metrics():
+        """📈 Prometheus text exposition of this process's request metrics."""
+        return Response(registry.render(sample_rate), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule(metrics_path, "metrics", metrics)
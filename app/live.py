@@ -0,0 +1,267 @@
+#This file streams live dashboard updates as Server-Sent Events. Flushes that touch repairs or stock
+#append LiveEvent rows inside the same transaction (so rolled-back changes are never announced);
+#elevator bookings publish nothing, as no page subscribes to them. One broker thread per worker
+#process tails the table by ID and hands each new row to the subscribed streams whose topics
+#match; a commit in this process wakes it up immediately.
+
+import json
+import queue
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import get_history
+from app.db_setup import db
+from app.models.consumable import Consumable
+from app.models.live_event import LiveEvent
+from app.models.repair import Repair
+
+REPAIR = "repair"
+STOCK = "stock"
+LOW_STOCK = "low_stock"  # an item fell to or below its threshold (see app/low_stock.py)
+
+# IDs listed in one event; beyond that the event only carries the count
+MAX_EVENT_IDS = 50
+
+# Rows re-read below the newest seen ID: on server databases a transaction holding a lower ID
+# can commit after a higher one was already delivered
+LOOKBACK_IDS = 200
+
+# Plain rows are enough for streaming (no ORM objects kept alive between requests)
+_EVENT_COLUMNS = db.select(LiveEvent.id, LiveEvent.topic, LiveEvent.kind, LiveEvent.payload)
+
+
+def role_topic(role):
+    return f"role:{role}"
+
+
+def employee_topic(employee_id):
+    return f"employee:{employee_id}"
+
+
+def user_topics(user):
+    """📡 Topics an employee's dashboard listens to: their role and their own assignments."""
+    return [role_topic(user.role), employee_topic(user.id)]
+
+
+def publish(connection, changes):
+    """
+    📣 Appends one LiveEvent per (topic, kind) to the current transaction.
+
+    Args:
+        connection: Connection of the writing transaction (session.connection()).
+        changes: Dict {(topic, kind): [changed IDs]}.
+    Set-based UPDATEs, which bypass the flush listener, call this directly.
+    """
+    now = datetime.now()
+    rows = [
+        {
+            "topic": topic,
+            "kind": kind,
+            "payload": json.dumps({"ids": sorted(ids)[:MAX_EVENT_IDS], "count": len(ids)}),
+            "created_at": now,
+        }
+        for (topic, kind), ids in changes.items() if ids
+    ]
+    if rows:
+        connection.execute(LiveEvent.__table__.insert(), rows)
+
+
+def _repair_audience(repair):
+    """Receptionists see every repair; mechanics the ones assigned to them (before and after)."""
+    topics = {role_topic("Receptionist")}
+    history = get_history(repair, "employee_id")
+    for employee_id in [repair.employee_id, *history.deleted]:
+        if employee_id is not None:
+            topics.add(employee_topic(employee_id))
+    return topics
+
+
+@event.listens_for(db.session, "after_flush")
+def _publish_changes(session, flush_context):
+    """🔔 Turns the repairs and consumables of this flush into live events."""
+    changes = {}
+
+    def add(topics, kind, obj_id):
+        for topic in topics:
+            changes.setdefault((topic, kind), set()).add(obj_id)
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, Repair):
+            add(_repair_audience(obj), REPAIR, obj.id)
+        elif isinstance(obj, Consumable):
+            add([role_topic("StockKeeper")], STOCK, obj.id)
+
+    if changes:
+        publish(session.connection(), changes)
+        session.info["live_published"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def _wake_broker(session):
+    if session.info.pop("live_published", False):
+        broker.wake()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_published(session):
+    session.info.pop("live_published", None)
+
+
+class Subscription:
+    """One open event stream: its topics and a bounded queue of pending events."""
+
+    def __init__(self, topics, maxsize):
+        self.topics = frozenset(topics)
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+
+class LiveBroker:
+    """
+    🛰️ Per-process fan-out of LiveEvent rows to the open streams.
+    The polling thread starts with the first subscription and reads only rows newer than the
+    last one it has seen, so the cost is one indexed query per interval per worker,
+    independent of the number of connected dashboards.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._last_pruned = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    def subscribe(self, app, topics):
+        subscription = Subscription(topics, app.config["LIVE_QUEUE_SIZE"])
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, args=(app,),
+                                                name="live-broker", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _dispatch(self, rows):
+        """Queues each row for the subscriptions listening to its topic."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            for row in rows:
+                if row.topic not in subscription.topics:
+                    continue
+                try:
+                    subscription.queue.put_nowait(row)
+                except queue.Full:
+                    # A stalled browser: end its stream; it reconnects and catches up by ID
+                    subscription.overflowed = True
+                    self.unsubscribe(subscription)
+                    break
+
+    def _run(self, app):
+        with app.app_context():
+            last_id = db.session.query(db.func.max(LiveEvent.id)).scalar() or 0
+            delivered = set(db.session.execute(
+                db.select(LiveEvent.id).where(LiveEvent.id > last_id - LOOKBACK_IDS)
+            ).scalars())  # already history for the streams opening now
+            db.session.remove()
+            while True:
+                self._wakeup.wait(app.config["LIVE_POLL_INTERVAL"])
+                self._wakeup.clear()
+                with self._lock:
+                    if not self._subscriptions:
+                        self._thread = None
+                        return
+                try:
+                    floor = last_id - LOOKBACK_IDS
+                    rows = db.session.execute(
+                        _EVENT_COLUMNS.where(LiveEvent.id > floor).order_by(LiveEvent.id).limit(1000)
+                    ).all()
+                    new_rows = [row for row in rows if row.id not in delivered]
+                    if new_rows:
+                        self._dispatch(new_rows)
+                        delivered.update(row.id for row in new_rows)
+                        last_id = max(last_id, new_rows[-1].id)
+                        delivered = {i for i in delivered if i > last_id - LOOKBACK_IDS}
+                    self._prune(app)
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Live event poll failed")
+                finally:
+                    db.session.remove()
+
+    def _prune(self, app):
+        """Deletes events older than LIVE_EVENT_RETENTION seconds, at most once a minute."""
+        now = datetime.now()
+        if self._last_pruned and now - self._last_pruned < timedelta(minutes=1):
+            return
+        self._last_pruned = now
+        cutoff = now - timedelta(seconds=app.config["LIVE_EVENT_RETENTION"])
+        LiveEvent.query.filter(LiveEvent.created_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+
+
+broker = LiveBroker()
+
+
+def init_live_updates(app):
+    """
+    ⚙️ Applies the live update settings from the app config.
+    - LIVE_POLL_INTERVAL: seconds between two polls of the event table per worker.
+    - LIVE_HEARTBEAT: seconds of silence after which a stream sends a keep-alive comment.
+    - LIVE_QUEUE_SIZE: undelivered events per stream before it is closed (it then reconnects).
+    - LIVE_EVENT_RETENTION: seconds events are kept for reconnecting streams to catch up.
+    """
+    app.config.setdefault("LIVE_POLL_INTERVAL", 1.0)
+    app.config.setdefault("LIVE_HEARTBEAT", 15.0)
+    app.config.setdefault("LIVE_QUEUE_SIZE", 100)
+    app.config.setdefault("LIVE_EVENT_RETENTION", 900)
+
+
+def format_event(row):
+    """Formats a LiveEvent as one SSE message (ID, event name and JSON data)."""
+    return f"id: {row.id}\nevent: {row.kind}\ndata: {row.payload}\n\n"
+
+
+def event_stream(app, topics, last_event_id=None):
+    """
+    🌊 Generator of SSE text for one dashboard: first the events missed since 'last_event_id'
+    (sent by the browser when it reconnects), then live events and periodic keep-alives.
+    Call it inside the request; the generator itself needs no request or app context.
+    """
+    subscription = broker.subscribe(app, topics)
+    missed = []
+    if last_event_id is not None:
+        missed = db.session.execute(
+            _EVENT_COLUMNS.where(LiveEvent.topic.in_(topics), LiveEvent.id > last_event_id)
+            .order_by(LiveEvent.id).limit(app.config["LIVE_QUEUE_SIZE"])
+        ).all()
+    heartbeat = app.config["LIVE_HEARTBEAT"]
+    retry_ms = int(app.config["LIVE_POLL_INTERVAL"] * 1000) + 1000
+
+    def generate():
+        caught_up = {row.id for row in missed}
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            for row in missed:
+                yield format_event(row)
+            while not subscription.overflowed:
+                try:
+                    row = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if row.id not in caught_up:  # else already sent during the catch-up
+                    yield format_event(row)
+        finally:
+            broker.unsubscribe(subscription)
+
+    return generate()
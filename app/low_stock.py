@@ -0,0 +1,127 @@
+#This file keeps track of the low-stock consumables. Consumable.is_low is updated whenever stock
+#changes: ORM writes through a before_flush listener, set-based UPDATEs (app/stock.py) in their SET
+#clause, bulk seeding per row. Only low items are in the ix_consumable_low partial index, so finding
+#them costs O(low items); each worker also mirrors the low set in memory and reloads it after any
+#committed stock change (a stamp file tells the other workers). An item crossing its threshold is
+#announced to the stockkeepers as a 'low_stock' live event in the same transaction.
+
+import os
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import get_history
+from app.cache import StampFile
+from app.db_setup import db
+from app import live
+from app.models.consumable import Consumable
+
+LowItem = namedtuple("LowItem", "id name quantity threshold")
+
+# Column defaults, for items whose quantity or threshold is still unset when they are flushed
+_DEFAULT_QUANTITY = Consumable.__table__.c.quantity.default.arg
+_DEFAULT_THRESHOLD = Consumable.__table__.c.threshold.default.arg
+
+
+def is_low(quantity, threshold):
+    """Python twin of Consumable.is_low_expr()."""
+    quantity = _DEFAULT_QUANTITY if quantity is None else quantity
+    threshold = _DEFAULT_THRESHOLD if threshold is None else threshold
+    return quantity <= threshold
+
+
+class LowStockTracker:
+    """
+    📉 Per-process mirror of the low-stock items, loaded with one seek on ix_consumable_low
+    and dropped when this or any other worker commits a stock change.
+    """
+
+    def __init__(self):
+        self._items = None
+        self._stamp = StampFile()
+
+    def items(self):
+        """The low-stock items (LowItem tuples, by ID)."""
+        if self._stamp.changed(current_app.config["LOW_STOCK_STAMP_PATH"]):
+            self._items = None
+        items = self._items
+        if items is None:
+            items = [
+                LowItem(*row) for row in db.session.execute(
+                    db.select(Consumable.id, Consumable.name, Consumable.quantity, Consumable.threshold)
+                    .where(Consumable.low_stock_filter())
+                    .order_by(Consumable.id)
+                )
+            ]
+            self._items = items
+        return items
+
+    def count(self):
+        return len(self.items())
+
+    def invalidate(self):
+        """Drops the mirror in this process and, through the stamp file, in every worker."""
+        self._items = None
+        self._stamp.touch(current_app.config["LOW_STOCK_STAMP_PATH"])
+
+
+tracker = LowStockTracker()
+
+
+def init_low_stock(app):
+    """
+    ⚙️ Applies the low-stock tracker settings from the app config.
+    - LOW_STOCK_STAMP_PATH: stamp file telling every worker to reload its low-stock mirror.
+    """
+    app.config.setdefault("LOW_STOCK_STAMP_PATH", os.path.join(app.instance_path, "low_stock.stamp"))
+
+
+def stock_changed():
+    """Marks the current transaction as a stock change; set-based UPDATEs call it directly."""
+    db.session.info["low_stock_changed"] = True
+
+
+def announce_crossings(connection, became_low):
+    """
+    📣 Publishes the items that just fell to or below their threshold as one 'low_stock'
+    event for the stockkeepers, in the writing transaction. Set-based UPDATEs call it directly.
+    """
+    if became_low:
+        live.publish(connection, {(live.role_topic("StockKeeper"), live.LOW_STOCK): set(became_low)})
+
+
+@event.listens_for(db.session, "before_flush")
+def _refresh_low_flags(session, flush_context, instances):
+    """Keeps is_low in step with quantity and threshold on every ORM write."""
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Consumable):
+            low = is_low(obj.quantity, obj.threshold)
+            if obj.is_low is not low:
+                obj.is_low = low
+
+
+@event.listens_for(db.session, "after_flush")
+def _note_crossings(session, flush_context):
+    """Announces the items of this flush that fell to or below their threshold."""
+    became_low = []
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Consumable):
+            continue
+        session.info["low_stock_changed"] = True
+        history = get_history(obj, "is_low")
+        was_low = bool(history.deleted and history.deleted[0])
+        if obj not in session.deleted and history.added and history.added[0] and not was_low:
+            became_low.append(obj.id)
+    if became_low:
+        announce_crossings(session.connection(), became_low)
+        session.info["live_published"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_tracker(session):
+    if session.info.pop("low_stock_changed", False):
+        tracker.invalidate()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_low_stock_changes(session):
+    session.info.pop("low_stock_changed", None)
@@ -5,54 +5,98 @@ from app.main import main
 from app.db_setup import db
 from app.models.repair import Repair
 from app.models.elevator import Elevator
-from datetime import datetime
-import pytz
+from app.models.client_account import ClientAccount
+from app.utils import parse_date_range, filter_date_range, keyset_paginate
+from app import reservations
 
 @main.route("/")
 def index():
     """
-    🏠 Home page: If user is logged in and a client, show repair history;
-    otherwise, show a general welcome page.
+    🏠 Home page: If user is logged in and a client, show repair history
+    (paginated, see client_repairs_page); otherwise, show a general welcome page.
     """
     if current_user.is_authenticated and not getattr(current_user, "role", None):
         # Assume a client
-        repairs = Repair.query.filter_by(client_id=current_user.id).all()
-        return render_template("index.html", repairs=repairs)
+        page = client_repairs_page()
+        if page is None:
+            return redirect(url_for("main.index"))
+        return render_template("index.html", repairs=page.items, page=page)
     return render_template("index.html", repairs=None)
 
+
+def client_repairs_page():
+    """
+    📄 One page of the current client's repair history, ordered by scheduled date.
+    Optional query parameters: status, start / end (YYYY-MM-DD), per_page, after.
+    Returns None (after flashing an error) if the date filter is malformed.
+    """
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError:
+        flash("Invalid date format. Use YYYY-MM-DD.", "error")
+        return None
+
+    # Served by ix_repair_client_scheduled
+    query = Repair.query.filter_by(client_id=current_user.id)
+    status = request.args.get("status")
+    if status:
+        query = query.filter_by(status=status)
+    query = filter_date_range(query, Repair.scheduled_date, start, end)
+    return keyset_paginate(query, Repair.scheduled_date, Repair.id)
+
 @main.route("/schedule_repair", methods=["GET", "POST"])
 @login_required
 def schedule_repair():
     """
-    📅 Allows a logged-in client to schedule a repair by selecting an elevator.
+    📅 Allows a logged-in client to schedule a repair by selecting an elevator and a time slot.
+    - The elevator is reserved only for [start, start + REPAIR_SLOT_MINUTES), so it can be
+      booked for other slots the same day (see app/reservations.py).
+    - If the slot is taken, the earliest free slot on that elevator is suggested.
+    - The booking is committed with a compare-and-set on the elevator (claim_elevator); if
+      another booking on the same elevator wins the race, the form comes back with 409.
     """
     if getattr(current_user, "role", None):
         # If the user is an employee, not a client
         flash("Clients only: Employees cannot schedule repairs here.", "error")
         return redirect(url_for("main.index"))
 
-    # Elevator availability
-    available_elevators = Elevator.query.filter_by(status="Available").all()
     if request.method == "POST":
         description = request.form.get("description")
         scheduled_date = request.form.get("scheduled_date")
+        scheduled_time = request.form.get("scheduled_time")
         elevator_id = request.form.get("elevator_id")
         if not all([description, scheduled_date, elevator_id]):
             flash("All fields are required.", "error")
             return redirect(url_for("main.schedule_repair"))
 
-        # Convert date string to datetime
-        eet = pytz.timezone("Europe/Bucharest")
-        dt_obj = datetime.strptime(scheduled_date, "%Y-%m-%d")
-        dt_obj = eet.localize(dt_obj)
+        # Convert date (and optional time) strings to a datetime
+        try:
+            dt_obj = reservations.parse_start(scheduled_date, scheduled_time)
+        except ValueError:
+            flash("Invalid date or time. Use YYYY-MM-DD and HH:MM.", "error")
+            return redirect(url_for("main.schedule_repair"))
 
         elevator = Elevator.query.get(elevator_id)
-        if elevator.status != "Available":
-            flash("Elevator is not available!", "error")
+        if not elevator:
+            flash("Selected elevator not found.", "error")
+            return redirect(url_for("main.schedule_repair"))
+        seen_version = elevator.booking_version  # read before the availability check
+
+        start, end = reservations.repair_slot(dt_obj)
+        if not reservations.is_free(elevator.id, start, end):
+            suggestion = reservations.earliest_free_slot(elevator.id, start, end - start)
+            flash(f"Elevator is not available at that time! "
+                  f"Earliest free slot: {suggestion.strftime('%Y-%m-%d %H:%M')}.", "error")
             return redirect(url_for("main.schedule_repair"))
 
-        # Reserve elevator
-        elevator.status = "Occupied"
+        # Someone else booked this elevator since we checked: don't risk a double booking
+        if not reservations.claim_elevator(elevator.id, seen_version):
+            db.session.rollback()
+            flash("This elevator was just booked by someone else. "
+                  "Please check the time and submit again.", "error")
+            return render_schedule_form(), 409
+
+        # Reserve the elevator for this slot
         new_repair = Repair(
             client_id=current_user.id,
             elevator_id=elevator.id,
@@ -61,11 +105,24 @@ def schedule_repair():
             status="Pending"
         )
         db.session.add(new_repair)
+        db.session.flush()  # assigns new_repair.id for the reservation
+        reservations.book_repair(new_repair, start, end)
         db.session.commit()
         flash("Repair scheduled successfully!", "success")
         return redirect(url_for("main.index"))
 
-    return render_template("schedule_repair.html", elevators=available_elevators)
+    return render_schedule_form()
+
+
+def render_schedule_form():
+    """Renders the scheduling form: every elevator with its current state
+    (availability is checked per slot on POST)."""
+    elevators = Elevator.query.order_by(Elevator.id).all()
+    return render_template(
+        "schedule_repair.html",
+        elevators=elevators,
+        statuses=reservations.current_statuses()
+    )
 
 
 @main.route('/home_redirect')
@@ -109,6 +166,28 @@ def client_dashboard():
         flash("This dashboard is for clients only!", "error")
         return redirect(url_for('main.index'))
 
-    # The current_user is a client: gather repair history
-    repairs = Repair.query.filter_by(client_id=current_user.id).all()
-    return render_template('client_dashboard.html', repairs=repairs)
\ No newline at end of file
+    # The current_user is a client: gather one page of repair history
+    page = client_repairs_page()
+    if page is None:
+        return redirect(url_for('main.client_dashboard'))
+    return render_template('client_dashboard.html', repairs=page.items, page=page)
+
+
+@main.route('/billing_history')
+@login_required
+def billing_history():
+    """
+    💳 Client Billing History:
+    - Lifetime spend and open balance come from the client's ClientAccount row (one key lookup).
+    - Billed repairs are listed one keyset page at a time, by scheduled date.
+    """
+    if getattr(current_user, 'role', None):
+        flash("Billing history is for clients only!", "error")
+        return redirect(url_for('main.index'))
+
+    account = db.session.get(ClientAccount, current_user.id)
+
+    # Served by ix_repair_client_scheduled
+    query = Repair.query.filter(Repair.client_id == current_user.id, Repair.cost.isnot(None))
+    page = keyset_paginate(query, Repair.scheduled_date, Repair.id)
+    return render_template('billing_history.html', account=account, repairs=page.items, page=page)
@@ -0,0 +1,307 @@
+#This file contains the versioned schema migrations applied on top of db.create_all().
+#create_all() only creates missing tables; anything else an existing database needs (new indexes,
+#backfills, new columns) is a numbered migration here, recorded in the schema_version table.
+
+from datetime import datetime
+from sqlalchemy import inspect, MetaData, text
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+from app.db_setup import db
+
+# 📜 One row per applied migration
+schema_version = db.Table(
+    "schema_version",
+    db.Column("version", db.Integer, primary_key=True),
+    db.Column("description", db.String(200), nullable=False),
+    db.Column("applied_at", db.DateTime, nullable=False, default=datetime.now),
+)
+
+MIGRATIONS = []
+
+
+class MigrationBlocked(RuntimeError):
+    """🛑 Raised when a migration needs an operator to fix the data first; nothing of that step is applied."""
+
+
+def migration(version, description):
+    """
+    🏷️ Decorator registering a migration step.
+    Steps run in version order inside the current db.session transaction and must be
+    idempotent, because a freshly created database runs them too.
+    A new model needs a migration as well (even one that only creates its table): start-up
+    skips db.create_all() while the database is at the latest version (see ensure_schema).
+    """
+
+    def decorator(f):
+        MIGRATIONS.append((version, description, f))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return f
+    return decorator
+
+
+def current_version():
+    """Returns the highest applied migration version (0 for a database that has none)."""
+    version = db.session.query(db.func.max(schema_version.c.version)).scalar()
+    return version or 0
+
+
+def latest_version():
+    """Returns the version of the newest migration known to this code."""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def schema_is_current():
+    """True if the database has the schema_version table and every known migration applied."""
+    if not inspect(db.session.connection()).has_table(schema_version.name):
+        return False
+    return current_version() >= latest_version()
+
+
+def ensure_schema(mode="version"):
+    """
+    🩺 Start-up schema check.
+    - mode 'version': one schema_version lookup; create_all() and the migrations only run
+      when the database is behind (new or older database).
+    - mode 'full': always run create_all() and the pending migrations.
+
+    Returns:
+        True if the schema was (re)created or upgraded, False if it was already current.
+    """
+    if mode != "full" and schema_is_current():
+        db.session.rollback()  # end the read transaction of the check
+        return False
+    db.create_all()
+    upgrade_schema()
+    return True
+
+
+def upgrade_schema(verbose=False):
+    """
+    ⬆️ Applies every pending migration, committing after each one.
+
+    Returns:
+        List of (version, description) tuples that were applied.
+    """
+    applied = []
+    done = current_version()
+    for version, description, step in MIGRATIONS:
+        if version <= done:
+            continue
+        if verbose:
+            print(f"⏳ Applying migration {version}: {description}")
+        step()
+        db.session.execute(
+            schema_version.insert().values(version=version, description=description)
+        )
+        db.session.commit()
+        applied.append((version, description))
+    return applied
+
+
+def _create_missing_indexes(*models):
+    """Creates the indexes declared on the given models that the database doesn't have yet."""
+    connection = db.session.connection()
+    for model in models:
+        for index in model.__table__.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _create_missing_tables(*models):
+    """Creates the tables of the given models that the database doesn't have yet (with their indexes)."""
+    connection = db.session.connection()
+    for model in models:
+        model.__table__.create(bind=connection, checkfirst=True)
+
+
+def _add_missing_column(model, name):
+    """Adds a column declared on the model to an existing table that was created without it."""
+    connection = db.session.connection()
+    table = model.__table__
+    if name in {c["name"] for c in inspect(connection).get_columns(table.name)}:
+        return
+    column_ddl = CreateColumn(table.c[name]).compile(dialect=connection.dialect)
+    connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN {column_ddl}')
+
+
+# -----------------------------
+# Migrations
+# -----------------------------
+
+@migration(1, "Backfill the daily revenue rollup")
+def _backfill_revenue_rollup():
+    from app.models.revenue_rollup import rebuild_revenue_rollup
+    rebuild_revenue_rollup()
+
+
+@migration(2, "Dashboard indexes on repair, elevator and consumable")
+def _dashboard_indexes():
+    from app.models.repair import Repair
+    from app.models.elevator import Elevator
+    _create_missing_indexes(Repair, Elevator)
+    # The consumable low-stock index now depends on a later column: migration 12 creates it
+
+
+@migration(3, "Elevator reservations from open repairs and blocked elevators")
+def _backfill_reservations():
+    from sqlalchemy.orm import load_only
+    from app.models.repair import Repair
+    from app.models.elevator import Elevator
+    from app.models.reservation import ElevatorReservation
+    from app import reservations
+
+    if ElevatorReservation.query.first() is not None:
+        return
+
+    # Every repair that is not finished keeps its elevator for one slot at its scheduled time.
+    # Legacy data may hold two repairs on the same slot; the later one stays unbooked.
+    # Only load the columns that existed at this version; later migrations add the others.
+    open_repairs = (
+        Repair.query
+        .options(load_only(Repair.id, Repair.elevator_id, Repair.scheduled_date))
+        .filter(Repair.status != "Completed")
+        .order_by(Repair.id)
+    )
+    for repair in open_repairs:
+        start, end = reservations.repair_slot(repair.scheduled_date)
+        if reservations.is_free(repair.elevator_id, start, end):
+            reservations.book_repair(repair, start, end)
+            db.session.flush()
+
+    # Elevators flagged 'Maintenance' stay blocked until a manager unblocks them
+    now = reservations.local_now()
+    for elevator in Elevator.query.options(load_only(Elevator.id)).filter_by(status="Maintenance"):
+        reservations.block(elevator.id, now, reservations.OPEN_ENDED)
+
+
+@migration(4, "Completion timestamp on repair")
+def _repair_completion_date():
+    from app.models.repair import Repair
+    _add_missing_column(Repair, "completion_date")
+
+
+@migration(5, "Backfill the per-client billing accounts")
+def _backfill_client_accounts():
+    from app.models.client_account import rebuild_client_accounts
+    rebuild_client_accounts()
+
+
+@migration(6, "Booking version on elevator")
+def _elevator_booking_version():
+    from app.models.elevator import Elevator
+    _add_missing_column(Elevator, "booking_version")
+
+
+def _rebuild_sqlite_table(model, select_columns):
+    """
+    Recreates a table in the shape of its model (SQLite can't drop UNIQUE columns in place).
+    'select_columns' maps each new column name to the SQL expression filling it from the old row.
+    """
+    connection = db.session.connection()
+    table = model.__table__
+    new_name = f"{table.name}_new"
+    metadata = MetaData()
+    for referenced in {fk.column.table for fk in table.foreign_keys}:
+        referenced.to_metadata(metadata)
+    connection.execute(CreateTable(table.to_metadata(metadata, name=new_name)))
+    columns = ", ".join(f'"{c.name}"' for c in table.columns)
+    values = ", ".join(select_columns.get(c.name, f'"{c.name}"') for c in table.columns)
+    connection.exec_driver_sql(f'INSERT INTO "{new_name}" ({columns}) SELECT {values} FROM "{table.name}"')
+    connection.exec_driver_sql(f'DROP TABLE "{table.name}"')
+    connection.exec_driver_sql(f'ALTER TABLE "{new_name}" RENAME TO "{table.name}"')
+
+
+@migration(7, "Unified login credentials for clients and employees")
+def _unified_credentials():
+    from app.models.client import Client
+    from app.models.credential import Credential
+    from app.models.employee import Employee
+
+    connection = db.session.connection()
+    if "email" not in {c["name"] for c in inspect(connection).get_columns(Client.__tablename__)}:
+        return
+
+    # Credential emails are unique across clients and employees. Rather than silently renaming
+    # (and locking out) a client whose email an employee also uses, stop and let an operator
+    # change one of the two addresses first.
+    clashes = connection.execute(text(
+        "SELECT c.id, e.id, c.email FROM client c JOIN employee e ON e.email = c.email ORDER BY c.id"
+    )).all()
+    if clashes:
+        details = "\n".join(f"  - {email}: client {client_id} and employee {employee_id}"
+                            for client_id, employee_id, email in clashes)
+        raise MigrationBlocked(
+            f"{len(clashes)} email address(es) belong to both a client and an employee:\n{details}\n"
+            "Give one account of each pair a different email, then run manual_migrate.py again."
+        )
+
+    # Employees keep their IDs as credential IDs, clients follow after the highest one
+    offset = connection.execute(text("SELECT COALESCE(MAX(id), 0) FROM employee")).scalar()
+    connection.execute(text(
+        "INSERT INTO credential (id, email, password) SELECT id, email, password FROM employee"
+    ))
+    connection.execute(text(
+        "INSERT INTO credential (id, email, password) "
+        "SELECT c.id + :offset, c.email, c.password FROM client c"
+    ), {"offset": offset})
+
+    if connection.dialect.name == "sqlite":
+        # Repairs and billing accounts keep referencing the same IDs; checked at commit
+        connection.exec_driver_sql("PRAGMA defer_foreign_keys = ON")
+        _rebuild_sqlite_table(Employee, {"credential_id": '"id"'})
+        _rebuild_sqlite_table(Client, {"credential_id": f'"id" + {int(offset)}'})
+    else:
+        for model, shift in ((Employee, 0), (Client, offset)):
+            name = model.__tablename__
+            connection.execute(text(
+                f'ALTER TABLE "{name}" ADD COLUMN credential_id INTEGER REFERENCES credential (id)'
+            ))
+            connection.execute(text(f'UPDATE "{name}" SET credential_id = id + :shift'), {"shift": shift})
+            connection.execute(text(f'ALTER TABLE "{name}" ALTER COLUMN credential_id SET NOT NULL'))
+            connection.execute(text(f'ALTER TABLE "{name}" DROP COLUMN email'))
+            connection.execute(text(f'ALTER TABLE "{name}" DROP COLUMN password'))
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(
+                "SELECT setval(pg_get_serial_sequence('credential', 'id'), "
+                "(SELECT COALESCE(MAX(id), 1) FROM credential))"
+            ))
+    _create_missing_indexes(Credential, Client, Employee)
+
+
+@migration(8, "Live event outbox for dashboard streams")
+def _live_event_table():
+    from app.models.live_event import LiveEvent
+    _create_missing_tables(LiveEvent)
+
+
+@migration(9, "Estimated work hours on repair")
+def _repair_estimated_hours():
+    from app.models.repair import Repair
+    _add_missing_column(Repair, "estimated_hours")
+
+
+@migration(10, "Parts ledger linking repairs to consumables")
+def _repair_part_table():
+    from app.models.repair_part import RepairPart
+    _create_missing_tables(RepairPart)
+
+
+@migration(11, "Reorder policy columns on consumable")
+def _consumable_reorder_policy():
+    from app.models.consumable import Consumable
+    for name in ("reorder_quantity", "max_level", "lead_time_days"):
+        _add_missing_column(Consumable, name)
+
+
+@migration(12, "Maintained low-stock flag on consumable")
+def _consumable_low_stock_flag():
+    from app.models.consumable import Consumable
+    _add_missing_column(Consumable, "is_low")
+    db.session.execute(Consumable.__table__.update().values(is_low=Consumable.is_low_expr()))
+    # Replaced by the ix_consumable_low partial index on the flag
+    db.session.connection().exec_driver_sql("DROP INDEX IF EXISTS ix_consumable_stock_gap")
+    _create_missing_indexes(Consumable)
+
+
+@migration(13, "Keyset index for the mechanic dashboard")
+def _repair_employee_scheduled_index():
+    from app.models.repair import Repair
+    _create_missing_indexes(Repair)
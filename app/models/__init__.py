@@ -1,18 +1,30 @@
 from app.db_setup import db
 
 # Import each model so they're recognized by SQLAlchemy
+from .credential import Credential
 from .client import Client
 from .employee import Employee
 from .elevator import Elevator
 from .repair import Repair
 from .consumable import Consumable
+from .revenue_rollup import RevenueRollup
+from .reservation import ElevatorReservation
+from .client_account import ClientAccount
+from .live_event import LiveEvent
+from .repair_part import RepairPart
 
 __all__ = [
     "db",
+    "Credential",
     "Client",
     "Employee",
     "Elevator",
     "Repair",
-    "Consumable"
+    "Consumable",
+    "RevenueRollup",
+    "ElevatorReservation",
+    "ClientAccount",
+    "LiveEvent",
+    "RepairPart"
 ]
 
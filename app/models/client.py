@@ -3,31 +3,41 @@
 
 from app.models import db
 from flask_login import UserMixin
+from app.identity import CLIENT_PREFIX, make_user_id
+from app.models.credential import CredentialHolder
 
 
-class Client(UserMixin, db.Model):
+class Client(CredentialHolder, UserMixin, db.Model):
     """
  🧑‍💼 Client model for customers scheduling car repairs.
     Attributes:
         id (int): Primary key.
         name (str): Full name of the client.
-        email (str): Unique email for login.
+        credential_id (int): Foreign key linking to the login Credential.
+        email (str): Login email (stored on the credential).
         phone (str): Phone number of the client.
         address (str): Address of the client.
         vin_number (str): Vehicle Identification Number.
         car_model (str): Model of the client's car.
-        password (str): Hashed password for authentication.
+        password (str): Hashed password for authentication (stored on the credential).
     """
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(200), nullable=False)
+    credential_id = db.Column(db.Integer, db.ForeignKey("credential.id"), unique=True, index=True,
+                              nullable=False)
     phone_number = db.Column(db.String(20))
     address = db.Column(db.String(200))
     vin_number = db.Column(db.String(50))
     car_model = db.Column(db.String(50))
 
+    credential = db.relationship("Credential", lazy="joined", cascade="all, delete-orphan",
+                                 single_parent=True)
+
+    def get_id(self):
+        """🏷️ Session ID for Flask-Login, typed so it never collides with an employee ID."""
+        return make_user_id(CLIENT_PREFIX, self.id)
+
     def __repr__(self):
         return f"<Client {self.name} - {self.email}>"
 
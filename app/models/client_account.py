@@ -0,0 +1,121 @@
+# This file defines the ClientAccount model, the running billing totals of each client.
+# Like the revenue rollup, it is kept in sync with the Repair table by +/- deltas applied in the
+# flush that changes a repair, so the billing history page reads one row instead of summing repairs.
+
+from sqlalchemy import case, event, func
+from app.models import db
+from app.models.repair import Repair
+from app.models.revenue_rollup import dialect_insert, old_value
+
+COMPLETED = "Completed"
+
+
+class ClientAccount(db.Model):
+    """
+    💳 Billing totals of one client.
+
+    Attributes:
+        client_id (int): Primary key, the client the totals belong to.
+        lifetime_spend (float): Sum of the costs of the client's completed repairs.
+        open_balance (float): Sum of the costs of billed repairs that are not completed yet.
+        completed_repairs (int): Number of completed repairs.
+    """
+
+    client_id = db.Column(db.Integer, db.ForeignKey("client.id"), primary_key=True)
+    lifetime_spend = db.Column(db.Float, nullable=False, default=0.0)
+    open_balance = db.Column(db.Float, nullable=False, default=0.0)
+    completed_repairs = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ClientAccount client={self.client_id}: spent {self.lifetime_spend}, open {self.open_balance}>"
+
+
+def _contribution(status, cost):
+    """(lifetime_spend, open_balance, completed_repairs) a single repair adds to its client's account."""
+    cost = cost or 0.0
+    if status == COMPLETED:
+        return cost, 0.0, 1
+    return 0.0, cost, 0
+
+
+def apply_account_delta(connection, client_id, spend, balance, completed):
+    """
+    ➕ Adds the given amounts to a client's account (negative values subtract), creating the
+    row on first use. A single INSERT ... ON CONFLICT DO UPDATE, like apply_rollup_delta.
+    """
+    insert = dialect_insert(connection)
+    table = ClientAccount.__table__
+    stmt = insert(table).values(
+        client_id=client_id, lifetime_spend=spend,
+        open_balance=balance, completed_repairs=completed,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.client_id],
+        set_={
+            "lifetime_spend": table.c.lifetime_spend + stmt.excluded.lifetime_spend,
+            "open_balance": table.c.open_balance + stmt.excluded.open_balance,
+            "completed_repairs": table.c.completed_repairs + stmt.excluded.completed_repairs,
+        },
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(db.session, "after_flush")
+def _update_client_accounts(session, flush_context):
+    """
+    🔁 Moves repair costs between a client's open balance and lifetime spend whenever a repair
+    is created, deleted, completed, re-priced or moved to another client in this flush.
+    """
+    deltas = {}
+
+    def add(client_id, contribution, sign):
+        current = deltas.get(client_id, (0.0, 0.0, 0))
+        deltas[client_id] = tuple(c + sign * v for c, v in zip(current, contribution))
+
+    for obj in session.new:
+        if isinstance(obj, Repair):
+            add(obj.client_id, _contribution(obj.status, obj.cost), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Repair):
+            add(old_value(obj, "client_id"),
+                _contribution(old_value(obj, "status"), old_value(obj, "cost")), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Repair) or not session.is_modified(obj):
+            continue
+        add(old_value(obj, "client_id"),
+            _contribution(old_value(obj, "status"), old_value(obj, "cost")), -1)
+        add(obj.client_id, _contribution(obj.status, obj.cost), 1)
+
+    connection = session.connection()
+    for client_id, (spend, balance, completed) in deltas.items():
+        if spend or balance or completed:
+            apply_account_delta(connection, client_id, spend, balance, completed)
+
+
+def rebuild_client_accounts():
+    """
+    🧮 Recomputes every client account from the Repair history with one INSERT ... SELECT.
+    Use it to backfill an existing database or after manual SQL edits. The caller commits.
+
+    Returns:
+        Number of accounts written.
+    """
+    completed = Repair.status == COMPLETED
+    cost = func.coalesce(Repair.cost, 0.0)
+    select = db.select(
+        Repair.client_id,
+        func.sum(case((completed, cost), else_=0.0)),
+        func.sum(case((completed, 0.0), else_=cost)),
+        func.sum(case((completed, 1), else_=0)),
+    ).group_by(Repair.client_id)
+
+    table = ClientAccount.__table__
+    db.session.execute(table.delete())
+    db.session.execute(
+        table.insert().from_select(
+            ["client_id", "lifetime_spend", "open_balance", "completed_repairs"], select
+        )
+    )
+    return db.session.query(func.count(ClientAccount.client_id)).scalar()
@@ -11,6 +11,11 @@ class Consumable(db.Model):
         quantity (int): Quantity available in stock.
         price_per_unit (float): Cost per unit of the consumable.
         threshold (int): Minimum quantity before restocking is triggered.
+        reorder_quantity (int): Units ordered when restocking (None means 'threshold').
+        max_level (int): Stock level a restock never exceeds (None for no cap).
+        lead_time_days (int): Supplier delivery time, shown on purchase orders.
+        is_low (bool): quantity <= threshold, kept up to date on every stock change
+            (see app/low_stock.py) so low items are found through a small partial index.
     """
 
     id = db.Column(db.Integer, primary_key=True)
@@ -18,6 +23,55 @@ class Consumable(db.Model):
     quantity = db.Column(db.Integer, default=0)
     price_per_unit = db.Column(db.Float, default=0.0)
     threshold = db.Column(db.Integer, default=5)
+    reorder_quantity = db.Column(db.Integer, nullable=True)
+    max_level = db.Column(db.Integer, nullable=True)
+    lead_time_days = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    is_low = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
 
     def __repr__(self):
-        return f"<Consumable {self.name} - Qty: {self.quantity}>"
\ No newline at end of file
+        return f"<Consumable {self.name} - Qty: {self.quantity}>"
+
+    @classmethod
+    def low_stock_filter(cls):
+        """
+        📉 Filter for items at or below threshold.
+        Reads the maintained is_low flag, written exactly like the WHERE clause of the
+        ix_consumable_low partial index so the database can use it (O(low items)).
+        """
+        return cls.is_low.is_(True)
+
+    @classmethod
+    def is_low_expr(cls, quantity=None):
+        """SQL expression of is_low for 'quantity' (default: the current quantity), for Core UPDATEs."""
+        quantity = cls.quantity if quantity is None else quantity
+        columns = cls.__table__.c  # unset values count as the column defaults, like in Python
+        return (db.func.coalesce(quantity, columns.quantity.default.arg)
+                - db.func.coalesce(cls.threshold, columns.threshold.default.arg)) <= 0
+
+    @classmethod
+    def order_quantity_expr(cls):
+        """
+        🛒 SQL expression of the units a restock adds: reorder_quantity (or threshold),
+        cut down so the item never goes above max_level, and never negative.
+        """
+        wanted = db.func.coalesce(cls.reorder_quantity, cls.threshold)
+        room = cls.max_level - cls.quantity
+        return db.case(
+            (cls.max_level.is_(None), wanted),
+            (room <= 0, 0),
+            (wanted > room, room),
+            else_=wanted,
+        )
+
+    def order_quantity(self):
+        """Python twin of order_quantity_expr() for a single loaded item."""
+        wanted = self.reorder_quantity if self.reorder_quantity is not None else (self.threshold or 0)
+        if self.max_level is None:
+            return wanted
+        return max(0, min(wanted, self.max_level - (self.quantity or 0)))
+
+
+# Partial index serving Consumable.low_stock_filter(): only low items are in it
+db.Index("ix_consumable_low", Consumable.id,
+         sqlite_where=Consumable.is_low.is_(True),
+         postgresql_where=Consumable.is_low.is_(True))
\ No newline at end of file
@@ -0,0 +1,71 @@
+# This file defines the Credential model, the single login table shared by clients and employees.
+# Every Client and Employee row references exactly one credential, so an email address is unique
+# across the whole shop and login resolves it with one lookup on ix_credential_email.
+
+from sqlalchemy.ext.hybrid import hybrid_property
+from app.models import db
+
+
+class Credential(db.Model):
+    """
+    🔑 Login email and password hash of one client or employee.
+
+    Attributes:
+        id (int): Primary key.
+        email (str): Login email, unique across clients and employees.
+        password (str): Hashed password (see app/passwords.py).
+    """
+
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, index=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+
+    def __repr__(self):
+        return f"<Credential {self.email}>"
+
+
+class CredentialHolder:
+    """
+    🪪 Mixin for models owning a 'credential' relationship (Client, Employee).
+    Exposes the credential's email and password as plain attributes, so
+    Client(email=..., password=...), user.email and filter_by(email=...) keep working.
+    Login looks the credential up directly instead (see auth.routes.find_user_by_email).
+    Cached identities (app/identity.py) have no credential and carry their email in '_cached_email'.
+    """
+
+    def _own_credential(self):
+        if self.credential is None:
+            self.credential = Credential()
+        return self.credential
+
+    @hybrid_property
+    def email(self):
+        if self.credential is not None:
+            return self.credential.email
+        return self.__dict__.get("_cached_email")
+
+    @email.inplace.setter
+    def _email_setter(self, value):
+        self._own_credential().email = value
+
+    @email.inplace.expression
+    @classmethod
+    def _email_expression(cls):
+        return (db.select(Credential.email)
+                .where(Credential.id == cls.credential_id)
+                .scalar_subquery())
+
+    @hybrid_property
+    def password(self):
+        return self.credential.password if self.credential is not None else None
+
+    @password.inplace.setter
+    def _password_setter(self, value):
+        self._own_credential().password = value
+
+    @password.inplace.expression
+    @classmethod
+    def _password_expression(cls):
+        return (db.select(Credential.password)
+                .where(Credential.id == cls.credential_id)
+                .scalar_subquery())
@@ -11,12 +11,16 @@ class Elevator(db.Model):
     Attributes:
         id (int): Primary key.
         type (str): Type of elevator (e.g., Standard, Heavy-Duty).
-        status (str): Current status of the elevator (Available, Occupied, Maintenance).
+        status (str): Legacy status label. Availability now comes from the elevator's
+            ElevatorReservation intervals (see app/reservations.py).
+        booking_version (int): Bumped by every booking on the elevator; bookings are
+            committed with a compare-and-set on it (see reservations.claim_elevator).
     """
 
     id = db.Column(db.Integer, primary_key=True)
     type = db.Column(db.String(50), nullable=False)
-    status = db.Column(db.String(20), default="Available", nullable=False)
+    status = db.Column(db.String(20), default="Available", nullable=False, index=True)
+    booking_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     def __repr__(self):
         return f"<Elevator {self.id} - {self.type} ({self.status})>"
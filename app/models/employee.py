@@ -3,38 +3,48 @@
 
 from app.models import db
 from flask_login import UserMixin
+from app.identity import EMPLOYEE_PREFIX, make_user_id
+from app.models.credential import CredentialHolder
 from datetime import date
 
 
-class Employee(UserMixin, db.Model):
+class Employee(CredentialHolder, UserMixin, db.Model):
     """
      🏭 Base Employee model with polymorphic roles (Manager, Mechanic, etc.).
 
     Attributes:
         id (int): Primary key.
         name (str): Employee's full name.
-        email (str): Unique email for login.
+        credential_id (int): Foreign key linking to the login Credential.
+        email (str): Login email (stored on the credential).
         role (str): Employee's role in the company.
         employment_date (date): Date of employment.
         salary (float): Monthly salary.
-        password (str): Hashed password.
+        password (str): Hashed password (stored on the credential).
         department (str): Department the employee belongs to.
     """
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
+    credential_id = db.Column(db.Integer, db.ForeignKey("credential.id"), unique=True, index=True,
+                              nullable=False)
     role = db.Column(db.String(50), nullable=False)
     employment_date = db.Column(db.Date, default=date.today)
     salary = db.Column(db.Float, nullable=False)
-    password = db.Column(db.String(200), nullable=False)
     department = db.Column(db.String(100))
 
+    credential = db.relationship("Credential", lazy="joined", cascade="all, delete-orphan",
+                                 single_parent=True)
+
     __mapper_args__ = {
         "polymorphic_identity": "employee",
         "polymorphic_on": role
     }
 
+    def get_id(self):
+        """🏷️ Session ID for Flask-Login, typed so it never collides with a client ID."""
+        return make_user_id(EMPLOYEE_PREFIX, self.id)
+
     def __repr__(self):
         return f"<Employee {self.name} - {self.role}>"
 
@@ -0,0 +1,35 @@
+# This file defines the LiveEvent model, the short-lived outbox behind the live dashboard stream.
+# Writes to repairs, stock and elevators append rows in the same transaction (see app/live.py),
+# so an event exists exactly when its change was committed; every worker process tails the
+# table by ID and pushes new rows to its Server-Sent Events subscribers.
+
+from datetime import datetime
+from app.models import db
+
+
+class LiveEvent(db.Model):
+    """
+    📣 One change notification for a dashboard audience.
+
+    Attributes:
+        id (int): Primary key, increasing; doubles as the SSE event ID.
+        topic (str): Audience, e.g. 'role:Receptionist' or 'employee:4'.
+        kind (str): What changed: 'repair', 'stock' or 'elevator'.
+        payload (str): JSON details of the change (IDs, new status, ...).
+        created_at (datetime): When the change was flushed; old rows are pruned.
+    """
+
+    __table_args__ = (
+        db.Index("ix_live_event_topic_id", "topic", "id"),
+        # IDs must never be reused after pruning: streams resume from the last ID they saw
+        {"sqlite_autoincrement": True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    topic = db.Column(db.String(64), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now, index=True)
+
+    def __repr__(self):
+        return f"<LiveEvent {self.id} {self.topic} {self.kind}>"
@@ -19,8 +19,20 @@ class Repair(db.Model):
         status (str): Repair status (Pending, Approved, Completed).
         cost (float): Total repair cost.
         billing_details (str): Billing information for the repair.
+        completion_date (datetime): When the repair was marked Completed.
+        estimated_hours (float): Expected work time, used to balance mechanics' workloads
+            (None means REPAIR_ESTIMATE_HOURS).
     """
 
+    # 🗂️ Composite indexes for the dashboard access paths
+    __table_args__ = (
+        db.Index("ix_repair_status_scheduled", "status", "scheduled_date"),      # receptionist
+        db.Index("ix_repair_employee_status", "employee_id", "status"),          # mechanic workloads (dispatch)
+        db.Index("ix_repair_employee_scheduled", "employee_id", "scheduled_date", "id"),  # mechanic dashboard
+        db.Index("ix_repair_client_scheduled", "client_id", "scheduled_date"),   # client / index
+        db.Index("ix_repair_elevator_scheduled", "elevator_id", "scheduled_date"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey("client.id"), nullable=False)
     elevator_id = db.Column(db.Integer, db.ForeignKey("elevator.id"), nullable=False)
@@ -30,6 +42,8 @@ class Repair(db.Model):
     status = db.Column(db.String(20), default="Pending")
     cost = db.Column(db.Float, nullable=True)
     billing_details = db.Column(db.String(200))
+    completion_date = db.Column(db.DateTime, nullable=True)
+    estimated_hours = db.Column(db.Float, nullable=True)
 
     def __repr__(self):
         return f"<Repair {self.description} - Status: {self.status}>"
\ No newline at end of file
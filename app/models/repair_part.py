@@ -0,0 +1,35 @@
+# This file defines the RepairPart model, the parts ledger linking repairs to the consumables they used.
+# Recording parts decrements Consumable.quantity in the same transaction (see app/stock.py), so stock
+# levels follow actual usage, and both "parts of a repair" and "usage of a consumable" are index seeks.
+
+from datetime import datetime
+from app.models import db
+
+
+class RepairPart(db.Model):
+    """
+    🧾 One ledger line: a quantity of a consumable used in a repair.
+
+    Attributes:
+        id (int): Primary key.
+        repair_id (int): Foreign key linking to the Repair.
+        consumable_id (int): Foreign key linking to the Consumable taken from stock.
+        quantity (int): Units used.
+        unit_price (float): Consumable price per unit when the part was recorded.
+        used_at (datetime): When the part was recorded.
+    """
+
+    __table_args__ = (
+        db.Index("ix_repair_part_repair", "repair_id"),                        # parts of a repair
+        db.Index("ix_repair_part_consumable_used", "consumable_id", "used_at"),  # usage of a consumable
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    repair_id = db.Column(db.Integer, db.ForeignKey("repair.id"), nullable=False)
+    consumable_id = db.Column(db.Integer, db.ForeignKey("consumable.id"), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Float, nullable=False, default=0.0)
+    used_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"<RepairPart repair={self.repair_id} consumable={self.consumable_id} x{self.quantity}>"
@@ -0,0 +1,34 @@
+# This file defines the ElevatorReservation model, the booked time intervals of each elevator.
+# Reservations of one elevator never overlap, which lets app/reservations.py answer
+# availability questions with a single index seek on (elevator_id, start_time).
+
+from app.models import db
+
+
+class ElevatorReservation(db.Model):
+    """
+    📅 A booked interval [start_time, end_time) on one elevator.
+
+    Attributes:
+        id (int): Primary key.
+        elevator_id (int): Foreign key linking to the booked Elevator.
+        repair_id (int): Foreign key linking to the Repair using the slot (None for maintenance).
+        kind (str): 'Repair' or 'Maintenance'.
+        start_time (datetime): Start of the booking (local wall-clock time, inclusive).
+        end_time (datetime): End of the booking (exclusive).
+    """
+
+    __table_args__ = (
+        db.Index("ix_reservation_elevator_start", "elevator_id", "start_time"),
+        db.Index("ix_reservation_kind_end", "kind", "end_time"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    elevator_id = db.Column(db.Integer, db.ForeignKey("elevator.id"), nullable=False)
+    repair_id = db.Column(db.Integer, db.ForeignKey("repair.id"), nullable=True, index=True)
+    kind = db.Column(db.String(20), nullable=False, default="Repair")
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ElevatorReservation elevator={self.elevator_id} {self.kind} {self.start_time} -> {self.end_time}>"
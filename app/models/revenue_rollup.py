@@ -0,0 +1,163 @@
+# This file defines the RevenueRollup model, a per-day revenue summary kept in sync with the Repair table.
+# Every flush that creates, edits or deletes a billed repair applies the matching +/- deltas in the same
+# transaction, so revenue reports read O(days) rollup rows instead of scanning every repair.
+
+from sqlalchemy import event, func
+from sqlalchemy.orm.attributes import get_history
+from app.models import db
+from app.models.repair import Repair
+
+
+class RevenueRollup(db.Model):
+    """
+    📈 Daily revenue totals per repair status and elevator.
+
+    Attributes:
+        id (int): Primary key.
+        day (date): Scheduled day of the repairs in this bucket.
+        status (str): Repair status of the bucket.
+        elevator_id (int): Elevator used by the repairs in this bucket.
+        repair_count (int): Number of billed repairs in the bucket.
+        revenue (float): Sum of the repair costs in the bucket.
+    """
+
+    __table_args__ = (
+        db.UniqueConstraint("day", "status", "elevator_id", name="uq_revenue_rollup_bucket"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default="")
+    elevator_id = db.Column(db.Integer, nullable=False)
+    repair_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<RevenueRollup {self.day} {self.status} elevator={self.elevator_id}: {self.revenue}>"
+
+
+def dialect_insert(bind):
+    """Returns the dialect's INSERT construct supporting ON CONFLICT upserts."""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def old_value(repair, key):
+    """Value of an attribute as it was before the pending changes."""
+    history = get_history(repair, key)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(repair, key)
+
+
+# The rollup (and the client accounts) need the pre-change value of these columns even when a
+# repair was expired by a previous commit; an active-history listener makes SQLAlchemy load it
+# before the new value is set.
+TRACKED_KEYS = ("cost", "status", "scheduled_date", "elevator_id", "client_id")
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+for _key in TRACKED_KEYS:
+    event.listen(getattr(Repair, _key), "set", _keep_old_value, active_history=True)
+
+
+def rollup_bucket(scheduled_date, status, elevator_id):
+    """Rollup key (day, status, elevator) of a repair with these values."""
+    return scheduled_date.date(), status or "", elevator_id
+
+
+def apply_rollup_delta(connection, bucket, count, revenue):
+    """
+    ➕ Adds 'count' repairs and 'revenue' to one rollup bucket (negative values subtract).
+    Uses a single INSERT ... ON CONFLICT DO UPDATE so concurrent writers never lose an update.
+    """
+    day, status, elevator_id = bucket
+    insert = dialect_insert(connection)
+    table = RevenueRollup.__table__
+    stmt = insert(table).values(
+        day=day, status=status, elevator_id=elevator_id,
+        repair_count=count, revenue=revenue,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.status, table.c.elevator_id],
+        set_={
+            "repair_count": table.c.repair_count + stmt.excluded.repair_count,
+            "revenue": table.c.revenue + stmt.excluded.revenue,
+        },
+    )
+    connection.execute(stmt)
+
+
+@event.listens_for(db.session, "after_flush")
+def _update_revenue_rollup(session, flush_context):
+    """
+    🔁 Moves billed repairs between rollup buckets whenever their cost, status, date or
+    elevator changes in this flush. Runs inside the flush's transaction.
+    """
+    deltas = {}
+
+    def add(bucket, count, revenue):
+        current = deltas.get(bucket, (0, 0.0))
+        deltas[bucket] = (current[0] + count, current[1] + revenue)
+
+    for obj in session.new:
+        if isinstance(obj, Repair) and obj.cost is not None:
+            add(rollup_bucket(obj.scheduled_date, obj.status, obj.elevator_id), 1, obj.cost)
+
+    for obj in session.deleted:
+        if isinstance(obj, Repair):
+            old_cost = old_value(obj, "cost")
+            if old_cost is not None:
+                add(rollup_bucket(old_value(obj, "scheduled_date"), old_value(obj, "status"),
+                                  old_value(obj, "elevator_id")), -1, -old_cost)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Repair) or not session.is_modified(obj):
+            continue
+        old_cost = old_value(obj, "cost")
+        if old_cost is not None:
+            add(rollup_bucket(old_value(obj, "scheduled_date"), old_value(obj, "status"),
+                              old_value(obj, "elevator_id")), -1, -old_cost)
+        if obj.cost is not None:
+            add(rollup_bucket(obj.scheduled_date, obj.status, obj.elevator_id), 1, obj.cost)
+
+    connection = session.connection()
+    for bucket, (count, revenue) in deltas.items():
+        if count or revenue:
+            apply_rollup_delta(connection, bucket, count, revenue)
+
+
+def rebuild_revenue_rollup():
+    """
+    🧮 Recomputes the whole rollup table from the Repair history with one INSERT ... SELECT.
+    Use it to backfill an existing database or to repair drift after manual SQL edits.
+    The caller commits.
+
+    Returns:
+        Number of rollup rows written.
+    """
+    day = func.date(Repair.scheduled_date)
+    select = db.select(
+        day,
+        func.coalesce(Repair.status, ""),
+        Repair.elevator_id,
+        func.count(Repair.id),
+        func.sum(Repair.cost),
+    ).where(Repair.cost.isnot(None)).group_by(day, Repair.status, Repair.elevator_id)
+
+    table = RevenueRollup.__table__
+    db.session.execute(table.delete())
+    db.session.execute(
+        table.insert().from_select(
+            ["day", "status", "elevator_id", "repair_count", "revenue"], select
+        )
+    )
+    return db.session.query(func.count(RevenueRollup.id)).scalar()
@@ -0,0 +1,81 @@
+#This file runs password hashing and verification on a small bounded thread pool.
+#scrypt and pbkdf2 release the GIL, so the pool caps how many CPU-heavy KDF runs a worker does at
+#once, while request threads only wait for their result. When every slot is taken the call fails
+#fast with HashingBusy (the routes answer 429) instead of queueing behind a login storm.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+class HashingBusy(Exception):
+    """⏳ Raised when the hashing pool is saturated; 'retry_after' is a hint in seconds."""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Password hashing is saturated, try again shortly.")
+        self.retry_after = retry_after
+
+
+def init_password_hashing(app):
+    """
+    ⚙️ Applies the password hashing settings from the app config.
+    - PASSWORD_HASH_METHOD: werkzeug method string with explicit parameters, e.g.
+      'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'. Changing it rehashes passwords on login.
+    - HASH_WORKERS: KDF runs executed in parallel per process.
+    - HASH_MAX_PENDING: running plus queued jobs before new ones are refused (HashingBusy).
+    - HASH_TIMEOUT: seconds a request waits for its job before giving up (HashingBusy).
+    """
+    app.config.setdefault("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    app.config.setdefault("HASH_WORKERS", 2)
+    app.config.setdefault("HASH_MAX_PENDING", 8)
+    app.config.setdefault("HASH_TIMEOUT", 5.0)
+
+
+def _get_pool():
+    """Creates the pool lazily, so each (forked) worker process gets its own threads."""
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=current_app.config["HASH_WORKERS"],
+                                           thread_name_prefix="password-hash")
+            _slots = threading.BoundedSemaphore(current_app.config["HASH_MAX_PENDING"])
+        return _executor, _slots
+
+
+def _run(fn, *args):
+    """Runs a KDF call on the pool, or raises HashingBusy if no slot is free or it takes too long."""
+    executor, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    # The slot is held until the work is really done, even if this request stops waiting
+    future.add_done_callback(lambda f: slots.release())
+    try:
+        return future.result(timeout=current_app.config["HASH_TIMEOUT"])
+    except TimeoutError:
+        raise HashingBusy(retry_after=int(current_app.config["HASH_TIMEOUT"])) from None
+
+
+def hash_password(password):
+    """🔑 Hashes a password with PASSWORD_HASH_METHOD on the hashing pool."""
+    return _run(generate_password_hash, password, current_app.config["PASSWORD_HASH_METHOD"])
+
+
+def verify_password(stored_hash, password):
+    """✅ Checks a password against its stored hash on the hashing pool."""
+    return _run(check_password_hash, stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """True if a stored hash was made with other parameters than PASSWORD_HASH_METHOD."""
+    method = stored_hash.split("$", 1)[0]
+    return method != current_app.config["PASSWORD_HASH_METHOD"]
@@ -0,0 +1,138 @@
+#This file renders report PDFs outside the request worker and caches them on disk.
+#The HTML is built in the request (cheap, it reads rollup rows); the slow HTML -> PDF conversion
+#runs in a process pool. Files are named after a fingerprint of the report data, so an unchanged
+#report is served straight from disk and any change to the underlying repairs yields a new file.
+#Job state lives next to the PDF as marker files (<key>.pending, <key>.error), so every worker
+#process sees the same state whichever one queued the job.
+
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+
+_executor = None
+_lock = threading.Lock()
+
+
+def pdf_support_available():
+    """True if pdfkit is installed (it also needs the wkhtmltopdf binary at render time)."""
+    return importlib.util.find_spec("pdfkit") is not None
+
+
+def _cache_dir():
+    path = current_app.config["REPORT_CACHE_DIR"]
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cached_pdf_path(key):
+    """📁 Location of the cached PDF for a report fingerprint."""
+    return os.path.join(_cache_dir(), f"{key}.pdf")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=current_app.config["PDF_WORKERS"])
+        return _executor
+
+
+def _html_to_pdf(html, path):
+    """
+    🖨️ Runs in a pool process: converts HTML to a PDF file.
+    Writes to a temporary file first, so readers never see a half-written PDF.
+    """
+    import pdfkit
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pdfkit.from_string(html, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _claim(marker, timeout):
+    """
+    Creates the .pending marker, or returns False if another worker holds a fresh one.
+    A marker older than 'timeout' seconds belongs to a job that died with its process.
+    """
+    try:
+        os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(marker) < timeout:
+                return False
+        except FileNotFoundError:
+            pass  # the job finished meanwhile; claim it again
+        with open(marker, "w"):
+            pass
+        return True
+
+
+def _job_done(future, pending_path, error_path):
+    """Runs in the parent process when a conversion ends: records a failure, then clears .pending."""
+    error = future.exception()
+    if error is not None:
+        with open(error_path, "w", encoding="utf-8") as f:
+            f.write(str(error) or type(error).__name__)
+    _remove(pending_path)
+
+
+def submit_pdf(key, html):
+    """
+    📤 Queues the conversion of 'html' for fingerprint 'key' unless it is cached or already
+    queued by any worker. A previous failure is cleared, so submitting again retries.
+
+    Returns:
+        'ready' if the PDF is already on disk, otherwise 'pending'.
+    """
+    path = cached_pdf_path(key)
+    if os.path.exists(path):
+        return "ready"
+    pending_path, error_path = f"{path}.pending", f"{path}.error"
+    if not _claim(pending_path, current_app.config["PDF_PENDING_TIMEOUT"]):
+        return "pending"
+    _remove(error_path)
+    try:
+        future = _get_executor().submit(_html_to_pdf, html, path)
+    except Exception:
+        _remove(pending_path)
+        raise
+    future.add_done_callback(lambda done: _job_done(done, pending_path, error_path))
+    return "pending"
+
+
+def pdf_status(key):
+    """
+    🔄 Status of a report PDF, read from the cache directory (the same in every worker).
+
+    Returns:
+        (status, detail): ('ready', path), ('pending', None), ('failed', error message)
+        or ('unknown', None) if no live job exists for the fingerprint (never queued, or
+        its worker died); submit it again in that case.
+    """
+    path = cached_pdf_path(key)
+    if os.path.exists(path):
+        return "ready", path
+    try:
+        with open(f"{path}.error", encoding="utf-8") as f:
+            return "failed", f.read()
+    except FileNotFoundError:
+        pass
+    try:
+        age = time.time() - os.path.getmtime(f"{path}.pending")
+    except FileNotFoundError:
+        return "unknown", None
+    if age < current_app.config["PDF_PENDING_TIMEOUT"]:
+        return "pending", None
+    return "unknown", None
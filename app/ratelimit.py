@@ -0,0 +1,78 @@
+#This file contains the in-process token-bucket rate limiter used by login and registration.
+#Each key (an IP address or an email) owns a bucket that refills at a steady rate; a request spends
+#one token or is refused with the number of seconds until the next token. Buckets live in a
+#bounded LRU map per worker process, so a flood of distinct keys cannot grow memory without limit.
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    🪣 Thread-safe token buckets keyed by string.
+
+    Attributes:
+        capacity (int): Tokens a full bucket holds (the allowed burst).
+        per_seconds (float): Seconds to refill a full bucket from empty.
+        maxsize (int): Maximum number of tracked keys before the least recently used is dropped.
+    """
+
+    def __init__(self, capacity, per_seconds, maxsize=10000):
+        self.capacity = capacity
+        self.per_seconds = per_seconds
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, capacity, per_seconds):
+        """Changes the bucket size and refill time (existing buckets keep their tokens)."""
+        with self._lock:
+            self.capacity = capacity
+            self.per_seconds = per_seconds
+
+    def take(self, key, tokens=1):
+        """
+        Spends 'tokens' from the bucket of 'key'.
+
+        Returns:
+            (allowed, retry_after): retry_after is the seconds until enough tokens are back
+            (0 when allowed).
+        """
+        now = time.monotonic()
+        rate = self.capacity / self.per_seconds
+        with self._lock:
+            level, updated = self._buckets.pop(key, (self.capacity, now))
+            level = min(self.capacity, level + (now - updated) * rate)
+            allowed = level >= tokens
+            if allowed:
+                level -= tokens
+            self._buckets[key] = (level, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        if allowed:
+            return True, 0
+        return False, (tokens - level) / rate
+
+    def clear(self):
+        """Forgets every bucket."""
+        with self._lock:
+            self._buckets.clear()
+
+
+# 🔐 Limits for the authentication routes (sized from app config in init_rate_limits)
+login_per_ip = TokenBucketLimiter(capacity=20, per_seconds=60.0)
+login_per_email = TokenBucketLimiter(capacity=5, per_seconds=60.0)
+register_per_ip = TokenBucketLimiter(capacity=5, per_seconds=300.0)
+
+
+def init_rate_limits(app):
+    """
+    ⚙️ Applies the rate limits from the app config, each a (burst, seconds to refill) pair.
+    - LOGIN_RATE_PER_IP: login attempts per client IP.
+    - LOGIN_RATE_PER_EMAIL: login attempts per account email.
+    - REGISTER_RATE_PER_IP: registrations per client IP.
+    """
+    login_per_ip.configure(*app.config.setdefault("LOGIN_RATE_PER_IP", (20, 60.0)))
+    login_per_email.configure(*app.config.setdefault("LOGIN_RATE_PER_EMAIL", (5, 60.0)))
+    register_per_ip.configure(*app.config.setdefault("REGISTER_RATE_PER_IP", (5, 300.0)))
@@ -0,0 +1,202 @@
+#This file applies receptionist actions (approve, assign to a mechanic, change status) to many
+#repairs at once. The selected repairs are read with one SELECT, every repair that needs the same
+#change is updated by one set-based UPDATE, and everything commits in a single transaction.
+#Core UPDATEs bypass the flush listeners, so the revenue rollup and the live events are written
+#here by hand; the caller commits, then invalidates the REPAIRS fragments and wakes the live broker.
+
+from app.db_setup import db
+from app import live
+from app.models.repair import Repair
+from app.models.revenue_rollup import apply_rollup_delta, rollup_bucket
+
+APPROVE = "approve"
+ASSIGN = "assign"
+STATUS = "status"
+ACTIONS = (APPROVE, ASSIGN, STATUS)
+
+# Statuses a batch may set; completing a repair also frees its elevator and bills the client,
+# so it stays a per-repair mechanic action
+BATCH_STATUSES = ("Pending", "Approved", "In Progress")
+
+# Per-item outcomes
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+REJECTED = "rejected"
+NOT_FOUND = "not_found"
+
+# Largest number of repairs accepted in one request
+MAX_BATCH_SIZE = 500
+
+_ROW_COLUMNS = (Repair.id, Repair.status, Repair.cost, Repair.scheduled_date,
+                Repair.elevator_id, Repair.employee_id)
+
+
+class BatchConflict(Exception):
+    """⚔️ Raised when a selected repair changed between the read and the UPDATE; roll back and retry."""
+
+    def __init__(self):
+        super().__init__("Some of the selected repairs were changed by someone else, try again.")
+
+
+def parse_repair_ids(values):
+    """
+    🔢 Turns submitted repair IDs (a list of ints or digit strings) into a list of unique ints
+    (in the order given). Raises ValueError when 'values' isn't a list, on anything that isn't a
+    positive integer or on more than MAX_BATCH_SIZE values
+    (checked before parsing, duplicates included).
+    """
+    if not isinstance(values, list):
+        raise ValueError("repair_ids must be a list of repair IDs.")
+    if len(values) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} repairs can be changed at once.")
+    ids = []
+    seen = set()
+    for value in values:
+        repair_id = 0
+        if isinstance(value, int) and not isinstance(value, bool):
+            repair_id = value
+        elif isinstance(value, str):
+            digits = value.strip()
+            if digits.isascii() and digits.isdigit():  # isdigit() alone accepts '²'
+                repair_id = int(digits)
+        if repair_id <= 0:
+            raise ValueError(f"Invalid repair ID: {value!r}")
+        if repair_id not in seen:
+            seen.add(repair_id)
+            ids.append(repair_id)
+    return ids
+
+
+def _result(repair_id, outcome, detail=""):
+    return {"id": repair_id, "outcome": outcome, "detail": detail}
+
+
+def _plan_approve(row):
+    if row.status == "Approved":
+        return UNCHANGED, "Already approved.", None
+    if row.status != "Pending":
+        return REJECTED, f"Only pending repairs can be approved (status is {row.status}).", None
+    return UPDATED, "Approved.", {"status": "Approved"}
+
+
+def _plan_assign(mechanic):
+    def plan(row):
+        if row.status == "Completed":
+            return REJECTED, "Completed repairs can't be reassigned.", None
+        values = {}
+        if row.employee_id != mechanic.id:
+            values["employee_id"] = mechanic.id
+        if row.status == "Pending":
+            values["status"] = "Approved"  # same rule as assign_mechanic
+        if not values:
+            return UNCHANGED, f"Already assigned to {mechanic.name}.", None
+        return UPDATED, f"Assigned to {mechanic.name}.", values
+    return plan
+
+
+def _plan_status(status):
+    def plan(row):
+        if row.status == "Completed":
+            return REJECTED, "Completed repairs can't be changed in a batch.", None
+        if row.status == status:
+            return UNCHANGED, f"Already {status}.", None
+        return UPDATED, f"{row.status} -> {status}.", {"status": status}
+    return plan
+
+
+def _apply(repair_ids, plan):
+    """
+    Reads the repairs, asks 'plan' what to do with each and applies the changes with one
+    UPDATE per (previous status, previous mechanic, new values) group. Every UPDATE repeats the
+    previous values in its WHERE clause, so a repair changed in between makes the row count
+    fall short and raises BatchConflict.
+    """
+    rows = {
+        row.id: row for row in db.session.execute(
+            db.select(*_ROW_COLUMNS).where(Repair.id.in_(repair_ids)).with_for_update()
+        )
+    }
+    results = []
+    groups = {}
+    for repair_id in repair_ids:
+        row = rows.get(repair_id)
+        if row is None:
+            results.append(_result(repair_id, NOT_FOUND, "No such repair."))
+            continue
+        outcome, detail, values = plan(row)
+        results.append(_result(repair_id, outcome, detail))
+        if values:
+            key = (row.status, row.employee_id, tuple(sorted(values.items())))
+            groups.setdefault(key, []).append(row)
+
+    for (old_status, old_employee_id, values), group in groups.items():
+        result = db.session.execute(
+            db.update(Repair)
+            .where(Repair.id.in_([row.id for row in group]),
+                   Repair.status == old_status,
+                   Repair.employee_id.is_not_distinct_from(old_employee_id))
+            .values(dict(values))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(group):
+            raise BatchConflict()
+
+    _record_changes([(row, dict(values)) for (_, _, values), group in groups.items() for row in group])
+    return results
+
+
+def _record_changes(changes):
+    """
+    Writes what the flush listeners would have: rollup deltas for repairs that changed status,
+    and live events for the receptionists and every mechanic losing or gaining a repair.
+    Client accounts are unaffected because batches never complete a repair.
+    """
+    deltas = {}
+    audience = {}
+
+    def add(bucket, count, revenue):
+        current = deltas.get(bucket, (0, 0.0))
+        deltas[bucket] = (current[0] + count, current[1] + revenue)
+
+    for row, values in changes:
+        new_status = values.get("status", row.status)
+        if new_status != row.status and row.cost is not None:
+            add(rollup_bucket(row.scheduled_date, row.status, row.elevator_id), -1, -row.cost)
+            add(rollup_bucket(row.scheduled_date, new_status, row.elevator_id), 1, row.cost)
+        topics = {live.role_topic("Receptionist")}
+        for employee_id in (row.employee_id, values.get("employee_id")):
+            if employee_id is not None:
+                topics.add(live.employee_topic(employee_id))
+        for topic in topics:
+            audience.setdefault((topic, live.REPAIR), set()).add(row.id)
+
+    connection = db.session.connection()
+    for bucket, (count, revenue) in deltas.items():
+        if count or revenue:
+            apply_rollup_delta(connection, bucket, count, revenue)
+    live.publish(connection, audience)
+
+
+def approve_repairs(repair_ids):
+    """✅ Approves the pending repairs among 'repair_ids'. Returns one result dict per ID."""
+    return _apply(repair_ids, _plan_approve)
+
+
+def assign_repairs(repair_ids, mechanic):
+    """🔧 Assigns the repairs to 'mechanic' (an Employee); pending ones become approved."""
+    return _apply(repair_ids, _plan_assign(mechanic))
+
+
+def set_repairs_status(repair_ids, status):
+    """🔁 Moves the repairs to 'status' (one of BATCH_STATUSES); completed repairs are left alone."""
+    if status not in BATCH_STATUSES:
+        raise ValueError(f"Status must be one of {', '.join(BATCH_STATUSES)}.")
+    return _apply(repair_ids, _plan_status(status))
+
+
+def summarize(results):
+    """Counts the results per outcome, e.g. {'updated': 3, 'rejected': 1}."""
+    counts = {}
+    for result in results:
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    return counts
@@ -0,0 +1,106 @@
+#This file contains the SQL-side reporting engine used by the manager reports.
+#All sums, counts and groupings run inside the database over the daily RevenueRollup table,
+#so a report reads O(days) rows no matter how many repairs exist.
+
+import hashlib
+from sqlalchemy import Integer, cast, func
+from app.db_setup import db
+from app.models.revenue_rollup import RevenueRollup
+
+# Supported values for the 'group_by' query parameter of the revenue report
+GROUPINGS = ("status", "elevator", "month", "week", "day")
+
+# strftime patterns (SQLite) and to_char patterns (PostgreSQL) for the date groupings.
+# Weeks are ISO 8601 on every database: Monday to Sunday, labelled with the ISO year and
+# week number ('2024-W52', '2025-W01'), so the same data gets the same buckets anywhere.
+_SQLITE_PERIODS = {"month": "%Y-%m", "day": "%Y-%m-%d"}
+_PG_PERIODS = {"month": "YYYY-MM", "week": "IYYY-\"W\"IW", "day": "YYYY-MM-DD"}
+
+
+def _sqlite_iso_week(column):
+    """
+    ISO week label for SQLite, whose strftime has no ISO week before 3.46: a week belongs
+    to the year of its Thursday and is numbered from that year's first Thursday.
+    """
+    thursday = func.date(column, "-3 days", "weekday 4")
+    week = (cast(func.strftime("%j", thursday), Integer) - 1) / 7 + 1
+    return func.printf("%s-W%02d", func.strftime("%Y", thursday), week)
+
+
+def _period(column, granularity):
+    """Returns a SQL expression truncating a date column to a month/week/day label."""
+    if db.engine.dialect.name == "sqlite":
+        if granularity == "week":
+            return _sqlite_iso_week(column)
+        return func.strftime(_SQLITE_PERIODS[granularity], column)
+    return func.to_char(column, _PG_PERIODS[granularity])
+
+
+def _group_column(group_by):
+    if group_by == "status":
+        return RevenueRollup.status
+    if group_by == "elevator":
+        return RevenueRollup.elevator_id
+    if group_by in ("month", "week", "day"):
+        return _period(RevenueRollup.day, group_by)
+    raise ValueError(f"Unsupported grouping: {group_by}")
+
+
+def _in_window(query, start=None, end=None):
+    """Restricts a rollup query to the days inside [start, end)."""
+    if start is not None:
+        query = query.filter(RevenueRollup.day >= start)
+    if end is not None:
+        query = query.filter(RevenueRollup.day < end)
+    return query
+
+
+def revenue_totals(start=None, end=None):
+    """
+    💰 Total revenue and number of billed repairs in the window.
+
+    Returns:
+        (repair_count, total_revenue) computed with a single COUNT/SUM query.
+    """
+    query = db.session.query(
+        func.coalesce(func.sum(RevenueRollup.repair_count), 0),
+        func.coalesce(func.sum(RevenueRollup.revenue), 0.0),
+    )
+    count, total = _in_window(query, start, end).one()
+    return count, total
+
+
+def revenue_fingerprint(start=None, end=None):
+    """
+    🔏 Data-version fingerprint of the revenue report for a window.
+    Hashes the rollup rows the report is built from (O(days)), so any change to a billed
+    repair in the window produces a different fingerprint.
+    """
+    query = db.session.query(
+        RevenueRollup.day, RevenueRollup.status, RevenueRollup.elevator_id,
+        RevenueRollup.repair_count, RevenueRollup.revenue,
+    )
+    rows = [tuple(row) for row in _in_window(query, start, end).order_by(RevenueRollup.id)]
+    return hashlib.sha256(repr((start, end, rows)).encode()).hexdigest()[:32]
+
+
+def revenue_by(group_by, start=None, end=None):
+    """
+    📊 Revenue grouped by status, elevator, month, week or day.
+
+    Args:
+        group_by (str): One of GROUPINGS.
+        start, end (date): Optional window on the scheduled date ('end' exclusive).
+
+    Returns:
+        List of rows with 'key', 'repair_count' and 'revenue', ordered by key.
+    """
+    key = _group_column(group_by).label("key")
+    query = db.session.query(
+        key,
+        func.sum(RevenueRollup.repair_count).label("repair_count"),
+        func.sum(RevenueRollup.revenue).label("revenue"),
+    )
+    query = _in_window(query, start, end).group_by(key)
+    # Buckets emptied by edits keep a row with zero repairs; hide them from reports
+    return query.having(func.sum(RevenueRollup.repair_count) != 0).order_by(key).all()
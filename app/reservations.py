@@ -0,0 +1,309 @@
+#This file contains the elevator reservation engine used by scheduling, completion and blocking.
+#Each elevator owns a set of non-overlapping [start, end) intervals. Because they never overlap,
+#the only interval that can collide with a request is the one with the latest start before the
+#request ends, so every availability check is one seek on ix_reservation_elevator_start.
+#Bookings are made race-free by a compare-and-set on Elevator.booking_version (claim_elevator).
+
+from datetime import datetime, timedelta
+import pytz
+from flask import current_app
+from sqlalchemy import or_
+from app.db_setup import db
+from app.models.elevator import Elevator
+from app.models.reservation import ElevatorReservation
+
+REPAIR = "Repair"
+MAINTENANCE = "Maintenance"
+
+# How long a manager block lasts for each duration offered by block_elevator.html
+BLOCK_DURATIONS = {
+    "half_day": timedelta(hours=12),
+    "full_day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+}
+
+# End time used for blocks with no known end (e.g. migrated 'Maintenance' elevators)
+OPEN_ENDED = datetime(9999, 12, 31)
+
+_eet = pytz.timezone("Europe/Bucharest")
+
+
+def local_now():
+    """🕒 Current wall-clock time in the workshop's timezone (naive, like stored bookings)."""
+    return datetime.now(_eet).replace(tzinfo=None, microsecond=0)
+
+
+def as_local(dt):
+    """Drops the timezone of an aware datetime; reservations are stored as local wall-clock time."""
+    return dt.replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def parse_start(date_str, time_str=None):
+    """
+    🗓️ Parses a 'YYYY-MM-DD' date and an optional 'HH:MM' time (default REPAIR_DAY_START)
+    into a timezone-aware datetime in the workshop's timezone.
+
+    Raises:
+        ValueError: If the date or time is malformed.
+    """
+    time_str = time_str or current_app.config["REPAIR_DAY_START"]
+    return _eet.localize(datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M"))
+
+
+def repair_slot(start):
+    """Returns the [start, end) interval of a repair starting at 'start' (REPAIR_SLOT_MINUTES long)."""
+    start = as_local(start)
+    return start, start + timedelta(minutes=current_app.config["REPAIR_SLOT_MINUTES"])
+
+
+def find_conflict(elevator_id, start, end, exclude_repair_id=None):
+    """
+    🔎 Returns the reservation overlapping [start, end) on this elevator, or None.
+    The reservation of 'exclude_repair_id' is ignored (used when moving a repair).
+    """
+    candidates = (
+        ElevatorReservation.query
+        .filter(ElevatorReservation.elevator_id == elevator_id,
+                ElevatorReservation.start_time < end)
+        .order_by(ElevatorReservation.start_time.desc())
+        .limit(2)
+    )
+    for reservation in candidates:
+        if exclude_repair_id is not None and reservation.repair_id == exclude_repair_id:
+            continue
+        return reservation if reservation.end_time > start else None
+    return None
+
+
+def is_free(elevator_id, start, end, exclude_repair_id=None):
+    """✅ True if nothing is booked on this elevator inside [start, end)."""
+    return find_conflict(elevator_id, start, end, exclude_repair_id) is None
+
+
+def free_elevators(start, end):
+    """
+    🏗️ Elevators with nothing booked inside [start, end), in one query
+    (one correlated index seek per elevator).
+    """
+    last_end = (
+        db.select(ElevatorReservation.end_time)
+        .where(ElevatorReservation.elevator_id == Elevator.id,
+               ElevatorReservation.start_time < end)
+        .order_by(ElevatorReservation.start_time.desc())
+        .limit(1)
+        .correlate(Elevator)
+        .scalar_subquery()
+    )
+    return (
+        Elevator.query
+        .filter(or_(last_end.is_(None), last_end <= start))
+        .order_by(Elevator.id)
+        .all()
+    )
+
+
+def earliest_free_slot(elevator_id, after, duration):
+    """
+    ⏭️ Earliest start >= 'after' at which this elevator is free for 'duration'.
+    Seeks to the reservation covering 'after', then walks forward until the first gap
+    that is long enough.
+    """
+    candidate = as_local(after)
+    covering = find_conflict(elevator_id, candidate, candidate + timedelta(microseconds=1))
+    if covering is not None:
+        candidate = covering.end_time
+
+    upcoming = (
+        ElevatorReservation.query
+        .filter(ElevatorReservation.elevator_id == elevator_id,
+                ElevatorReservation.start_time >= candidate)
+        .order_by(ElevatorReservation.start_time)
+        .yield_per(50)
+    )
+    for reservation in upcoming:
+        if reservation.start_time - candidate >= duration:
+            break
+        candidate = max(candidate, reservation.end_time)
+    return candidate
+
+
+def earliest_free_slot_any(after, duration):
+    """
+    ⏭️ Earliest (start, elevator) pair, across all elevators, free for 'duration' after 'after'.
+    Returns (None, None) if there are no elevators.
+    """
+    best = (None, None)
+    for elevator in Elevator.query.order_by(Elevator.id):
+        start = earliest_free_slot(elevator.id, after, duration)
+        if best[0] is None or start < best[0]:
+            best = (start, elevator)
+    return best
+
+
+def claim_elevator(elevator_id, seen_version):
+    """
+    🔒 Compare-and-set on the elevator's booking_version: bumps it only if it still equals
+    'seen_version', the value read before the availability check.
+    Call it before writing the new booking, in the same transaction. A False result means
+    another booking on this elevator committed in between: roll back and report a conflict.
+    The UPDATE also locks the elevator row until commit, so bookers of one elevator queue up
+    while different elevators are booked in parallel.
+    """
+    result = db.session.execute(
+        db.update(Elevator)
+        .where(Elevator.id == elevator_id, Elevator.booking_version == seen_version)
+        .values(booking_version=Elevator.booking_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def book_repair(repair, start, end):
+    """
+    📌 Books (or moves) the slot of a repair. The caller checks availability, claims the
+    elevator (claim_elevator) and commits.
+    """
+    reservation = ElevatorReservation.query.filter_by(repair_id=repair.id).first()
+    if reservation is None:
+        reservation = ElevatorReservation(repair_id=repair.id, kind=REPAIR)
+        db.session.add(reservation)
+    reservation.elevator_id = repair.elevator_id
+    reservation.start_time = start
+    reservation.end_time = end
+    return reservation
+
+
+def release_repair(repair, at=None):
+    """
+    🔓 Frees the rest of a repair's slot once it is done: a booking that already started is
+    cut at 'at' (default now), a booking in the future is removed. The caller commits.
+    """
+    at = at or local_now()
+    reservation = ElevatorReservation.query.filter_by(repair_id=repair.id).first()
+    if reservation is None:
+        return
+    if reservation.start_time >= at:
+        db.session.delete(reservation)
+    elif reservation.end_time > at:
+        reservation.end_time = at
+
+
+def block(elevator_id, start, end):
+    """
+    🚧 Reserves an elevator for maintenance in [start, end).
+    Like book_repair, the caller claims the elevator and commits.
+
+    Returns:
+        The new reservation, or None if repairs are already booked in that window.
+    """
+    if not is_free(elevator_id, start, end):
+        return None
+    reservation = ElevatorReservation(
+        elevator_id=elevator_id, kind=MAINTENANCE, start_time=start, end_time=end
+    )
+    db.session.add(reservation)
+    return reservation
+
+
+def unblock(reservation_id, at=None):
+    """
+    🔓 Ends one current or upcoming maintenance block: a block that already started is cut
+    at 'at' (default now), an upcoming one is removed. Other blocks of the elevator stay.
+
+    Returns:
+        The block, or None if 'reservation_id' is no maintenance block that is still running
+        or upcoming. The caller commits.
+    """
+    at = at or local_now()
+    reservation = ElevatorReservation.query.filter(
+        ElevatorReservation.id == reservation_id,
+        ElevatorReservation.kind == MAINTENANCE,
+        ElevatorReservation.end_time > at,
+    ).first()
+    if reservation is None:
+        return None
+    if reservation.start_time >= at:
+        db.session.delete(reservation)
+    else:
+        reservation.end_time = at
+    return reservation
+
+
+def current_statuses(at=None):
+    """
+    🚦 Status label of every elevator at 'at' (default now), derived from its reservations:
+    'Maintenance', 'Occupied' or 'Available'.
+
+    Returns:
+        Dict {elevator_id: status}, built with a single query.
+    """
+    at = at or local_now()
+    latest = (
+        db.select(ElevatorReservation.id)
+        .where(ElevatorReservation.elevator_id == Elevator.id,
+               ElevatorReservation.start_time <= at)
+        .order_by(ElevatorReservation.start_time.desc())
+        .limit(1)
+        .correlate(Elevator)
+        .scalar_subquery()
+    )
+    rows = (
+        db.session.query(Elevator.id, ElevatorReservation.kind, ElevatorReservation.end_time)
+        .outerjoin(ElevatorReservation, ElevatorReservation.id == latest)
+        .all()
+    )
+    statuses = {}
+    for elevator_id, kind, end_time in rows:
+        if kind is None or end_time <= at:
+            statuses[elevator_id] = "Available"
+        else:
+            statuses[elevator_id] = "Maintenance" if kind == MAINTENANCE else "Occupied"
+    return statuses
+
+
+def next_status_change(at=None):
+    """
+    ⏭️ Earliest moment after 'at' at which current_statuses() changes without any write:
+    the end of a running reservation or the start of the next one (None if there is none).
+    Two seeks on ix_reservation_elevator_start per elevator.
+    """
+    at = at or local_now()
+    running_end = (
+        db.select(ElevatorReservation.end_time)
+        .where(ElevatorReservation.elevator_id == Elevator.id,
+               ElevatorReservation.start_time <= at)
+        .order_by(ElevatorReservation.start_time.desc())
+        .limit(1)
+        .correlate(Elevator)
+        .scalar_subquery()
+    )
+    next_start = (
+        db.select(ElevatorReservation.start_time)
+        .where(ElevatorReservation.elevator_id == Elevator.id,
+               ElevatorReservation.start_time > at)
+        .order_by(ElevatorReservation.start_time)
+        .limit(1)
+        .correlate(Elevator)
+        .scalar_subquery()
+    )
+    changes = []
+    for end_time, start_time in db.session.query(running_end, next_start):
+        if end_time is not None and end_time > at:
+            changes.append(end_time)
+        if start_time is not None:
+            changes.append(start_time)
+    return min(changes, default=None)
+
+
+def maintenance_blocks(at=None):
+    """
+    🛠️ Current and upcoming maintenance blocks, ordered by elevator and start.
+    """
+    at = at or local_now()
+    return (
+        ElevatorReservation.query
+        .filter(ElevatorReservation.kind == MAINTENANCE, ElevatorReservation.end_time > at)
+        .order_by(ElevatorReservation.elevator_id, ElevatorReservation.start_time)
+        .all()
+    )
@@ -0,0 +1,296 @@
+#This file generates synthetic shop data at production volumes (clients, employees, elevators,
+#consumables, years of repairs) for load tests and benchmarks. Rows are written with Core bulk
+#INSERTs in batched transactions, with primary keys assigned up front so no row is read back.
+#The derived tables the ORM listeners normally maintain are rebuilt set-based at the end.
+
+import random
+from datetime import date, datetime, timedelta
+from flask import current_app
+from werkzeug.security import generate_password_hash
+from app.db_setup import db
+from app.models.client import Client
+from app.models.consumable import Consumable
+from app.models.credential import Credential
+from app.models.elevator import Elevator
+from app.models.employee import Employee
+from app.models.repair import Repair
+from app.models.reservation import ElevatorReservation
+
+# Every seeded account logs in with this password (hashed once, shared by all rows)
+SEED_PASSWORD = "seed123"
+
+FIRST_NAMES = ["Ana", "Mihai", "Elena", "Andrei", "Ioana", "Radu", "Maria", "Alex", "Cristina",
+               "Dan", "Sofia", "Vlad", "Irina", "George", "Laura", "Paul", "Diana", "Stefan"]
+LAST_NAMES = ["Popescu", "Ionescu", "Dumitru", "Stan", "Stoica", "Gheorghe", "Matei", "Rusu",
+              "Munteanu", "Constantin", "Marin", "Tudor", "Florea", "Barbu", "Nistor", "Lungu"]
+CAR_MODELS = ["XC40", "XC60", "XC90", "S60", "S90", "V60", "V90", "C40", "EX30", "EX90"]
+STREETS = ["Calea Victoriei", "Bd. Unirii", "Str. Lipscani", "Bd. Magheru", "Str. Dorobanti"]
+REPAIR_TYPES = ["Oil change", "Brake pads replacement", "Tire rotation", "Battery replacement",
+                "Timing belt replacement", "Coolant flush", "Suspension check", "Headlight repair",
+                "Transmission service", "Annual inspection", "Wiper replacement", "AC recharge"]
+# Typical work hours per repair type, the estimate seeded repairs carry for the dispatcher
+REPAIR_HOURS = {"Oil change": 0.5, "Brake pads replacement": 1.5, "Tire rotation": 0.5,
+                "Battery replacement": 0.5, "Timing belt replacement": 4.0, "Coolant flush": 1.0,
+                "Suspension check": 1.0, "Headlight repair": 1.0, "Transmission service": 3.0,
+                "Annual inspection": 2.0, "Wiper replacement": 0.5, "AC recharge": 1.0}
+PARTS = ["Oil filter", "Spark plugs", "Brake pads", "Air filter", "Coolant", "Wiper blades",
+         "Battery", "Timing belt", "Brake fluid", "Bulbs"]
+CONSUMABLE_PREFIXES = ["Oil", "Filter", "BrakePads", "Coolant", "Wipers", "SparkPlugs", "Tires",
+                       "Antifreeze", "Headlight", "AirFilter", "BrakeFluid", "TransmissionFluid",
+                       "Battery", "RadiatorCap", "EngineOil", "Bulbs", "PowerSteeringFluid",
+                       "Fuse", "TimingBelt", "Grease"]
+ELEVATOR_TYPES = ["Standard", "Standard", "Standard", "Heavy-Duty"]
+
+# Upper bound of the working day; repair slots start at REPAIR_DAY_START and must end by this hour
+DAY_END_HOUR = 18
+
+
+def _next_id(model):
+    """First free primary key of a model's table."""
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+def _bulk_insert(table, rows, batch_size):
+    """
+    📦 Inserts an iterable of row dicts with executemany, committing every 'batch_size' rows.
+
+    Returns:
+        Number of rows inserted.
+    """
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        total += len(batch)
+    return total
+
+
+def _slot_starts():
+    """Offsets (from midnight) of the repair slots of one working day."""
+    start_h, start_m = map(int, current_app.config["REPAIR_DAY_START"].split(":"))
+    slot = timedelta(minutes=current_app.config["REPAIR_SLOT_MINUTES"])
+    offset = timedelta(hours=start_h, minutes=start_m)
+    starts = []
+    while offset + slot <= timedelta(hours=DAY_END_HOUR):
+        starts.append(offset)
+        offset += slot
+    return starts or [timedelta(hours=start_h, minutes=start_m)]
+
+
+def seed_elevators(rng, count, batch_size):
+    first = _next_id(Elevator)
+    rows = (
+        {"id": first + i, "type": rng.choice(ELEVATOR_TYPES), "status": "Available"}
+        for i in range(count)
+    )
+    _bulk_insert(Elevator.__table__, rows, batch_size)
+    return list(range(first, first + count))
+
+
+def _seed_credentials(emails, password_hash, batch_size):
+    """Adds one login credential per email (consecutive IDs) and returns the first ID."""
+    first = _next_id(Credential)
+    rows = (
+        {"id": first + i, "email": email, "password": password_hash}
+        for i, email in enumerate(emails)
+    )
+    _bulk_insert(Credential.__table__, rows, batch_size)
+    return first
+
+
+def seed_mechanics(rng, count, password_hash, batch_size):
+    first = _next_id(Employee)
+    first_credential = _seed_credentials(
+        (f"mechanic{first + i}@seed.volvo.com" for i in range(count)), password_hash, batch_size)
+    rows = (
+        {
+            "id": first + i,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "credential_id": first_credential + i,
+            "role": "Mechanic",
+            "employment_date": date(2015, 1, 1) + timedelta(days=rng.randrange(3650)),
+            "salary": float(rng.randrange(3500, 5500, 50)),
+            "department": "Repairs",
+        }
+        for i in range(count)
+    )
+    _bulk_insert(Employee.__table__, rows, batch_size)
+    return list(range(first, first + count))
+
+
+def seed_clients(rng, count, password_hash, batch_size):
+    first = _next_id(Client)
+    first_credential = _seed_credentials(
+        (f"client{first + i}@seed.example.com" for i in range(count)), password_hash, batch_size)
+    rows = (
+        {
+            "id": first + i,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "credential_id": first_credential + i,
+            "phone_number": f"07{rng.randrange(10**8):08d}",
+            "address": f"{rng.choice(STREETS)} {rng.randint(1, 200)}, Bucharest",
+            "vin_number": "YV1" + "".join(rng.choices("ABCDEFGHJKLMNPRSTUVWXYZ0123456789", k=14)),
+            "car_model": rng.choice(CAR_MODELS),
+        }
+        for i in range(count)
+    )
+    _bulk_insert(Client.__table__, rows, batch_size)
+    return first, first + count
+
+
+def seed_consumables(rng, count, batch_size):
+    """
+    🛢️ Adds 'count' consumables. Names end with the row ID, so they never collide with each
+    other or with existing items and no existing names have to be loaded first.
+    """
+    from app.low_stock import tracker
+
+    first = _next_id(Consumable)
+
+    def rows():
+        for i in range(count):
+            row = {
+                "id": first + i,
+                "name": f"{rng.choice(CONSUMABLE_PREFIXES)}_{first + i:06d}",
+                "quantity": rng.randint(0, 100),
+                "price_per_unit": round(rng.uniform(1.0, 50.0), 2),
+                "threshold": rng.randint(5, 15),
+            }
+            row["is_low"] = row["quantity"] <= row["threshold"]
+            yield row
+
+    inserted = _bulk_insert(Consumable.__table__, rows(), batch_size)
+    tracker.invalidate()
+    return inserted
+
+
+def seed_repairs(rng, count, clients, elevator_ids, mechanic_ids, history_days, future_days,
+                 open_share, batch_size, today=None):
+    """
+    🔧 Adds 'count' repairs spread over the last 'history_days' days and the next 'future_days'.
+    - Past repairs are Completed, with a mechanic, a cost and a completion date.
+    - Upcoming repairs are Pending or Approved and get an elevator reservation. Each one takes a
+      distinct (elevator, slot), so reservations never overlap.
+
+    Returns:
+        Number of repairs inserted.
+    """
+    first_client, end_client = clients
+    today = datetime.combine(today or date.today(), datetime.min.time())
+    slots = _slot_starts()
+    slot_length = timedelta(minutes=current_app.config["REPAIR_SLOT_MINUTES"])
+
+    # Distinct future slots for the open repairs (at most half of the free capacity)
+    capacity = len(elevator_ids) * len(slots) * future_days
+    open_count = min(int(count * open_share), capacity // 2)
+    open_positions = sorted(rng.sample(range(capacity), open_count))
+    first_repair = _next_id(Repair)
+    reservation_rows = []
+
+    def upcoming(position):
+        day, rest = divmod(position, len(elevator_ids) * len(slots))
+        slot_index, elevator_index = divmod(rest, len(elevator_ids))
+        return today + timedelta(days=day + 1) + slots[slot_index], elevator_ids[elevator_index]
+
+    def rows():
+        for i in range(count):
+            repair_id = first_repair + i
+            description = rng.choice(REPAIR_TYPES)
+            client_id = rng.randrange(first_client, end_client)
+            if i < open_count:
+                scheduled, elevator_id = upcoming(open_positions[i])
+                approved = rng.random() < 0.5
+                reservation_rows.append({
+                    "elevator_id": elevator_id, "repair_id": repair_id, "kind": "Repair",
+                    "start_time": scheduled, "end_time": scheduled + slot_length,
+                })
+                yield {
+                    "id": repair_id, "client_id": client_id, "elevator_id": elevator_id,
+                    "employee_id": rng.choice(mechanic_ids) if approved else None,
+                    "description": description, "scheduled_date": scheduled,
+                    "estimated_hours": REPAIR_HOURS[description],
+                    "status": "Approved" if approved else "Pending",
+                    "cost": None, "billing_details": None, "completion_date": None,
+                }
+            else:
+                scheduled = (today - timedelta(days=rng.randrange(1, history_days + 1))
+                             + rng.choice(slots))
+                parts = ", ".join(rng.sample(PARTS, rng.randint(1, 3)))
+                yield {
+                    "id": repair_id, "client_id": client_id,
+                    "elevator_id": rng.choice(elevator_ids),
+                    "employee_id": rng.choice(mechanic_ids),
+                    "description": description, "scheduled_date": scheduled,
+                    "estimated_hours": REPAIR_HOURS[description],
+                    "status": "Completed",
+                    "cost": round(rng.uniform(80.0, 1500.0), 2),
+                    "billing_details": f"Parts Used: {parts}",
+                    "completion_date": scheduled + timedelta(minutes=rng.randrange(30, 240)),
+                }
+
+    inserted = _bulk_insert(Repair.__table__, rows(), batch_size)
+    _bulk_insert(ElevatorReservation.__table__, reservation_rows, batch_size)
+    return inserted
+
+
+def seed_all(seed=42, clients=100_000, repairs=2_000_000, consumables=5_000, elevators=40,
+             mechanics=60, history_days=3 * 365, future_days=90, open_share=0.01,
+             batch_size=10_000, today=None, verbose=False):
+    """
+    🌱 Generates a full synthetic data set on top of the existing data.
+    The same seed, sizes and 'today' (default: the current date, which anchors the repair
+    dates) always produce the same rows on the same starting database.
+    Afterwards, the revenue rollup and client accounts are rebuilt and the report caches dropped.
+
+    Returns:
+        Dict {table name: rows inserted}.
+    """
+    from app.models.revenue_rollup import rebuild_revenue_rollup
+    from app.models.client_account import rebuild_client_accounts
+    from app.usage import invalidate_usage_report
+    from app.fragments import ELEVATORS, REPAIRS, STOCK, invalidate_fragments
+
+    def step(message):
+        if verbose:
+            print(message)
+
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(SEED_PASSWORD, method="scrypt")
+    counts = {}
+
+    step(f"⏳ {elevators} elevators, {mechanics} mechanics")
+    elevator_ids = seed_elevators(rng, elevators, batch_size)
+    mechanic_ids = seed_mechanics(rng, mechanics, password_hash, batch_size)
+    counts["elevator"], counts["employee"] = len(elevator_ids), len(mechanic_ids)
+
+    step(f"⏳ {clients} clients")
+    client_range = seed_clients(rng, clients, password_hash, batch_size)
+    counts["client"] = clients
+
+    step(f"⏳ {consumables} consumables")
+    counts["consumable"] = seed_consumables(rng, consumables, batch_size)
+
+    if repairs:
+        if not clients or not elevator_ids or not mechanic_ids:
+            raise ValueError("Repairs need at least one seeded client, elevator and mechanic.")
+        step(f"⏳ {repairs} repairs")
+        counts["repair"] = seed_repairs(rng, repairs, client_range, elevator_ids, mechanic_ids,
+                                        history_days, future_days, open_share, batch_size, today)
+
+        # Bulk INSERTs skip the ORM flush listeners: rebuild what they would have maintained
+        step("⏳ Rebuilding revenue rollup and client accounts")
+        rebuild_revenue_rollup()
+        rebuild_client_accounts()
+        db.session.commit()
+
+    invalidate_usage_report()
+    invalidate_fragments(STOCK, REPAIRS, ELEVATORS)
+    return counts
@@ -0,0 +1,192 @@
+#This file contains the stock movements of consumables. Parts used in a repair are written to the
+#RepairPart ledger and taken out of stock by one set-based UPDATE in the same transaction; the UPDATE
+#only matches rows that still hold enough units, so concurrent mechanics can never drive a quantity
+#below zero. Mass replenishment is likewise one UPDATE over the low-stock items, sized by each item's
+#reorder policy. Core UPDATEs bypass the flush listeners: callers commit, then invalidate the STOCK
+#fragments and wake the live broker.
+
+from datetime import date, datetime, timedelta
+from app.db_setup import db
+from app import live, low_stock
+from app.models.consumable import Consumable
+from app.models.repair_part import RepairPart
+
+# Largest quantity of one consumable accepted in a single entry
+MAX_PART_QUANTITY = 1000
+
+
+class InsufficientStock(Exception):
+    """📉 Raised when parts can't be taken from stock; 'shortages' maps item name to (requested, available)."""
+
+    def __init__(self, shortages):
+        details = ", ".join(f"{name} (requested {requested}, in stock {available})"
+                            for name, (requested, available) in sorted(shortages.items()))
+        super().__init__(f"Not enough stock: {details}.")
+        self.shortages = shortages
+
+
+def parse_part_lines(names, quantities):
+    """
+    🔢 Turns the parallel name / quantity lists of the parts form into {name: quantity}.
+    Blank lines are skipped and repeated names are added up. Raises ValueError on bad quantities.
+    """
+    parts = {}
+    for name, quantity in zip(names, quantities):
+        name = (name or "").strip()
+        if not name:
+            continue
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid quantity for {name}: {quantity!r}")
+        if not 0 < quantity <= MAX_PART_QUANTITY:
+            raise ValueError(f"Quantity for {name} must be between 1 and {MAX_PART_QUANTITY}.")
+        parts[name] = parts.get(name, 0) + quantity
+    return parts
+
+
+def use_parts(repair, parts):
+    """
+    🔧 Records consumables used by 'repair' and takes them out of stock.
+
+    Args:
+        repair: The Repair the parts were used in.
+        parts: Dict {consumable name: units used}.
+
+    One SELECT resolves the names, one UPDATE decrements every consumable (only where enough
+    units are left), and the ledger rows are added to the session. Raises ValueError for
+    unknown names and InsufficientStock when any item is short; the caller then rolls back.
+    Returns the new RepairPart rows.
+    """
+    items = db.session.execute(
+        db.select(Consumable.id, Consumable.name, Consumable.price_per_unit, Consumable.is_low)
+        .where(Consumable.name.in_(parts))
+    ).all()
+    unknown = set(parts) - {item.name for item in items}
+    if unknown:
+        raise ValueError(f"Unknown consumables: {', '.join(sorted(unknown))}.")
+
+    needed = {item.id: parts[item.name] for item in items}
+    decrement = db.case(needed, value=Consumable.id)
+    result = db.session.execute(
+        db.update(Consumable)
+        .where(Consumable.id.in_(needed), Consumable.quantity >= decrement)
+        .values(quantity=Consumable.quantity - decrement,
+                is_low=Consumable.is_low_expr(Consumable.quantity - decrement))
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(needed):
+        available = dict(db.session.execute(
+            db.select(Consumable.name, Consumable.quantity).where(Consumable.id.in_(needed))
+        ).all())
+        raise InsufficientStock({
+            name: (requested, available.get(name) or 0)
+            for name, requested in parts.items() if (available.get(name) or 0) < requested
+        })
+
+    now = datetime.now()
+    ledger = [
+        RepairPart(repair_id=repair.id, consumable_id=item.id, quantity=parts[item.name],
+                   unit_price=item.price_per_unit or 0.0, used_at=now)
+        for item in items
+    ]
+    db.session.add_all(ledger)
+    connection = db.session.connection()
+    live.publish(connection, {(live.role_topic("StockKeeper"), live.STOCK): set(needed)})
+    were_stocked = [item.id for item in items if not item.is_low]
+    if were_stocked:
+        low_stock.announce_crossings(connection, db.session.execute(
+            db.select(Consumable.id).where(Consumable.id.in_(were_stocked), Consumable.low_stock_filter())
+        ).scalars().all())
+    low_stock.stock_changed()
+    return ledger
+
+
+def purchase_order():
+    """
+    🧾 The order a mass replenish would place right now: one line per low-stock item with a
+    positive order quantity (see Consumable.order_quantity_expr), computed by a single SELECT.
+
+    Returns:
+        dict with 'lines' (id, name, quantity, threshold, order_quantity, unit_price,
+        line_total, expected_delivery) and the order's 'total_units' and 'total_cost'.
+    """
+    order_quantity = Consumable.order_quantity_expr()
+    rows = db.session.execute(
+        db.select(Consumable.id, Consumable.name, Consumable.quantity, Consumable.threshold,
+                  order_quantity.label("order_quantity"), Consumable.price_per_unit,
+                  Consumable.lead_time_days)
+        .where(Consumable.low_stock_filter(), order_quantity > 0)
+        .order_by(Consumable.id)
+    ).all()
+    today = date.today()
+    lines = [
+        {
+            "id": row.id,
+            "name": row.name,
+            "quantity": row.quantity,
+            "threshold": row.threshold,
+            "order_quantity": row.order_quantity,
+            "unit_price": row.price_per_unit or 0.0,
+            "line_total": round(row.order_quantity * (row.price_per_unit or 0.0), 2),
+            "expected_delivery": (today + timedelta(days=row.lead_time_days or 0)).isoformat(),
+        }
+        for row in rows
+    ]
+    return {
+        "lines": lines,
+        "total_units": sum(line["order_quantity"] for line in lines),
+        "total_cost": round(sum(line["line_total"] for line in lines), 2),
+    }
+
+
+def mass_replenish():
+    """
+    🚚 Restocks every low-stock item by its order quantity with one
+    UPDATE ... WHERE is_low (served by the ix_consumable_low partial index).
+    Returns the number of items restocked. The caller commits.
+    """
+    order_quantity = Consumable.order_quantity_expr()
+    condition = db.and_(Consumable.low_stock_filter(), order_quantity > 0)
+    restocked = db.session.execute(
+        db.select(Consumable.id).where(condition)
+    ).scalars().all()  # only for the live event; the UPDATE re-evaluates the condition itself
+    if not restocked:
+        return 0
+    result = db.session.execute(
+        db.update(Consumable)
+        .where(condition)
+        .values(quantity=Consumable.quantity + order_quantity,
+                is_low=Consumable.is_low_expr(Consumable.quantity + order_quantity))
+        .execution_options(synchronize_session=False)
+    )
+    live.publish(db.session.connection(), {(live.role_topic("StockKeeper"), live.STOCK): set(restocked)})
+    low_stock.stock_changed()
+    return result.rowcount
+
+
+def repair_parts(repair_id):
+    """📋 Ledger lines of one repair with the consumable names (seek on ix_repair_part_repair)."""
+    return db.session.execute(
+        db.select(RepairPart.quantity, RepairPart.unit_price, RepairPart.used_at,
+                  Consumable.id.label("consumable_id"), Consumable.name)
+        .join(Consumable, Consumable.id == RepairPart.consumable_id)
+        .where(RepairPart.repair_id == repair_id)
+        .order_by(RepairPart.id)
+    ).all()
+
+
+def consumable_usage(consumable_id, since=None):
+    """📦 Units of a consumable used since 'since' (all time if None), from ix_repair_part_consumable_used."""
+    query = db.select(db.func.coalesce(db.func.sum(RepairPart.quantity), 0)).where(
+        RepairPart.consumable_id == consumable_id
+    )
+    if since is not None:
+        query = query.where(RepairPart.used_at >= since)
+    return db.session.execute(query).scalar()
+
+
+def parts_summary(repair_id, limit=200):
+    """Readable 'Parts Used: 2x Oil filter, ...' text of a repair's ledger, for billing_details."""
+    text = "Parts Used: " + ", ".join(f"{row.quantity}x {row.name}" for row in repair_parts(repair_id))
+    return text if len(text) <= limit else text[:limit - 3] + "..."
@@ -0,0 +1,135 @@
+#This file computes the elevator usage report (repairs, occupied and maintenance hours) in SQL
+#and memoizes the result. Any committed write to repairs, elevators or reservations clears the
+#memo in this process and, through a stamp file, in every other worker.
+
+from datetime import datetime, time
+from flask import current_app
+from sqlalchemy import event, func
+from app.cache import StampFile, TTLCache
+from app.db_setup import db
+from app.models.elevator import Elevator
+from app.models.repair import Repair
+from app.models.reservation import ElevatorReservation
+from app.reservations import MAINTENANCE, REPAIR
+
+usage_cache = TTLCache(maxsize=128, ttl=600.0)
+_stamp = StampFile()
+_WATCHED = (Repair, Elevator, ElevatorReservation)
+
+
+class UsageRecord:
+    """
+    📊 One row of the elevator usage report.
+
+    Attributes:
+        elevator_id (int): Elevator ID.
+        elevator_type (str): Elevator type (Standard, Heavy-Duty, ...).
+        usage_count (int): Repairs scheduled on the elevator in the window.
+        occupied_hours (float): Hours booked by repairs inside the window.
+        maintenance_hours (float): Hours blocked for maintenance inside the window.
+    """
+
+    def __init__(self, elevator_id, elevator_type):
+        self.elevator_id = elevator_id
+        self.elevator_type = elevator_type
+        self.usage_count = 0
+        self.occupied_hours = 0.0
+        self.maintenance_hours = 0.0
+
+
+def _hours_inside(window_start, window_end):
+    """SQL expression: hours of a reservation that fall inside [window_start, window_end)."""
+    start = ElevatorReservation.start_time
+    end = ElevatorReservation.end_time
+    if db.engine.dialect.name == "sqlite":
+        clipped_end = func.min(end, window_end)
+        clipped_start = func.max(start, window_start)
+        return (func.julianday(clipped_end) - func.julianday(clipped_start)) * 24.0
+    clipped = func.least(end, window_end) - func.greatest(start, window_start)
+    return func.extract("epoch", clipped) / 3600.0
+
+
+def _compute_usage(start, end):
+    window_start = datetime.combine(start, time.min)
+    window_end = datetime.combine(end, time.min)
+
+    records = {
+        elevator_id: UsageRecord(elevator_id, elevator_type)
+        for elevator_id, elevator_type in db.session.query(Elevator.id, Elevator.type).order_by(Elevator.id)
+    }
+
+    # Repairs per elevator (served by ix_repair_elevator_scheduled)
+    repair_counts = (
+        db.session.query(Repair.elevator_id, func.count(Repair.id))
+        .filter(Repair.scheduled_date >= window_start, Repair.scheduled_date < window_end)
+        .group_by(Repair.elevator_id)
+    )
+    for elevator_id, count in repair_counts:
+        if elevator_id in records:
+            records[elevator_id].usage_count = count
+
+    # Booked hours per elevator and reservation kind, clipped to the window
+    hours = (
+        db.session.query(
+            ElevatorReservation.elevator_id,
+            ElevatorReservation.kind,
+            func.sum(_hours_inside(window_start, window_end)),
+        )
+        .filter(ElevatorReservation.start_time < window_end,
+                ElevatorReservation.end_time > window_start)
+        .group_by(ElevatorReservation.elevator_id, ElevatorReservation.kind)
+    )
+    for elevator_id, kind, total in hours:
+        record = records.get(elevator_id)
+        if record is None:
+            continue
+        if kind == REPAIR:
+            record.occupied_hours = round(total or 0.0, 2)
+        elif kind == MAINTENANCE:
+            record.maintenance_hours = round(total or 0.0, 2)
+
+    return list(records.values())
+
+
+def elevator_usage(start, end):
+    """
+    🏗️ Usage of every elevator in the window [start, end) (dates), memoized.
+
+    Returns:
+        List of UsageRecord, ordered by elevator ID.
+    """
+    if _stamp.changed(current_app.config["USAGE_STAMP_PATH"]):
+        usage_cache.clear()
+    key = (start, end)
+    report = usage_cache.get(key)
+    if report is None:
+        report = _compute_usage(start, end)
+        usage_cache.set(key, report)
+    return report
+
+
+def invalidate_usage_report():
+    """🧹 Drops the memoized usage reports of this process and, via the stamp file, of every worker."""
+    usage_cache.clear()
+    _stamp.touch(current_app.config["USAGE_STAMP_PATH"])
+
+
+@event.listens_for(db.session, "after_flush")
+def _note_usage_writes(session, flush_context):
+    """Remembers whether this transaction touched data the usage report depends on."""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, _WATCHED):
+            session.info["usage_dirty"] = True
+            return
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_usage(session):
+    """Drops memoized usage reports once a relevant write is committed."""
+    if session.info.pop("usage_dirty", False):
+        invalidate_usage_report()
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_usage_writes(session):
+    session.info.pop("usage_dirty", None)
@@ -1,9 +1,12 @@
 #This file includes role-based access decorators and any helper functions required across the app.
 
 
+import math
+from datetime import date, datetime, time, timedelta
 from functools import wraps
-from flask import redirect, url_for, flash
+from flask import abort, current_app, redirect, render_template, request, url_for, flash
 from flask_login import current_user
+from sqlalchemy import and_, or_
 
 
 def role_required(role):
@@ -25,3 +28,123 @@ def role_required(role):
             return f(*args, **kwargs)
         return wrapped
     return decorator
+
+
+def parse_date_range(args):
+    """
+    📆 Reads 'start' and 'end' (YYYY-MM-DD, both inclusive) from request args.
+
+    Returns:
+        (start, end) dates where 'end' is exclusive; either may be None.
+
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format.
+    """
+    start_str = args.get("start")
+    end_str = args.get("end")
+    start = datetime.strptime(start_str, "%Y-%m-%d").date() if start_str else None
+    end = datetime.strptime(end_str, "%Y-%m-%d").date() + timedelta(days=1) if end_str else None
+    return start, end
+
+
+def filter_date_range(query, column, start=None, end=None):
+    """Restricts a query to rows whose datetime 'column' falls inside [start, end)."""
+    if start is not None:
+        query = query.filter(column >= datetime.combine(start, time.min))
+    if end is not None:
+        query = query.filter(column < datetime.combine(end, time.min))
+    return query
+
+
+class KeysetPage:
+    """
+    📄 One page of a keyset-paginated list.
+
+    Attributes:
+        items (list): Rows on this page.
+        per_page (int): Page size used for this page.
+        next_url (str): Link to the following page, or None on the last page.
+        first_url (str): Link back to the first page, or None when already on it.
+    """
+
+    def __init__(self, items, per_page, next_url=None, first_url=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_url = next_url
+        self.first_url = first_url
+
+
+def _encode_cursor(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+
+
+def _decode_cursor(column, raw):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw)
+    return python_type(raw)
+
+
+def keyset_paginate(query, sort_column, id_column):
+    """
+    🔖 Keyset (cursor) pagination ordered by (sort_column, id_column), ascending.
+    - Reads 'after' (cursor from the previous page) and 'per_page' from request args.
+    - Each page is one indexed range query, so deep pages cost the same as the first one.
+    - Page size defaults to PAGE_SIZE and is capped at MAX_PAGE_SIZE (app config).
+
+    Args:
+        query: Filtered ORM query to paginate.
+        sort_column: Column to order by (use id_column itself for plain ID order).
+        id_column: Unique tie-breaker, normally the primary key.
+
+    Returns:
+        KeysetPage with the rows and the links to the next/first page.
+    """
+    per_page = request.args.get("per_page", current_app.config["PAGE_SIZE"], type=int)
+    per_page = max(1, min(per_page, current_app.config["MAX_PAGE_SIZE"]))
+
+    cursor = request.args.get("after")
+    if cursor:
+        try:
+            raw_sort, _, raw_id = cursor.rpartition("|")
+            last_id = int(raw_id)
+            if sort_column is id_column:
+                query = query.filter(id_column > last_id)
+            else:
+                last_sort = _decode_cursor(sort_column, raw_sort)
+                query = query.filter(or_(
+                    sort_column > last_sort,
+                    and_(sort_column == last_sort, id_column > last_id),
+                ))
+        except ValueError:
+            abort(400, "Invalid page cursor.")
+
+    if sort_column is id_column:
+        query = query.order_by(id_column)
+    else:
+        query = query.order_by(sort_column, id_column)
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    args = request.args.to_dict()
+    args.pop("after", None)
+    next_url = None
+    if len(rows) > per_page:
+        last = items[-1]
+        sort_value = getattr(last, sort_column.key)
+        next_cursor = f"{_encode_cursor(sort_value)}|{getattr(last, id_column.key)}"
+        next_url = url_for(request.endpoint, **request.view_args, **args, after=next_cursor)
+    first_url = url_for(request.endpoint, **request.view_args, **args) if cursor else None
+    return KeysetPage(items, per_page, next_url, first_url)
+
+
+def too_many_requests(template, retry_after, **context):
+    """
+    🚦 Fast 429 answer for a rate-limited or saturated form: re-renders 'template' with an
+    error message and a Retry-After header (seconds, rounded up).
+    """
+    retry_after = max(1, math.ceil(retry_after))
+    flash(f"Too many attempts right now. Please try again in {retry_after} seconds.", "error")
+    return render_template(template, **context), 429, {"Retry-After": str(retry_after)}
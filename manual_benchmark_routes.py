@@ -0,0 +1,364 @@
+"""
+manual_benchmark_routes.py
+
+This script benchmarks the busiest routes against synthetic fixture databases of growing size.
+For each profile it builds (once, then reuses) a fixture database with app/seeding.py, starts the
+app through create_app() on a throw-away copy of it, and drives every route through the Flask test
+client with several concurrent simulated users. It reports p50/p95/p99 latency, throughput and the
+number of SQL queries per request, and writes everything to a JSON file.
+
+Examples:
+    python manual_benchmark_routes.py --profile small
+    python manual_benchmark_routes.py --profile medium --users 8 --requests 50 --compare before.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(ROOT, "instance", "bench_fixtures")
+RESULTS_DIR = os.path.join(ROOT, "instance", "benchmarks")
+
+# 📏 Fixture sizes (arguments of app.seeding.seed_all)
+PROFILES = {
+    "small": {"clients": 1_000, "repairs": 10_000, "consumables": 200, "elevators": 10, "mechanics": 10},
+    "medium": {"clients": 10_000, "repairs": 200_000, "consumables": 1_000, "elevators": 20, "mechanics": 30},
+    "large": {"clients": 100_000, "repairs": 2_000_000, "consumables": 5_000, "elevators": 40, "mechanics": 60},
+}
+
+# Staff accounts added to every fixture (seeded clients and mechanics use SEED_PASSWORD)
+BENCH_PASSWORD = "bench123"
+BENCH_STAFF = {
+    "Manager": "bench.manager@volvo.com",
+    "Receptionist": "bench.reception@volvo.com",
+}
+
+
+# -----------------------------
+# Fixtures
+# -----------------------------
+
+def fixture_path(profile, seed):
+    return os.path.join(FIXTURE_DIR, f"{profile}-seed{seed}.db")
+
+
+def build_fixture(profile, seed):
+    """
+    🌱 Creates the fixture database of a profile in a scratch folder and moves it into
+    FIXTURE_DIR. Repair dates are anchored to today, so rebuild stale fixtures with --rebuild.
+    """
+    from werkzeug.security import generate_password_hash
+    from app.db_setup import create_app, db
+    from app.models.employee import Manager, Receptionist
+    from app.seeding import seed_all
+
+    build_dir = tempfile.mkdtemp(prefix="bench-build-")
+    os.chdir(build_dir)
+    app = create_app()
+    with app.app_context():
+        password = generate_password_hash(BENCH_PASSWORD, method="scrypt")
+        db.session.add_all([
+            Manager(name="Bench Manager", email=BENCH_STAFF["Manager"], password=password,
+                    salary=7000.0, department="Operations"),
+            Receptionist(name="Bench Receptionist", email=BENCH_STAFF["Receptionist"],
+                         password=password, salary=3000.0, department="Front Desk"),
+        ])
+        db.session.commit()
+        print(f"⏳ Building the '{profile}' fixture (seed {seed})...")
+        seed_all(seed=seed, verbose=True, **PROFILES[profile])
+        db.session.remove()
+        db.engine.dispose()  # checkpoints the WAL into the database file
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    shutil.move(os.path.join(build_dir, "instance", "volvo_tlc_hub.db"), fixture_path(profile, seed))
+    os.chdir(ROOT)
+    shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def start_app(profile, seed):
+    """🚀 Creates the app on a private copy of the fixture, so write scenarios don't change it."""
+    from app.db_setup import create_app, db
+
+    run_dir = tempfile.mkdtemp(prefix="bench-run-")
+    os.makedirs(os.path.join(run_dir, "instance"))
+    shutil.copy(fixture_path(profile, seed), os.path.join(run_dir, "instance", "volvo_tlc_hub.db"))
+    os.chdir(run_dir)
+    from app.ratelimit import init_rate_limits
+
+    app = create_app()
+    app.config["TESTING"] = True
+    # Every simulated user shares one IP: lift the login limits so they measure the route itself
+    for key in ("LOGIN_RATE_PER_IP", "LOGIN_RATE_PER_EMAIL", "REGISTER_RATE_PER_IP"):
+        app.config[key] = (10**9, 1.0)
+    init_rate_limits(app)
+    with app.app_context():
+        install_query_counter(db.engine)
+    return app, run_dir
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+
+_counter = threading.local()
+
+
+def install_query_counter(engine):
+    """Counts the SQL statements executed by the current thread."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        _counter.queries = getattr(_counter, "queries", 0) + 1
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+# Request outcomes: only OK requests count towards the latencies
+OK = "ok"
+CONFLICT = "conflict"
+ERROR = "error"
+
+
+def expect_status(*codes):
+    """Outcome check accepting the given status codes."""
+    return lambda response: OK if response.status_code in codes else ERROR
+
+
+def accounts(app):
+    """Login credentials per role: bench staff plus the first seeded mechanic and clients."""
+    from app.models.client import Client
+    from app.models.employee import Employee
+    from app.seeding import SEED_PASSWORD
+
+    with app.app_context():
+        mechanic = Employee.query.filter_by(role="Mechanic").order_by(Employee.id).first()
+        clients = [c.email for c in Client.query.order_by(Client.id).limit(64)]
+    return {
+        "Manager": [(BENCH_STAFF["Manager"], BENCH_PASSWORD)],
+        "Receptionist": [(BENCH_STAFF["Receptionist"], BENCH_PASSWORD)],
+        "Mechanic": [(mechanic.email, SEED_PASSWORD)],
+        "Client": [(email, SEED_PASSWORD) for email in clients],
+    }
+
+
+def scenarios(app):
+    """
+    🗒️ The benchmarked routes: (name, role, request factory, outcome check).
+    A request factory takes a random.Random and returns (method, url, form data); the check
+    turns the response into OK, CONFLICT or ERROR (see expect_status).
+    Read-only routes come first; schedule_repair writes to the (copied) database.
+    """
+    from app.models.elevator import Elevator
+
+    with app.app_context():
+        elevator_ids = [e.id for e in Elevator.query.order_by(Elevator.id)]
+    creds = accounts(app)
+    today = date.today()
+
+    def login_request(rng):
+        email, password = rng.choice(creds["Client"])
+        return "POST", "/auth/login", {"email": email, "password": password}
+
+    def schedule_outcome(response):
+        # Both a booking and a taken slot answer 302: success goes to main.index, a taken slot
+        # back to the form, which must not count as a write; 409 is a lost booking race
+        if response.status_code == 409:
+            return CONFLICT
+        if response.status_code != 302:
+            return ERROR
+        path = urlsplit(response.headers.get("Location", "")).path
+        return OK if path == "/" else CONFLICT if path == "/schedule_repair" else ERROR
+
+    def schedule_request(rng):
+        day = today + timedelta(days=rng.randint(1, 120))
+        return "POST", "/schedule_repair", {
+            "description": "Benchmark repair",
+            "scheduled_date": day.isoformat(),
+            "scheduled_time": f"{rng.choice([8, 10, 12, 14, 16]):02d}:00",
+            "elevator_id": str(rng.choice(elevator_ids)),
+        }
+
+    return [
+        ("receptionist_dashboard", "Receptionist",
+         lambda rng: ("GET", "/employee/receptionist_dashboard", None), expect_status(200)),
+        ("mechanic_dashboard", "Mechanic",
+         lambda rng: ("GET", "/employee/mechanic_dashboard", None), expect_status(200)),
+        ("revenue_report", "Manager",
+         lambda rng: ("GET", f"/employee/revenue_report?group_by={rng.choice(['status', 'month', 'elevator'])}", None),
+         expect_status(200)),
+        ("schedule_repair_form", "Client",
+         lambda rng: ("GET", "/schedule_repair", None), expect_status(200)),
+        ("auth.login", None, login_request, expect_status(302)),
+        ("schedule_repair", "Client", schedule_request, schedule_outcome),
+    ], creds
+
+
+def run_scenario(app, creds, scenario, users, requests_per_user, warmup, seed):
+    """
+    ⏱️ Runs one scenario with 'users' threads, each with its own logged-in test client.
+
+    Returns:
+        Dict of latency percentiles (ms), throughput (req/s), query counts, errors and
+        conflicts. Latencies cover the successful requests only (all of them if none succeeded).
+    """
+    name, role, make_request, outcome = scenario
+    clients = []
+    for i in range(users):
+        client = app.test_client()
+        if role is not None:
+            email, password = creds[role][i % len(creds[role])]
+            response = client.post("/auth/login", data={"email": email, "password": password})
+            if response.status_code != 302:
+                raise RuntimeError(f"{name}: login as {email} failed ({response.status_code})")
+        clients.append(client)
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        client = clients[index]
+        samples = []
+        for n in range(warmup + requests_per_user):
+            method, url, data = make_request(rng)
+            _counter.queries = 0
+            started = time.perf_counter()
+            response = client.open(url, method=method, data=data)
+            elapsed = time.perf_counter() - started
+            result = outcome(response)
+            response.close()
+            if n >= warmup:
+                samples.append((elapsed, _counter.queries, result))
+        return samples
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        samples = [s for result in pool.map(worker, range(users)) for s in result]
+    wall = time.perf_counter() - started
+
+    timed = [s for s in samples if s[2] == OK] or samples
+    latencies = sorted(s[0] * 1000.0 for s in timed)
+    queries = [s[1] for s in samples]
+    return {
+        "route": name,
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if s[2] == ERROR),
+        "conflicts": sum(1 for s in samples if s[2] == CONFLICT),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "throughput_rps": round(len(samples) / wall, 2),
+        "queries_mean": round(sum(queries) / len(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+# -----------------------------
+# Reporting
+# -----------------------------
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    before = {r["route"]: r for r in (baseline or {}).get("results", [])}
+    print(f"{'route':<24}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'queries':>9}{'errors':>8}{'conflicts':>11}"
+          + ("   p95 vs baseline" if before else ""))
+    for r in results:
+        line = (f"{r['route']:<24}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+                f"{r['throughput_rps']:>9.1f}{r['queries_mean']:>9.1f}{r['errors']:>8}"
+                f"{r.get('conflicts', 0):>11}")
+        old = before.get(r["route"])
+        if old and old["p95_ms"]:
+            line += f"   {(r['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:+.1f}%"
+        print(line)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark Volvo TLC Hub routes.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--seed", type=int, default=42, help="fixture and request seed")
+    parser.add_argument("--users", type=int, default=4, help="concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=25, help="timed requests per user and route")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed requests per user and route")
+    parser.add_argument("--routes", help="comma-separated subset of routes to run")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the fixture database")
+    parser.add_argument("--output", help="JSON results file (default: instance/benchmarks/<profile>-<time>.json)")
+    parser.add_argument("--compare", help="earlier JSON results file to compare p95 against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    output = os.path.abspath(args.output) if args.output else os.path.join(
+        RESULTS_DIR, f"{args.profile}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    compare = os.path.abspath(args.compare) if args.compare else None
+    sys.path.insert(0, ROOT)
+    os.environ.pop("DATABASE_URL", None)  # always benchmark the fixture, never a configured server
+
+    if args.rebuild or not os.path.exists(fixture_path(args.profile, args.seed)):
+        build_fixture(args.profile, args.seed)
+
+    app, run_dir = start_app(args.profile, args.seed)
+    routes, creds = scenarios(app)
+    if args.routes:
+        wanted = set(args.routes.split(","))
+        routes = [s for s in routes if s[0] in wanted]
+
+    results = []
+    for scenario in routes:
+        print(f"⏳ {scenario[0]}...")
+        results.append(run_scenario(app, creds, scenario, args.users, args.requests,
+                                    args.warmup, args.seed))
+
+    report = {
+        "meta": {
+            "profile": args.profile,
+            "fixture": PROFILES[args.profile],
+            "seed": args.seed,
+            "users": args.users,
+            "requests_per_user": args.requests,
+            "warmup": args.warmup,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if compare:
+        with open(compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+    print(f"✅ Results written to {output}")
+    shutil.rmtree(run_dir, ignore_errors=True)
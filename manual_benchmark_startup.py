@@ -0,0 +1,134 @@
+"""
+manual_benchmark_startup.py
+
+This script measures how long a fresh worker process needs before it can serve requests.
+Each run starts a new Python interpreter in a throw-away copy of the database and times the
+imports (app.db_setup and everything it pulls in) and create_app() separately, once with the
+default schema check (VOLVO_SCHEMA_CHECK=version) and once with create_all() on every boot
+(VOLVO_SCHEMA_CHECK=full). Results are printed and written to a JSON file so they can be tracked.
+
+Examples:
+    python manual_benchmark_startup.py
+    python manual_benchmark_startup.py --runs 20 --db instance/bench_fixtures/medium-42.db --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from manual_benchmark_routes import git_revision
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(ROOT, "instance", "benchmarks")
+MODES = ("version", "full")
+
+# Runs inside the child interpreter; prints the three timings as JSON
+CHILD = """
+import json, time
+t0 = time.perf_counter()
+from app.db_setup import create_app
+t1 = time.perf_counter()
+create_app()
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "create_app_ms": (t2 - t1) * 1000}))
+"""
+
+
+def measure(run_dir, mode):
+    """⏱️ Starts one interpreter and returns its timings (total includes interpreter start-up)."""
+    env = dict(os.environ, VOLVO_SCHEMA_CHECK=mode, PYTHONPATH=ROOT)
+    env.pop("DATABASE_URL", None)  # always the copied SQLite file, never a configured server
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=run_dir, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    total = (time.perf_counter() - started) * 1000
+    timings = json.loads(out.strip().splitlines()[-1])
+    timings["total_ms"] = total
+    return timings
+
+
+def summarize(samples):
+    summary = {}
+    for key in ("import_ms", "create_app_ms", "total_ms"):
+        values = sorted(s[key] for s in samples)
+        summary[key] = {
+            "median": round(statistics.median(values), 2),
+            "min": round(values[0], 2),
+            "max": round(values[-1], 2),
+        }
+    return summary
+
+
+def print_table(results, baseline=None):
+    before = (baseline or {}).get("results", {})
+    print(f"{'mode':<10}{'imports':>10}{'create_app':>12}{'total':>10}"
+          + ("   total vs baseline" if before else ""))
+    for mode, r in results.items():
+        line = (f"{mode:<10}{r['import_ms']['median']:>10.1f}{r['create_app_ms']['median']:>12.1f}"
+                f"{r['total_ms']['median']:>10.1f}")
+        old = before.get(mode)
+        if old and old["total_ms"]["median"]:
+            change = (r["total_ms"]["median"] - old["total_ms"]["median"]) / old["total_ms"]["median"]
+            line += f"   {change * 100:+.1f}%"
+        print(line)
+    print("(median milliseconds per fresh process)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure Volvo TLC Hub worker start-up time.")
+    parser.add_argument("--runs", type=int, default=10, help="processes started per mode")
+    parser.add_argument("--db", default=os.path.join("instance", "volvo_tlc_hub.db"),
+                        help="SQLite database to copy (default: the one in ./instance)")
+    parser.add_argument("--output", help="JSON results file (default: instance/benchmarks/startup-<time>.json)")
+    parser.add_argument("--compare", help="earlier JSON results file to compare against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    output = os.path.abspath(args.output) if args.output else os.path.join(
+        RESULTS_DIR, f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    run_dir = tempfile.mkdtemp(prefix="volvo-startup-")
+    os.makedirs(os.path.join(run_dir, "instance"))
+    if os.path.exists(args.db):
+        shutil.copy(args.db, os.path.join(run_dir, "instance", "volvo_tlc_hub.db"))
+
+    try:
+        measure(run_dir, "full")  # bring the copy up to date, so every timed run sees the same schema
+        results = {}
+        for mode in MODES:
+            print(f"⏳ {mode} ({args.runs} processes)...")
+            results[mode] = summarize([measure(run_dir, mode) for _ in range(args.runs)])
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "database": os.path.abspath(args.db) if os.path.exists(args.db) else None,
+            "runs": args.runs,
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+    print(f"✅ Results written to {output}")
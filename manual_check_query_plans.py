@@ -0,0 +1,76 @@
+"""
+manual_check_query_plans.py
+
+This script prints the SQLite query plan of every dashboard query and fails if any of them
+needs a full table scan (a plan step starting with 'SCAN' instead of 'SEARCH') or sorts its
+rows in a temporary B-tree ('USE TEMP B-TREE', i.e. no index serves the ORDER BY, so every
+keyset page sorts the whole match). Scanning a partial index is fine: it only holds the
+matching rows (e.g. ix_consumable_low).
+Run it after adding a new dashboard query or changing the indexes in app/models.
+"""
+
+import sys
+from datetime import datetime
+from sqlalchemy import func, text
+from app.db_setup import create_app, db
+from app.models.repair import Repair
+from app.models.consumable import Consumable
+from app.models.repair_part import RepairPart
+
+
+def dashboard_queries():
+    """
+    🗒️ The filtered dashboard queries, as the routes build them (with sample parameters).
+    """
+    by_date = (Repair.scheduled_date, Repair.id)  # keyset order used by the paginated lists
+    return {
+        "receptionist_dashboard": Repair.query.filter_by(status="Pending").order_by(*by_date),
+        "mechanic_dashboard": Repair.query.filter_by(employee_id=1).order_by(*by_date),
+        "client_dashboard / index": Repair.query.filter_by(client_id=1).order_by(*by_date),
+        "check_stock / mass_replenish": Consumable.query.filter(Consumable.low_stock_filter()),
+        "update_parts_used (parts of a repair)": RepairPart.query.filter_by(repair_id=1).order_by(RepairPart.id),
+        "consumable usage": db.session.query(func.sum(RepairPart.quantity))
+        .filter(RepairPart.consumable_id == 1, RepairPart.used_at >= datetime(2024, 1, 1)),
+    }
+
+
+def partial_indexes():
+    """Names of the indexes declared with a WHERE clause."""
+    return {
+        index.name
+        for table in db.metadata.tables.values()
+        for index in table.indexes
+        if index.dialect_options["sqlite"].get("where") is not None
+    }
+
+
+def explain(query):
+    """Returns the EXPLAIN QUERY PLAN detail lines for an ORM query."""
+    sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return [row[-1] for row in rows]
+
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            print("ℹ️ Query plan check only supports SQLite.")
+            sys.exit(0)
+
+        full_scans = 0
+        sorts = 0
+        partial = partial_indexes()
+        for name, query in dashboard_queries().items():
+            print(f"🔎 {name}")
+            for detail in explain(query):
+                print(f"    {detail}")
+                if detail.startswith("SCAN") and not any(f"INDEX {index}" in detail for index in partial):
+                    full_scans += 1
+                if detail.startswith("USE TEMP B-TREE"):
+                    sorts += 1
+
+        if full_scans or sorts:
+            print(f"❌ {full_scans} full table scan(s) and {sorts} unindexed sort(s) found.")
+            sys.exit(1)
+        print("✅ Every dashboard query uses an index for its filter and its order.")
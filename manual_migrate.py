@@ -0,0 +1,27 @@
+"""
+manual_migrate.py
+
+This script applies pending schema migrations (see app/migrations.py) to the database.
+create_app() does this silently on start-up; this script builds the app without that step
+and applies the migrations itself, so you see each one as it runs.
+"""
+
+import sys
+from app.db_setup import create_app, db
+from app.migrations import MigrationBlocked, current_version, latest_version, upgrade_schema
+
+
+if __name__ == "__main__":
+    app = create_app(migrate=False)
+    with app.app_context():
+        db.create_all()  # new tables, as on start-up; existing ones are altered by the migrations
+        try:
+            applied = upgrade_schema(verbose=True)
+        except MigrationBlocked as exc:
+            db.session.rollback()
+            print(f"❌ Migration stopped at version {current_version()}:\n{exc}")
+            sys.exit(1)
+        if not applied:
+            print(f"ℹ️ Schema is up to date (version {current_version()}).")
+        else:
+            print(f"✅ Applied {len(applied)} migration(s); schema is now at version {latest_version()}.")
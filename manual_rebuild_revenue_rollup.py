@@ -0,0 +1,17 @@
+"""
+manual_rebuild_revenue_rollup.py
+
+This script rebuilds the daily RevenueRollup table from the full Repair history.
+Run it once after upgrading an existing database, or any time repairs were edited with raw SQL.
+"""
+
+from app.db_setup import create_app, db
+from app.models.revenue_rollup import rebuild_revenue_rollup
+
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        rows = rebuild_revenue_rollup()
+        db.session.commit()
+        print(f"✅ Revenue rollup rebuilt ({rows} daily buckets).")
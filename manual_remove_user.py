@@ -1,20 +1,24 @@
 from app.db_setup import create_app, db
 from app.models.client import Client
 from app.models.employee import Employee
+from app.models.credential import Credential
+from app.identity import invalidate_identity
 
 app = create_app()
 
 with app.app_context():
     # Remove from Client table
-    client_user = Client.query.filter_by(email="client1@client1.com").first()
+    client_user = Client.query.join(Client.credential).filter(Credential.email == "client1@client1.com").first()
     if client_user:
         db.session.delete(client_user)
         db.session.commit()
+        invalidate_identity(client_user)  # running web workers drop the cached session user
         print("✅ Removed user from Client table.")
 
     # Optionally remove from Employee if you suspect a duplicate there
-    # employee_user = Employee.query.filter_by(email="manager@volvo.com").first()
+    # employee_user = Employee.query.join(Employee.credential).filter(Credential.email == "manager@volvo.com").first()
     # if employee_user:
     #     db.session.delete(employee_user)
     #     db.session.commit()
+    #     invalidate_identity(employee_user)
     #     print("✅ Removed manager@volvo.com from Employee table.")
@@ -0,0 +1,55 @@
+"""
+manual_seed_data.py
+
+This script fills the database with synthetic data at production volumes (see app/seeding.py):
+100k clients, 2M repairs over three years, 5k consumables by default. Rows are added on top of
+the existing data, so run it on a copy of the database (or a fresh one) before load tests.
+
+Example:
+    python manual_seed_data.py --clients 10000 --repairs 200000 --seed 7
+"""
+
+import argparse
+import time
+from datetime import date
+from app.db_setup import create_app
+from app.seeding import SEED_PASSWORD, seed_all
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic Volvo TLC Hub data.")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default 42)")
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--repairs", type=int, default=2_000_000)
+    parser.add_argument("--consumables", type=int, default=5_000)
+    parser.add_argument("--elevators", type=int, default=40)
+    parser.add_argument("--mechanics", type=int, default=60)
+    parser.add_argument("--history-days", type=int, default=3 * 365,
+                        help="completed repairs are spread over this many past days")
+    parser.add_argument("--future-days", type=int, default=90,
+                        help="open repairs are booked within this many upcoming days")
+    parser.add_argument("--open-share", type=float, default=0.01,
+                        help="fraction of repairs that are still Pending/Approved")
+    parser.add_argument("--batch-size", type=int, default=10_000,
+                        help="rows per INSERT batch and transaction")
+    parser.add_argument("--today", type=date.fromisoformat, default=None,
+                        help="YYYY-MM-DD date the repair dates are anchored to (default: today)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    app = create_app()
+    with app.app_context():
+        started = time.perf_counter()
+        counts = seed_all(
+            seed=args.seed, clients=args.clients, repairs=args.repairs,
+            consumables=args.consumables, elevators=args.elevators, mechanics=args.mechanics,
+            history_days=args.history_days, future_days=args.future_days,
+            open_share=args.open_share, batch_size=args.batch_size, today=args.today,
+            verbose=True,
+        )
+        elapsed = time.perf_counter() - started
+        summary = ", ".join(f"{n} {table}" for table, n in counts.items())
+        print(f"✅ Seeded {summary} in {elapsed:.1f}s.")
+        print(f"ℹ️ Seeded accounts log in with the password '{SEED_PASSWORD}'.")
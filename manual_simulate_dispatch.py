@@ -0,0 +1,44 @@
+"""
+manual_simulate_dispatch.py
+
+This script simulates the automatic mechanic assignment (app/dispatch.py) on the current database
+without writing anything: every approved repair without a mechanic is given to the least-loaded
+mechanic, and the expected queue wait times are printed. Use --extra-mechanics to see how much
+hiring would shorten the queue, and --json for the full report including per-mechanic workloads.
+
+Examples:
+    python manual_simulate_dispatch.py
+    python manual_simulate_dispatch.py --extra-mechanics 3 --json
+"""
+
+import argparse
+import json
+
+from app.db_setup import create_app
+from app.dispatch import simulate
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulate load-balanced mechanic assignment.")
+    parser.add_argument("--extra-mechanics", type=int, default=0, help="idle mechanics to add to the simulation")
+    parser.add_argument("--limit", type=int, help="only the N earliest waiting repairs")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    app = create_app()
+    with app.app_context():
+        report = simulate(extra_mechanics=args.extra_mechanics, limit=args.limit)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        waits = report["wait_hours"]
+        print(f"🧑‍🔧 {report['mechanics']} mechanics, {report['repairs']} approved repairs waiting for one")
+        print(f"   assigned: {report['assigned']}, left over (MECHANIC_MAX_OPEN): {report['unassigned']}")
+        print(f"⏳ Queue wait (hours): mean {waits['mean']}, p50 {waits['p50']}, p95 {waits['p95']}, max {waits['max']}")
+        busiest = max(report["workloads"].values(), key=lambda w: w["hours"], default=None)
+        if busiest:
+            print(f"   busiest mechanic afterwards: {busiest['hours']} h over {busiest['open']} repairs")
@@ -1,7 +1,9 @@
 #This file is responsible for running the Flask application.
 #It ensures that the database is created, and the app runs with debug mode enabled.
+#Set VOLVO_METRICS=1 for request metrics on /metrics (see app/instrumentation.py) and
+#PROFILE_DIR=<folder> to write a cProfile dump of every request there.
 
-
+import os
 from app.db_setup import create_app
 
 # 🔧 Create the Flask app using the factory function
@@ -10,5 +12,11 @@ app = create_app()
 if __name__ == '__main__':
     """🚀 Entry point for running the Flask application.
         - Debug mode enabled for development purposes.
-        - App runs on default port 5000."""
+        - App runs on default port 5000.
+        - PROFILE_DIR: profile each request with werkzeug's ProfilerMiddleware."""
+    profile_dir = os.environ.get("PROFILE_DIR")
+    if profile_dir:
+        from werkzeug.middleware.profiler import ProfilerMiddleware
+        os.makedirs(profile_dir, exist_ok=True)
+        app.wsgi_app = ProfilerMiddleware(app.wsgi_app, profile_dir=profile_dir, restrictions=[30])
     app.run(debug=True)